@@ -1,12 +1,16 @@
 import os
-import pandas as pd
 import numpy as np
-import subprocess
-import time
 import itertools
+import json
 from collections import defaultdict
 from multiprocessing import Pool, cpu_count
 
+from artifact_cache import ArtifactCache
+from dataset_profiles import get_profile
+from evaluation_metrics import compute_CLL
+from process_runner import run_process
+from task_scheduler import TaskScheduler
+
 def is_number(s):
     try:
         float(s)
@@ -150,6 +154,14 @@ def append_MLN_statistics_to_file(results_file, file_suffix, f):
     print("", file=f)
 
 
+def _time(function, *args):
+    """
+    Calls function(*args), a step of the pipeline that runs an external program, returning the wall time of the
+    program in seconds (that of the run that was cached, if its outputs were restored from the artifact cache).
+    """
+    return function(*args).wall_time
+
+
 class MLNEvaluator(object):
     def __init__(self, lsm_dir='/home/dominic/PycharmProjects/MarkovLogic/lsmcode',
                  faster_dir='/home/dominic/CLionProjects/FASTER',
@@ -170,20 +182,44 @@ class MLNEvaluator(object):
                  combined_database_evaluation=False,
                  FASTER_parameters=None,
                  master_results_file=None,
-                 FASTER_timeout=5):
+                 FASTER_timeout=5,
+                 max_workers=None,
+                 cache_dir=None,
+                 profile=None,
+                 individual_query_predicates=None,
+                 timeouts=None,
+                 memory_limits=None,
+                 cache_stochastic_programs=False,
+                 verbose=False):
 
         assert not (only_FASTER and only_ALCHEMY), "only_FASTER and only_ALCHEMY cannot both be True!"
 
+        # a dataset profile (see dataset_profiles.py) gives the fold layout and inference settings of a dataset, any
+        # of which can be overridden by the arguments above
+        if profile is not None:
+            profile = get_profile(profile)
+            database_files = database_files or profile.database_files
+            info_file = info_file or profile.info_file
+            type_file = type_file or profile.type_file
+            number_to_run = number_to_run or profile.number_to_run
+            if individual_query_predicates is None:
+                individual_query_predicates = profile.individual_query_predicates
+        self.profile = profile
+
         self.database_files = database_files
+        self.info_file = info_file
+        self.type_file = type_file
+        if self.database_files is None or self.info_file is None or self.type_file is None:
+            raise ValueError('database_files, info_file and type_file must be specified!')
         # specifies whether onto to run the pipeline on the first N mlns rather than all possible MLNs
         if number_to_run is None:
             self.number_to_run = len(self.database_files)
         else:
             self.number_to_run = number_to_run
-        self.info_file = info_file
-        self.type_file = type_file
-        if self.database_files is None or self.info_file is None or self.type_file is None:
-            raise ValueError('database_files, info_file and type_file must be specified!')
+        self.query_predicates = profile.query_predicates if profile is not None else None
+        # whether inference is run separately for each query predicate
+        self.individual_query_predicates = bool(individual_query_predicates)
+        self.inference_arguments = profile.inference_arguments if profile is not None else '-maxSteps 300'
 
         self.lsm_dir = lsm_dir
         self.faster_dir = faster_dir
@@ -206,6 +242,28 @@ class MLNEvaluator(object):
 
         self.delete_generated_files = delete_generated_files
         self.FASTER_timeout = FASTER_timeout
+        # dict(program: timeout in seconds), for each of 'rwl', 'FASTER', 'getcom', 'pfind', 'createrules', 'learnwts'
+        # and 'infer'; programs that are not given a timeout run until they finish (except FASTER, see FASTER_timeout)
+        self.timeouts = {'FASTER': FASTER_timeout, **(timeouts or {})}
+        # dict(program: limit in bytes) on the address space of each program, for the same programs as timeouts;
+        # programs that are not given a limit may use as much memory as they like
+        self.memory_limits = memory_limits or {}
+        self.verbose = verbose
+        # the number of pipeline steps run at once by execute_experiments(use_task_scheduler=True)
+        self.max_workers = max_workers or cpu_count()
+        # if given, the outputs of getcom, pfind, createrules and learnwts (and of the stochastic programs, see below)
+        # are cached in cache_dir and reused whenever a step is rerun with the same inputs, binaries and parameters
+        self.artifact_cache = None
+        if cache_dir is not None:
+            self.artifact_cache = ArtifactCache(cache_dir, path_aliases={
+                lsm_dir: '{lsm_dir}', faster_dir: '{faster_dir}', infer_dir: '{infer_dir}', data_dir: '{data_dir}',
+                mln_dir: '{mln_dir}', log_dir: '{log_dir}', results_dir: '{results_dir}',
+                inference_calculations_dir: '{inference_calculations_dir}'})
+        # rwl, FASTER and infer use random numbers, so their outputs differ from run to run, and reusing cached
+        # outputs would make repeated trials identical; they are only cached if cache_stochastic_programs is set (e.g.
+        # because their seeds are fixed in their command lines)
+        self.stochastic_programs = {'rwl', 'FASTER', 'infer'}
+        self.cache_stochastic_programs = cache_stochastic_programs
 
         self.FASTER_suffix = '_FASTER'  # file suffix used when running FASTER
         self.alchemy_suffix = '_alchemy'  # file suffix used when running alchemy
@@ -219,7 +277,13 @@ class MLNEvaluator(object):
             'num_top': 3
         }
 
-    def execute_experiments(self, skip_structure_learning=False, skip_inference=False, skip_evaluation=False):
+    def execute_experiments(self, skip_structure_learning=False, skip_inference=False, skip_evaluation=False,
+                            use_task_scheduler=False):
+        if use_task_scheduler:
+            self._execute_experiments_with_task_scheduler(skip_structure_learning, skip_inference, skip_evaluation)
+            print("")
+            return None
+
         # 1) STRUCTURE LEARN #############################################
         if not skip_structure_learning:
             print("")
@@ -239,6 +303,110 @@ class MLNEvaluator(object):
             self.evaluate_MLNs()
             print("")
 
+    def _execute_experiments_with_task_scheduler(self, skip_structure_learning=False, skip_inference=False,
+                                                 skip_evaluation=False):
+        scheduler = self.schedule_experiments(skip_structure_learning, skip_inference, skip_evaluation)
+        results = scheduler.run()
+
+        for method in self._get_methods():
+            motif_times = [results[f'motif_finding {method} {database}'] for database in self.database_files
+                           if f'motif_finding {method} {database}' in results]
+            if motif_times:
+                self._log_average_motif_time(method, motif_times)
+
+            for database in self.database_files[:self.number_to_run]:
+                step_times = [results.get(f'{step} {method} {database}')
+                              for step in ['get_communities', 'path_finding', 'create_rules', 'learn_weights']]
+                if all(step_time is not None for step_time in step_times):
+                    self._log_to_master_file(method=method, quantity='structure_learning_time', database='all others',
+                                             result=sum(step_times), test_database=database)
+
+            list_of_metrics = [results[f'evaluation {method} {database}']
+                               for database in self.database_files[:self.number_to_run]
+                               if f'evaluation {method} {database}' in results]
+            if list_of_metrics:
+                self._log_inference_summary(method, list_of_metrics)
+
+        for name, error in scheduler.failures.items():
+            method, database = name.split(' ')[1:3]
+            self._log_to_master_file(method=method, quantity='errors', database=database,
+                                     result=f"{name.split(' ')[0]} failed with {error!r}")
+        for name in scheduler.skipped:
+            method, database = name.split(' ')[1:3]
+            self._log_to_master_file(method=method, quantity='errors', database=database,
+                                     result=f"{name.split(' ')[0]} skipped because an earlier step failed")
+
+    def schedule_experiments(self, skip_structure_learning=False, skip_inference=False, skip_evaluation=False):
+        """
+        Returns a TaskScheduler holding each step of the pipeline, for each test database and method, as a task that
+        depends only on the steps whose output it reads:
+
+            motif_finding (every other database) -> get_communities -> path_finding -> create_rules -> learn_weights
+                -> inference -> evaluation
+
+        so that, e.g., inference on one fold starts as soon as the weights of its MLN are learned, while structure
+        learning continues on the other folds. The steps of the structure learning pipeline return their run times.
+        """
+        scheduler = TaskScheduler(max_workers=self.max_workers)
+        query_predicates = self.get_query_predicates()
+
+        for method in self._get_methods():
+            suffix = self._get_file_suffix_from_method(method)
+            motif_finding = self._run_alchemy_random_walks_on_database if method == 'alchemy' \
+                else self._run_FASTER_random_walks_on_database
+
+            if not skip_structure_learning:
+                for database in self.database_files:
+                    scheduler.add_task(f'motif_finding {method} {database}', motif_finding, database)
+
+            for database in self.database_files[:self.number_to_run]:
+                save_name = database.rstrip('.db') + suffix
+                dependencies = []
+                if not skip_structure_learning:
+                    dependencies = [f'motif_finding {method} {other_database}'
+                                    for other_database in self.database_files if other_database != database]
+                    dependencies = [scheduler.add_task(f'get_communities {method} {database}', _time,
+                                                       self._run_get_communities, database, save_name, suffix,
+                                                       dependencies=dependencies)]
+                    dependencies = [scheduler.add_task(f'path_finding {method} {database}', _time,
+                                                       self._run_path_finding, save_name,
+                                                       dependencies=dependencies)]
+                    dependencies = [scheduler.add_task(f'create_rules {method} {database}', _time,
+                                                       self._run_create_MLN_rules, database, save_name, suffix,
+                                                       dependencies=dependencies)]
+                    dependencies = [scheduler.add_task(f'learn_weights {method} {database}', _time,
+                                                       self._run_learn_MLN_weights, database, save_name,
+                                                       dependencies=dependencies)]
+                if not skip_inference:
+                    dependencies = [scheduler.add_task(f'inference {method} {database} {query_predicate}'.rstrip(),
+                                                       self.run_inference_on_MLN_by_method, database.rstrip('.db'),
+                                                       database, query_predicate or query_predicates, method,
+                                                       dependencies=dependencies)
+                                    for query_predicate in self._get_individual_query_predicates()]
+                if not skip_evaluation:
+                    scheduler.add_task(f'evaluation {method} {database}', self._evaluate_MLN, database, method,
+                                       dependencies=dependencies)
+
+        return scheduler
+
+    def _get_individual_query_predicates(self):
+        """
+        The query predicates that inference is run on separately, or [None] if inference is run on all of them at once.
+        """
+        if self.individual_query_predicates:
+            return self.get_query_predicates().split(',')
+        else:
+            return [None]
+
+    def _get_methods(self):
+        methods = []
+        if not self.only_FASTER:
+            methods.append('alchemy')
+        if not self.only_ALCHEMY:
+            methods.append('FASTER')
+
+        return methods
+
     def structure_learn_MLNs(self):
         if not self.only_FASTER:
             self._structure_learn_with_alchemy()
@@ -253,22 +421,32 @@ class MLNEvaluator(object):
         print(".", end="")
 
     def _run_alchemy_random_walks(self):
-        motif_times = []
-        for database in self.database_files:
-            save_name = database.rstrip('.db') + self.alchemy_suffix
-            random_walks_command = f'{self.lsm_dir}/rwl/rwl {self.data_dir}/{self.info_file} {self.data_dir}/' \
-                                   f'{database} {self.data_dir}/{self.type_file} {self.config["num_walks"]} ' \
-                                   f'{self.config["max_length"]} 0.05 0.1 {self.config["theta_hit"]} ' \
-                                   f'{self.config["theta_sym"]} {self.config["theta_js"]} {self.config["num_top"]} 1 ' \
-                                   f'{self.results_dir}/{save_name}.ldb {self.results_dir}/{save_name}.uldb {self.results_dir}/' \
-                                   f'{save_name}.srcnclusts > {self.log_dir}/{save_name}-rwl.log'
-            time0 = time.time()
-            subprocess.call(random_walks_command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, shell=True)
-            time1 = time.time()
-            motif_times.append(time1 - time0)
-            self._log_to_master_file(method='alchemy', quantity='motif_time', database=database, result=time1 - time0)
-
-        self._log_to_master_file(method='alchemy', quantity='motif_time',
+        motif_times = [self._run_alchemy_random_walks_on_database(database) for database in self.database_files]
+        self._log_average_motif_time('alchemy', motif_times)
+
+    def _run_alchemy_random_walks_on_database(self, database):
+        save_name = database.rstrip('.db') + self.alchemy_suffix
+        random_walks_command = f'{self.lsm_dir}/rwl/rwl {self.data_dir}/{self.info_file} {self.data_dir}/' \
+                               f'{database} {self.data_dir}/{self.type_file} {self.config["num_walks"]} ' \
+                               f'{self.config["max_length"]} 0.05 0.1 {self.config["theta_hit"]} ' \
+                               f'{self.config["theta_sym"]} {self.config["theta_js"]} {self.config["num_top"]} 1 ' \
+                               f'{self.results_dir}/{save_name}.ldb {self.results_dir}/{save_name}.uldb {self.results_dir}/' \
+                               f'{save_name}.srcnclusts > {self.log_dir}/{save_name}-rwl.log'
+        result = self._call('rwl', random_walks_command, method='alchemy', database=database,
+                            input_files=[f'{self.data_dir}/{self.info_file}', f'{self.data_dir}/{database}',
+                                         f'{self.data_dir}/{self.type_file}'],
+                            output_files=[f'{self.results_dir}/{save_name}{extension}'
+                                          for extension in ['.ldb', '.uldb', '.srcnclusts']] +
+                                         [f'{self.log_dir}/{save_name}-rwl.log'],
+                            binaries=[f'{self.lsm_dir}/rwl/rwl'])
+        self._log_to_master_file(method='alchemy', quantity='motif_time', database=database, result=result.wall_time)
+        self._log_to_master_file(method='alchemy', quantity='motif_cpu_time', database=database,
+                                 result=result.cpu_time)
+
+        return result.wall_time
+
+    def _log_average_motif_time(self, method, motif_times):
+        self._log_to_master_file(method=method, quantity='motif_time',
                                  database='database average and std:',
                                  result=f'{round(float(np.mean(motif_times)), 4)} +/- {round(float(np.std(motif_times)), 4)}')
 
@@ -281,31 +459,25 @@ class MLNEvaluator(object):
         print(".", end="")
 
     def _run_FASTER_random_walks(self):
-        motif_times = []
-        for database in self.database_files:
-            save_name = database.rstrip('.db') + self.FASTER_suffix
-            FASTER_command = f'{self.faster_dir}/cmake-build-debug/FASTER {self.data_dir}/{database} {self.data_dir}/' \
-                             f'{self.info_file} {self.results_dir}/{save_name} {self.FASTER_parameters[0]} ' \
-                             f'{self.FASTER_parameters[1]} {self.FASTER_parameters[2]} ' \
-                             f'{self.FASTER_parameters[3]} {self.FASTER_parameters[4]}'
-            time0 = time.time()
-            try:
-                subprocess.call(FASTER_command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, shell=True,
-                               timeout=self.FASTER_timeout)
-            except:
-                self._log_to_master_file(method='FASTER',
-                                         quantity='errors',
-                                         database=database,
-                                         result=f"FASTER timed out running "
-                                                f"motif finding on this database after {self.FASTER_timeout}s")
+        motif_times = [self._run_FASTER_random_walks_on_database(database) for database in self.database_files]
+        self._log_average_motif_time('FASTER', motif_times)
 
-            time1 = time.time()
-            motif_times.append(time1-time0)
-            self._log_to_master_file(method='FASTER', quantity='motif_time', database=database, result=time1-time0)
-
-        self._log_to_master_file(method='FASTER', quantity='motif_time',
-                                 database='database average and std:',
-                                 result=f'{round(float(np.mean(motif_times)), 4)} +/- {round(float(np.std(motif_times)), 4)}')
+    def _run_FASTER_random_walks_on_database(self, database):
+        save_name = database.rstrip('.db') + self.FASTER_suffix
+        FASTER_command = f'{self.faster_dir}/cmake-build-debug/FASTER {self.data_dir}/{database} {self.data_dir}/' \
+                         f'{self.info_file} {self.results_dir}/{save_name} {self.FASTER_parameters[0]} ' \
+                         f'{self.FASTER_parameters[1]} {self.FASTER_parameters[2]} ' \
+                         f'{self.FASTER_parameters[3]} {self.FASTER_parameters[4]}'
+        result = self._call('FASTER', FASTER_command, method='FASTER', database=database,
+                            input_files=[f'{self.data_dir}/{database}', f'{self.data_dir}/{self.info_file}'],
+                            output_files=[f'{self.results_dir}/{save_name}{extension}'
+                                          for extension in ['.ldb', '.uldb', '.srcnclusts']],
+                            binaries=[f'{self.faster_dir}/cmake-build-debug/FASTER'])
+        self._log_to_master_file(method='FASTER', quantity='motif_time', database=database, result=result.wall_time)
+        self._log_to_master_file(method='FASTER', quantity='motif_cpu_time', database=database,
+                                 result=result.cpu_time)
+
+        return result.wall_time
 
 
     def run_inference_on_MLNs(self):
@@ -316,20 +488,22 @@ class MLNEvaluator(object):
         else:
             algorithms = ('alchemy', 'FASTER')
 
-        inference_exp_params = itertools.product(self.database_files[:self.number_to_run], algorithms)
+        inference_exp_params = itertools.product(self.database_files[:self.number_to_run], algorithms,
+                                                 self._get_individual_query_predicates())
 
-        pool = Pool(processes=cpu_count())
-        pool.starmap(self.run_inference_on_MLN_by_method,
-                     [(test_database.rstrip('.db'), test_database, query_predicates, algorithm)
-                      for (test_database, algorithm)
-                      in inference_exp_params])
-        pool.close()
+        with Pool(processes=self.max_workers) as pool:
+            pool.starmap(self.run_inference_on_MLN_by_method,
+                         [(test_database.rstrip('.db'), test_database, query_predicate or query_predicates, algorithm)
+                          for (test_database, algorithm, query_predicate)
+                          in inference_exp_params])
 
     def run_inference_on_MLN_by_method(self, mln: str, test_database: str,
                                        query_predicates: str, method: str):
         mln += self._get_file_suffix_from_method(method)
         prefixed_mln = "NOT"+mln
-        self.run_inference_on_MLN(prefixed_mln, test_database, query_predicates)
+        # when inference is run separately for each query predicate, each writes its own .results files
+        results_suffix = f'.{query_predicates}' if self.individual_query_predicates else ''
+        self.run_inference_on_MLN(prefixed_mln, test_database, query_predicates, results_suffix=results_suffix)
 
     def evaluate_MLNs(self):
         #print('Evaluating')
@@ -338,12 +512,38 @@ class MLNEvaluator(object):
         self.evaluate_MLNs_by_method('FASTER')
 
     def evaluate_MLNs_by_method(self, method):
-        pool = Pool(processes=cpu_count())
-        pool.starmap(self._evaluate_MLN, [(database, method) for database in self.database_files[:self.number_to_run]])
+        with Pool(processes=self.max_workers) as pool:
+            list_of_metrics = pool.starmap(self._evaluate_MLN, [(database, method) for database in self.database_files[:self.number_to_run]])
+        self._log_inference_summary(method, list_of_metrics)
+
+    def _log_inference_summary(self, method, list_of_metrics):
+        """
+        Logs the mean and standard deviation, across test databases, of the CLL and AUC of each predicate and overall.
+        """
+        summaries = {'overall': [(metrics['CLL'], metrics['AUC']) for metrics in list_of_metrics]}
+        for metrics in list_of_metrics:
+            for predicate, predicate_metrics in metrics['predicates'].items():
+                summaries.setdefault(predicate, []).append((predicate_metrics['CLL'], predicate_metrics['AUC']))
+
+        for name, values in summaries.items():
+            CLLs, AUCs = np.array(values).T
+            self._log_to_master_file(method=method, quantity='inference_summary', database=name,
+                                     result=f'CLL {round(float(np.mean(CLLs)), 4)} +/- {round(float(np.std(CLLs)), 4)} '
+                                            f'AUC {round(float(np.nanmean(AUCs)), 4)} +/- {round(float(np.nanstd(AUCs)), 4)} '
+                                            f'over {len(values)} test databases')
 
     def _evaluate_MLN(self, test_database, method):
-        CLL = self.compute_CLL_on_test_database(method, test_database)
-        self._log_to_master_file(method=method, quantity='inference_result', database='NOT'+test_database, result=CLL, test_database=test_database)
+        if self.verbose:
+            print(f' Evaluating {method} on {test_database}...')
+        metrics = self.compute_metrics_on_test_database(method, test_database)
+        self._log_to_master_file(method=method, quantity='inference_result', database='NOT'+test_database, result=metrics['CLL'], test_database=test_database)
+        self._log_to_master_file(method=method, quantity='inference_AUC', database='NOT'+test_database, result=metrics['AUC'], test_database=test_database)
+        for predicate, predicate_metrics in metrics['predicates'].items():
+            self._log_to_master_file(method=method, quantity='predicate_inference_result',
+                                     database='NOT'+test_database,
+                                     result=f"{predicate} CLL {predicate_metrics['CLL']} AUC {predicate_metrics['AUC']} "
+                                            f"#atoms {predicate_metrics['number_of_atoms']}",
+                                     test_database=test_database)
         print(".", end="")
 
         average_formula_length, max_formula_length, number_of_formulas = self.compute_average_formula_length_and_number_of_formulas(test_database, method)
@@ -355,6 +555,8 @@ class MLNEvaluator(object):
                                         f"max formula length {max_formula_length}",
                                  )
 
+        return metrics
+
     def _run_rest_of_structure_learning_pipeline(self, method):
         alchemy_structure_learning_times = []
         FASTER_structure_learning_times = []
@@ -363,8 +565,8 @@ class MLNEvaluator(object):
             for database in self.database_files[:self.number_to_run]:
                 self._rest_of_pipeline_on_single_dataset(database, method)
         else:
-            pool = Pool(processes=cpu_count())
-            pool.starmap(self._rest_of_pipeline_on_single_dataset,
+            with Pool(processes=self.max_workers) as pool:
+                pool.starmap(self._rest_of_pipeline_on_single_dataset,
                              [(database, method)
                               for database in self.database_files[:self.number_to_run]])
 
@@ -382,20 +584,25 @@ class MLNEvaluator(object):
         elif algorithm == 'FASTER':
             save_name = database.rstrip('.db') + self.FASTER_suffix
             suffix = self.FASTER_suffix
-        time0 = time.time()
-        self._run_get_communities(database, save_name, suffix)
-        # print(' Paths...')
-        self._run_path_finding(save_name)
-        # print(' Finding formulas...')
-        self._run_create_MLN_rules(database, save_name, suffix)
-        # print(' Calculating weights..')
-        self._run_learn_MLN_weights(database, save_name)
-        time1 = time.time()
+        # the wall times of the programs (of the runs that were cached, for outputs restored from the artifact cache)
+        structure_learning_time = 0
+        if self.verbose:
+            print(f' Getting Communities ({algorithm})...')
+        structure_learning_time += self._run_get_communities(database, save_name, suffix).wall_time
+        if self.verbose:
+            print(f' Getting Paths ({algorithm})...')
+        structure_learning_time += self._run_path_finding(save_name).wall_time
+        if self.verbose:
+            print(f' Finding formulas ({algorithm})...')
+        structure_learning_time += self._run_create_MLN_rules(database, save_name, suffix).wall_time
+        if self.verbose:
+            print(f' Calculating weights ({algorithm})...')
+        structure_learning_time += self._run_learn_MLN_weights(database, save_name).wall_time
 
         self._log_to_master_file(method=algorithm, quantity='structure_learning_time', database='all others',
-                                 result=time1-time0, test_database=database)
+                                 result=structure_learning_time, test_database=database)
 
-        return algorithm, time1-time0, database
+        return algorithm, structure_learning_time, database
 
     # def _append_structure_learning_time(self, method, result, database):
     #     global alchemy_structure_learning_times
@@ -421,19 +628,28 @@ class MLNEvaluator(object):
                                file.endswith((".ldb", ".uldb", '.srcnclusts'))]
             self._delete_files(generated_files, parent_directory=self.data_dir)
 
-    def run_inference_on_MLN(self, mln: str, test_database: str, query_predicates: str):
+    def run_inference_on_MLN(self, mln: str, test_database: str, query_predicates: str, results_suffix=''):
         """
         Runs the Alchemy inference program on a specified MLN, given evidence databases.
         """
         mln_to_evaluate = os.path.join(self.mln_dir, mln + '-rules-out.mln')
-        inference_file = os.path.join(self.inference_calculations_dir, mln + "." + test_database.strip('.db') + '.results')
+        inference_file = os.path.join(self.inference_calculations_dir, mln + "." + test_database.strip('.db') + '.results' + results_suffix)
         inference_command_negative = f'{self.infer_dir}/infer -i {mln_to_evaluate} -r {inference_file}.negative -e ' \
-                                     f'{os.path.join(self.data_dir, test_database)} -q {query_predicates} -maxSteps 300'
+                                     f'{os.path.join(self.data_dir, test_database)} -q {query_predicates} {self.inference_arguments}'
         inference_command_positive = f'{self.infer_dir}/infer -i {mln_to_evaluate} -r {inference_file}.positive -e ' \
-                                     f'{os.path.join(self.data_dir, test_database)} -q {query_predicates} -maxSteps 300 -queryEvidence 1'
-        subprocess.call(inference_command_positive, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, shell=True)
+                                     f'{os.path.join(self.data_dir, test_database)} -q {query_predicates} {self.inference_arguments} -queryEvidence 1'
+        evidence_database = os.path.join(self.data_dir, test_database)
+        if self.verbose:
+            print(f' Running +ve inference on {mln}...')
+        self._call('infer', inference_command_positive, method=self._get_method_from_file_name(mln),
+                   database=f'{mln}.{test_database}', input_files=[mln_to_evaluate, evidence_database],
+                   output_files=[f'{inference_file}.positive'], binaries=[f'{self.infer_dir}/infer'])
         print(".", end="")
-        subprocess.call(inference_command_negative, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, shell=True)
+        if self.verbose:
+            print(f' Running -ve inference on {mln}...')
+        self._call('infer', inference_command_negative, method=self._get_method_from_file_name(mln),
+                   database=f'{mln}.{test_database}', input_files=[mln_to_evaluate, evidence_database],
+                   output_files=[f'{inference_file}.negative'], binaries=[f'{self.infer_dir}/infer'])
         print(".", end="")
 
     def get_query_predicates(self):
@@ -445,7 +661,12 @@ class MLNEvaluator(object):
                 Friends(person, person)
         e.g.    Smokes(person)             returns    'Friends, Smokes, Cancer'
                 Cancer(person)
+
+        If the dataset profile lists its query predicates, those are returned instead.
         """
+        if self.query_predicates is not None:
+            return ','.join(self.query_predicates)
+
         file = open(os.path.join(self.data_dir, self.info_file), 'r')
         query_atoms = []
         for line in file.readlines():
@@ -459,26 +680,19 @@ class MLNEvaluator(object):
         return query_atom_string
 
     def compute_CLL_on_test_database(self, method, test_database):
+        return self.compute_metrics_on_test_database(method, test_database)['CLL']
+
+    def compute_metrics_on_test_database(self, method, test_database):
+        """
+        The overall and per-predicate CLL and AUC on test_database of the MLN learned from the other databases.
+        """
         file_suffix = self._get_file_suffix_from_method(method)
         results_new_file = 'NOT'+test_database.rstrip('.db') + f'{file_suffix}.{test_database.strip(".db")}.results'
-        negative_results = pd.read_csv(os.path.join(self.inference_calculations_dir, results_new_file + '.negative'), delimiter=' ',
-                                       names=['Ground_Atom', 'prob'])
-
-        positive_results = pd.read_csv(os.path.join(self.inference_calculations_dir, results_new_file + '.positive'), delimiter=' ',
-                                       names=['Ground_Atom', 'prob'])
-        negative_probability_values = []
-        positive_probability_values = []
-        for ground_atom in negative_results['Ground_Atom']:
-            negative_probability_values.append(
-                1 - negative_results.loc[negative_results['Ground_Atom'] == ground_atom].iloc[0]['prob'])
-        for ground_atom in positive_results['Ground_Atom']:
-            positive_probability_values.append(
-                positive_results.loc[positive_results['Ground_Atom'] == ground_atom].iloc[0]['prob'])
-
-        probability_values = negative_probability_values + positive_probability_values
-        average_CLL = np.log(np.mean(probability_values))
-
-        return average_CLL
+        results_files = [os.path.join(self.inference_calculations_dir, results_new_file +
+                                      (f'.{query_predicate}' if query_predicate is not None else ''))
+                         for query_predicate in self._get_individual_query_predicates()]
+        return compute_CLL(positive_results_file=[results_file + '.positive' for results_file in results_files],
+                           negative_results_file=[results_file + '.negative' for results_file in results_files])
 
     def compute_average_formula_length_and_number_of_formulas(self, database_file, method):
         file_suffix = self._get_file_suffix_from_method(method)
@@ -516,13 +730,25 @@ class MLNEvaluator(object):
         get_communities_command = f'{self.lsm_dir}/getcom/getcom {training_files_string} {self.data_dir}/' \
                                   f'{self.info_file} 10 {self.results_dir}/NOT{save_name}.comb.ldb NOOP true 1 > ' \
                                   f'{self.log_dir}/NOT{save_name}-getcom.log '
-        subprocess.call(get_communities_command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, shell=True)
+        return self._call('getcom', get_communities_command, method=self._get_method_from_file_name(save_name),
+                          database=f'NOT{save_name}',
+                          input_files=training_files_string.replace(' ', ',').split(',') +
+                                      [f'{self.data_dir}/{self.info_file}'],
+                          output_files=[f'{self.results_dir}/NOT{save_name}.comb.ldb',
+                                        f'{self.log_dir}/NOT{save_name}-getcom.log'],
+                          binaries=[f'{self.lsm_dir}/getcom/getcom'])
 
     def _run_path_finding(self, save_name):
         path_finding_command = f'{self.lsm_dir}/pfind2/pfind {self.results_dir}/NOT{save_name}.comb.ldb 5 0 5 -1.0 ' \
                                f'{self.data_dir}/{self.info_file} {self.results_dir}/NOT{save_name}.rules > ' \
                                f'{self.log_dir}/NOT{save_name}-findpath.log'
-        subprocess.call(path_finding_command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, shell=True)
+        return self._call('pfind', path_finding_command, method=self._get_method_from_file_name(save_name),
+                          database=f'NOT{save_name}',
+                          input_files=[f'{self.results_dir}/NOT{save_name}.comb.ldb',
+                                       f'{self.data_dir}/{self.info_file}'],
+                          output_files=[f'{self.results_dir}/NOT{save_name}.rules',
+                                        f'{self.log_dir}/NOT{save_name}-findpath.log'],
+                          binaries=[f'{self.lsm_dir}/pfind2/pfind'])
 
     def _run_create_MLN_rules(self, database, save_name, suffix):
         db_training_files = ','.join([os.path.join(self.data_dir, database_file)
@@ -539,7 +765,16 @@ class MLNEvaluator(object):
                                    f'{self.lsm_dir}/createrules/tmpdir 0.5 0.1 0.1 100 5 100 1000 5 {self.mln_dir}/' \
                                    f'NOT{save_name}-rules.mln 1 - - true false 40 > {self.log_dir}/' \
                                    f'NOT{save_name}-createrules.log'
-        subprocess.call(create_mln_rules_command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, shell=True)
+        return self._call('createrules', create_mln_rules_command, method=self._get_method_from_file_name(save_name),
+                          database=f'NOT{save_name}',
+                          input_files=[f'{self.results_dir}/NOT{save_name}.rules'] + db_training_files.split(',') +
+                                      [f'{self.results_dir}/NOT{save_name}.comb.ldb'] +
+                                      uldb_training_files.split(',') +
+                                      [f'{self.data_dir}/{self.info_file}'],
+                          output_files=[f'{self.mln_dir}/NOT{save_name}-rules.mln',
+                                        f'{self.log_dir}/NOT{save_name}-createrules.log'],
+                          binaries=[f'{self.lsm_dir}/createrules/createrules',
+                                    f'{self.lsm_dir}/alchemy30/bin/learnwts'])
 
     def _run_learn_MLN_weights(self, database, test_database):
         db_training_files = ','.join([os.path.join(self.data_dir, database_file)
@@ -548,7 +783,45 @@ class MLNEvaluator(object):
         learn_mln_weights_command = f'{self.lsm_dir}/alchemy30/bin/learnwts -g -i {self.mln_dir}/' \
                                     f'NOT{test_database}-rules.mln -o {self.mln_dir}/NOT{test_database}-rules-out.mln -t ' \
                                     f'{db_training_files}'
-        subprocess.call(learn_mln_weights_command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, shell=True)
+        return self._call('learnwts', learn_mln_weights_command, method=self._get_method_from_file_name(test_database),
+                          database=f'NOT{test_database}',
+                          input_files=[f'{self.mln_dir}/NOT{test_database}-rules.mln'] + db_training_files.split(','),
+                          output_files=[f'{self.mln_dir}/NOT{test_database}-rules-out.mln'],
+                          binaries=[f'{self.lsm_dir}/alchemy30/bin/learnwts'])
+
+    def _call(self, program, command, input_files, output_files, binaries=(), method=None, database=None):
+        """
+        Runs an external program through the shell, reusing its cached outputs if a cache directory was given (and the
+        program is not stochastic, see stochastic_programs), and logs the wall time, CPU time and peak memory of the
+        run to the master results file (quantity "process_resources", one JSON object per run, marked "cached" if the
+        outputs were restored from the cache, in which case the resources are those of the run that was cached). If the
+        program runs for longer than its timeout, or exits with a non-zero return code, the error is logged (quantity
+        "errors") and the pipeline carries on, whichever step it is.
+
+        :returns: the ProcessResult of the run
+        """
+        timeout = self.timeouts.get(program)
+        memory_limit = self.memory_limits.get(program)
+        if self.artifact_cache is None or \
+                (program in self.stochastic_programs and not self.cache_stochastic_programs):
+            result = run_process(command, timeout=timeout, memory_limit=memory_limit)
+        else:
+            result = self.artifact_cache.call(command, input_files=input_files, output_files=output_files,
+                                              binaries=binaries, timeout=timeout, memory_limit=memory_limit)
+
+        self._log_to_master_file(method=method, quantity='process_resources', database=database,
+                                 result=json.dumps({'program': program, **result.as_dict()}))
+        if result.timed_out:
+            self._log_to_master_file(method=method, quantity='errors', database=database,
+                                     result=f'{program} timed out after {timeout}s')
+        elif result.return_code != 0:
+            self._log_to_master_file(method=method, quantity='errors', database=database,
+                                     result=f'{program} exited with return code {result.return_code}')
+
+        return result
+
+    def _get_method_from_file_name(self, file_name):
+        return 'FASTER' if file_name.endswith(self.FASTER_suffix) else 'alchemy'
 
     def _get_file_suffix_from_method(self, method):
         if method == 'alchemy':
@@ -571,7 +844,8 @@ class MLNEvaluator(object):
                 print(f'Warning: File Not Found {path_to_file}')
 
     def _log_to_master_file(self, method, quantity, database, result, test_database=None):
-        # quantity can be "motif_time", "structure_learning_time", "mln_statistics", "inference_results" or "errors"
+        # quantity can be "motif_time", "motif_cpu_time", "process_resources", "structure_learning_time",
+        # "mln_statistics", "inference_results", "inference_AUC", "predicate_inference_result" or "errors"
         if self.master_results_file is not None:
             with open(self.master_results_file+f"_{method}_{quantity}", "a") as f:
                 if test_database is not None:
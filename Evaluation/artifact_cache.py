@@ -0,0 +1,185 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+from process_runner import ProcessResult, run_process
+
+
+class ArtifactCache(object):
+    """
+    Content-addressed cache of the files written by the external programs of the evaluation pipeline.
+
+    Each call of a program is keyed by a hash of its command line and its output files (with directories replaced by
+    aliases, so that the same step run from a different experiment directory has the same key), the contents of its
+    input files and the contents of the program binaries. If the outputs of a call with the same key are in the cache,
+    they are copied to where the program would have written them instead of running it. Since the outputs of one step
+    are the inputs of the next, changing a parameter only reruns the steps whose inputs (or command line) actually
+    change.
+
+    The cache assumes that a program gives the same outputs whenever it is called with the same key. A program that
+    uses random numbers does not (unless its seed is part of its command line), and reusing its cached outputs would
+    make repeated runs of it identical, so such programs should be run without the cache (see
+    MLNEvaluator.stochastic_programs).
+
+    Example usage:
+        cache = ArtifactCache('/experiments/.artifact_cache', path_aliases={'/experiments/imdb': '{results_dir}'})
+        cache.call(f'{lsm_dir}/pfind2/pfind {comb_ldb} 5 0 5 -1.0 {info} {rules} > {log}',
+                   input_files=[comb_ldb, info], output_files=[rules, log], binaries=[f'{lsm_dir}/pfind2/pfind'])
+    """
+
+    def __init__(self, cache_dir: str, path_aliases=None):
+        self.cache_dir = cache_dir
+        # dict(path: alias), longest paths first so that a directory is not replaced inside one of its subdirectories
+        self.path_aliases = dict(sorted((path_aliases or {}).items(), key=lambda item: -len(item[0])))
+        self.hits = 0
+        self.misses = 0
+        self._file_hashes = {}  # dict((path, modification time, size): hash), so each file is read once
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def __getstate__(self):
+        # the cache is pickled with the MLNEvaluator that owns it when its steps are run in a Pool; the lock only
+        # guards the state shared by the threads of one process, and the atomic rename in _store already makes
+        # storing safe across processes, so each process gets a lock of its own
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def call(self, command: str, input_files: list[str], output_files: list[str], binaries=(), timeout=None,
+             memory_limit=None):
+        """
+        Runs command through the shell with run_process, unless its outputs are cached.
+
+        :returns: the ProcessResult of the command, or, if its outputs were restored from the cache, the ProcessResult
+                  of the run that was cached (with cached set to True)
+        """
+        key = self.key(command, input_files, binaries, output_files)
+        if key is None:
+            # an input file is missing, so the outputs cannot be trusted to be reproducible
+            return run_process(command, timeout=timeout, memory_limit=memory_limit)
+
+        result = self._restore(key, command, output_files)
+        if result is not None:
+            with self._lock:
+                self.hits += 1
+            return result
+
+        with self._lock:
+            self.misses += 1
+        result = run_process(command, timeout=timeout, memory_limit=memory_limit)
+        if result.return_code == 0:
+            self._store(key, command, output_files, result)
+
+        return result
+
+    def key(self, command: str, input_files: list[str], binaries=(), output_files=()):
+        """
+        The key of a call of command, or None if one of its input files or binaries does not exist.
+        """
+        file_hashes = []
+        for path in list(input_files) + list(binaries):
+            file_hash = self._file_hash(path)
+            if file_hash is None:
+                return None
+            file_hashes.append(file_hash)
+
+        return hashlib.sha256(json.dumps({'command': self._normalise(command),
+                                          'output_files': [self._normalise(path) for path in output_files],
+                                          'file_hashes': file_hashes}).encode()).hexdigest()
+
+    def _normalise(self, command: str):
+        for path, alias in self.path_aliases.items():
+            command = command.replace(path, alias)
+
+        return command
+
+    def _file_hash(self, path: str):
+        try:
+            status = os.stat(path)
+        except OSError:
+            return None
+
+        file_key = (path, status.st_mtime_ns, status.st_size)
+        with self._lock:
+            file_hash = self._file_hashes.get(file_key)
+        if file_hash is None:
+            sha256 = hashlib.sha256()
+            with open(path, 'rb') as file:
+                for block in iter(lambda: file.read(1 << 20), b''):
+                    sha256.update(block)
+            file_hash = sha256.hexdigest()
+            with self._lock:
+                self._file_hashes[file_key] = file_hash
+
+        return file_hash
+
+    def _entry_dir(self, key: str):
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def _read_entry(self, key: str, output_files: list[str]):
+        """
+        The entry of the call, or None if there is none, or if it does not hold every one of these output files.
+        """
+        entry_dir = self._entry_dir(key)
+        try:
+            with open(os.path.join(entry_dir, 'entry.json')) as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if entry.get('output_files') != [self._normalise(output_file) for output_file in output_files] or \
+                not all(os.path.exists(os.path.join(entry_dir, f'output{output_index}'))
+                        for output_index in range(len(output_files))):
+            return None
+
+        return entry
+
+    def _restore(self, key: str, command: str, output_files: list[str]):
+        """
+        Copies the cached outputs of the call to output_files, returning the ProcessResult of the run that was cached,
+        or None if the call has no complete entry.
+        """
+        entry = self._read_entry(key, output_files)
+        if entry is None:
+            return None
+
+        entry_dir = self._entry_dir(key)
+        for output_index, output_file in enumerate(output_files):
+            shutil.copyfile(os.path.join(entry_dir, f'output{output_index}'), output_file)
+
+        return ProcessResult(command=command, **entry['result'], cached=True)
+
+    def _store(self, key: str, command: str, output_files: list[str], result: ProcessResult):
+        if not all(os.path.exists(output_file) for output_file in output_files):
+            return None
+
+        entry_dir = self._entry_dir(key)
+        os.makedirs(os.path.dirname(entry_dir), exist_ok=True)
+        # copy into a temporary directory first, so that an interrupted run never leaves a partial entry behind
+        temporary_dir = tempfile.mkdtemp(dir=os.path.dirname(entry_dir), suffix='.tmp')
+        for output_index, output_file in enumerate(output_files):
+            shutil.copyfile(output_file, os.path.join(temporary_dir, f'output{output_index}'))
+        # the entry records its output files, so that it is only restored if it holds all of them, and the resources
+        # used by the run
+        with open(os.path.join(temporary_dir, 'entry.json'), 'w') as file:
+            json.dump({'command': self._normalise(command),
+                       'output_files': [self._normalise(output_file) for output_file in output_files],
+                       'result': {name: getattr(result, name) for name in ['return_code', 'wall_time', 'user_time',
+                                                                           'system_time', 'max_rss', 'timed_out',
+                                                                           'timeout', 'memory_limit']}}, file)
+
+        with self._lock:
+            if os.path.exists(entry_dir) and self._read_entry(key, output_files) is None:
+                # an incomplete entry, e.g. written by an earlier version of the cache, is replaced
+                shutil.rmtree(entry_dir, ignore_errors=True)
+        try:
+            os.rename(temporary_dir, entry_dir)
+        except OSError:
+            # the same step was stored concurrently by another task
+            shutil.rmtree(temporary_dir, ignore_errors=True)
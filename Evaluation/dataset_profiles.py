@@ -0,0 +1,55 @@
+class DatasetProfile(object):
+    """
+    What the evaluator needs to know about a dataset, beyond where it is stored: its fold layout (one .db file per
+    fold, sharing an .info and a .type file), which predicates are queried during inference, and how inference is run.
+
+    Example usage:
+        evaluator = MLNEvaluator(profile='uw_cse', data_dir='/data/uw_cse', ...)
+    """
+
+    def __init__(self, name: str, database_files: list[str], info_file: str, type_file: str,
+                 query_predicates=None, individual_query_predicates=False, inference_arguments='-maxSteps 300',
+                 number_to_run=None):
+        self.name = name
+        self.database_files = database_files        # the .db file of each fold, each tested on in turn
+        self.info_file = info_file
+        self.type_file = type_file
+        self.query_predicates = query_predicates    # list(predicate) queried during inference; if None, every
+                                                    # predicate of the info file is queried
+        self.individual_query_predicates = individual_query_predicates  # if True, inference is run separately for
+                                                                        # each query predicate
+        self.inference_arguments = inference_arguments  # extra command line arguments of Alchemy's infer
+        self.number_to_run = number_to_run          # if set, only the first number_to_run folds are tested on
+
+
+profiles = {
+    'imdb': DatasetProfile(name='imdb',
+                           database_files=['imdb.1.db', 'imdb.2.db', 'imdb.3.db', 'imdb.4.db', 'imdb.5.db'],
+                           info_file='imdb.info',
+                           type_file='imdb.type'),
+    'old_imdb': DatasetProfile(name='old_imdb',
+                               database_files=['imdb1.db', 'imdb2.db', 'imdb3.db', 'imdb4.db', 'imdb5.db'],
+                               info_file='imdb1.info',
+                               type_file='imdb1.type'),
+    'uw_cse': DatasetProfile(name='uw_cse',
+                             database_files=['ai.db', 'theory.db', 'graphics.db', 'systems.db', 'language.db'],
+                             info_file='ai.info',
+                             type_file='ai.type'),
+    'cora': DatasetProfile(name='cora',
+                           database_files=['cora0_filtered.db', 'cora1_filtered.db', 'cora2_filtered.db'],
+                           info_file='cora.info',
+                           type_file='cora.type',
+                           individual_query_predicates=True),
+}
+
+
+def get_profile(profile):
+    """
+    Returns the DatasetProfile of the given name, or the profile itself if it is already a DatasetProfile.
+    """
+    if isinstance(profile, DatasetProfile):
+        return profile
+    if profile not in profiles:
+        raise ValueError(f"Unknown dataset profile {profile}. Expected one of {list(profiles.keys())}.")
+
+    return profiles[profile]
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+
+def read_results_file(path: str):
+    """
+    Reads a .results file written by Alchemy's infer, with one ground atom and its marginal probability on each line,
+    e.g.
+        Actor(Person1) 0.9985
+        WorkedUnder(Person1,Person2) 0.0005
+
+    :returns: a DataFrame with columns Ground_Atom and prob, in file order
+    """
+    return pd.read_csv(path, sep=' ', header=None, names=['Ground_Atom', 'prob'], usecols=[0, 1],
+                       dtype={'Ground_Atom': str, 'prob': np.float64}, engine='c')
+
+
+def compute_CLL(positive_results_file, negative_results_file):
+    """
+    Computes the conditional log-likelihood (CLL) and area under the ROC curve (AUC) of the ground atoms of the
+    positive (true) and negative (false) .results files of a test database, overall and per predicate. Either may be a
+    list of .results files (e.g. one per query predicate), which are read as if they were one file.
+
+    The probability of a ground atom being correctly predicted is its marginal probability if it is in the positive
+    file, and one minus its marginal probability if it is in the negative file. The CLL of a set of ground atoms is the
+    log of the mean probability of a correct prediction. If a ground atom appears more than once in a file, each
+    appearance takes the probability of its first appearance.
+
+    The AUC is the probability that a randomly chosen true atom has a higher marginal probability than a randomly chosen
+    false atom (ties counting one half), or NaN if there are no true or no false atoms.
+
+    :returns: dict('CLL': float, 'AUC': float, 'number_of_atoms': int,
+                   'predicates': dict(predicate: dict('CLL': float, 'AUC': float, 'number_of_atoms': int)))
+    """
+    results = []
+    for results_file, is_true in [(negative_results_file, False), (positive_results_file, True)]:
+        if isinstance(results_file, str):
+            results_file = [results_file]
+        file_results = pd.concat([read_results_file(path) for path in results_file], ignore_index=True)
+        file_results['prob'] = file_results.groupby('Ground_Atom', sort=False)['prob'].transform('first')
+        file_results['is_true'] = is_true
+        results.append(file_results)
+    results = pd.concat(results, ignore_index=True)
+
+    results['predicate'] = results['Ground_Atom'].str.partition('(')[0]
+    results['correct_prob'] = np.where(results['is_true'], results['prob'], 1 - results['prob'])
+    # ranks are shared by tied probabilities, as required by the Mann-Whitney form of the AUC
+    results['rank'] = results['prob'].rank(method='average')
+    results['predicate_rank'] = results.groupby('predicate', sort=False)['prob'].rank(method='average')
+
+    metrics = _metrics(results['correct_prob'].to_numpy(), results['is_true'].to_numpy(), results['rank'].to_numpy())
+    metrics['predicates'] = {predicate: _metrics(predicate_results['correct_prob'].to_numpy(),
+                                                 predicate_results['is_true'].to_numpy(),
+                                                 predicate_results['predicate_rank'].to_numpy())
+                             for predicate, predicate_results in results.groupby('predicate', sort=True)}
+
+    return metrics
+
+
+def _metrics(correct_probabilities: np.ndarray, is_true: np.ndarray, ranks: np.ndarray):
+    number_of_true_atoms = int(is_true.sum())
+    number_of_false_atoms = len(is_true) - number_of_true_atoms
+    if number_of_true_atoms and number_of_false_atoms:
+        AUC = (ranks[is_true].sum() - number_of_true_atoms * (number_of_true_atoms + 1) / 2) / \
+              (number_of_true_atoms * number_of_false_atoms)
+    else:
+        AUC = float('nan')
+
+    return {'CLL': float(np.log(np.mean(correct_probabilities))),
+            'AUC': float(AUC),
+            'number_of_atoms': len(correct_probabilities)}
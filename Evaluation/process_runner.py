@@ -0,0 +1,99 @@
+import os
+import signal
+import subprocess
+import threading
+import time
+
+
+class ProcessResult(object):
+    """
+    The resources used by one run of an external program, as reported by the kernel when the program exited.
+    """
+
+    def __init__(self, command: str, return_code: int, wall_time: float, user_time: float, system_time: float,
+                 max_rss: int, timed_out=False, timeout=None, memory_limit=None, cached=False):
+        self.command = command
+        self.return_code = return_code      # negative if the program was killed by a signal, as in subprocess
+        self.wall_time = wall_time          # seconds
+        self.user_time = user_time          # CPU seconds in user mode, of the program and the processes it waited for
+        self.system_time = system_time      # CPU seconds in kernel mode, likewise
+        self.max_rss = max_rss              # upper bound on the peak resident set size of the program, bytes (see
+                                            # run_process)
+        self.timed_out = timed_out
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.cached = cached                # True if the outputs were restored from an ArtifactCache instead, in which
+                                            # case the resources are those of the run that was cached
+
+    @property
+    def cpu_time(self):
+        return self.user_time + self.system_time
+
+    def as_dict(self):
+        return {'return_code': self.return_code,
+                'wall_time': round(self.wall_time, 4),
+                'cpu_time': round(self.cpu_time, 4),
+                'user_time': round(self.user_time, 4),
+                'system_time': round(self.system_time, 4),
+                'max_rss_upper_bound': self.max_rss,
+                'timed_out': self.timed_out,
+                'timeout': self.timeout,
+                'memory_limit': self.memory_limit,
+                'cached': self.cached}
+
+
+def run_process(command: str, timeout=None, memory_limit=None):
+    """
+    Runs command through the shell, as subprocess.call(command, shell=True) does with its output discarded, and returns
+    a ProcessResult recording its wall time, CPU time and peak memory (from wait4).
+
+    If the command runs for longer than timeout seconds, it is killed, along with any processes it started. If
+    memory_limit (in bytes) is given, the address space of the command is limited to it (with ulimit -v), so that
+    allocations beyond it fail.
+
+    The peak memory is that reported by the kernel for the shell and the processes it waited for. The shell is forked
+    from this process, and the kernel counts the memory that the shell shared with this process before it exec'd, so
+    the peak memory is only an upper bound on that of the program: it is at least the memory of this process at the
+    moment it forked the shell (and is logged as max_rss_upper_bound).
+    """
+    if memory_limit is not None:
+        command = f'ulimit -v {max(int(memory_limit) // 1024, 1)}; {command}'
+
+    time0 = time.perf_counter()
+    # in a new session, so that on a timeout the shell and everything it started can be killed together
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, shell=True,
+                               start_new_session=True)
+
+    timed_out = threading.Event()
+
+    def kill():
+        timed_out.set()
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    timer = None
+    if timeout is not None:
+        timer = threading.Timer(timeout, kill)
+        timer.start()
+    try:
+        _, status, resource_usage = os.wait4(process.pid, 0)
+    finally:
+        if timer is not None:
+            timer.cancel()
+    wall_time = time.perf_counter() - time0
+
+    # the process has been reaped by wait4, so Popen must not wait for it again
+    process.returncode = os.waitstatus_to_exitcode(status)
+
+    return ProcessResult(command=command,
+                         return_code=process.returncode,
+                         wall_time=wall_time,
+                         user_time=resource_usage.ru_utime,
+                         system_time=resource_usage.ru_stime,
+                         # ru_maxrss is in kilobytes on Linux
+                         max_rss=resource_usage.ru_maxrss * 1024,
+                         timed_out=timed_out.is_set(),
+                         timeout=timeout,
+                         memory_limit=memory_limit)
@@ -0,0 +1,99 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from multiprocessing import cpu_count
+
+
+class TaskFailedError(Exception):
+    def __init__(self, failures):
+        self.failures = failures  # dict(task name: exception), the tasks that raised
+
+    def __str__(self):
+        return f'{len(self.failures)} task(s) failed: ' + \
+               ', '.join(f'{name} ({error!r})' for name, error in self.failures.items())
+
+
+class TaskScheduler(object):
+    """
+    Runs a directed acyclic graph of tasks on a bounded pool of worker threads, starting each task as soon as all of
+    the tasks it depends on have finished.
+
+    The tasks of the evaluation pipeline spend nearly all of their time waiting on external programs (rwl, getcom,
+    learnwts, infer, ...), so threads, rather than processes, are enough to run them in parallel.
+
+    A task can only depend on tasks added before it, so the graph is acyclic by construction. If a task raises, the
+    tasks that depend on it (directly or indirectly) are not run, but every other task still is.
+
+    Example usage:
+        scheduler = TaskScheduler(max_workers=4)
+        scheduler.add_task('rwl imdb1', run_random_walks, 'imdb1.db')
+        scheduler.add_task('rwl imdb2', run_random_walks, 'imdb2.db')
+        scheduler.add_task('getcom NOTimdb1', get_communities, 'imdb1.db', dependencies=['rwl imdb2'])
+        results = scheduler.run()
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or cpu_count()
+        self.tasks = {}         # dict(task name: (function, args, kwargs)), in the order the tasks were added
+        self.dependencies = {}  # dict(task name: list(task name)), the tasks each task waits for
+        self.results = {}       # dict(task name: result), of the tasks that have finished
+        self.failures = {}      # dict(task name: exception), of the tasks that raised
+        self.skipped = []       # list(task name), the tasks not run because a task they depend on failed
+
+    def add_task(self, name: str, function, *args, dependencies=(), **kwargs):
+        if name in self.tasks:
+            raise ValueError(f"Cannot add task. A task named {name} already exists.")
+        unknown_dependencies = [dependency for dependency in dependencies if dependency not in self.tasks]
+        if unknown_dependencies:
+            raise ValueError(f"Cannot add task {name}. It depends on tasks that have not been added: "
+                             f"{unknown_dependencies}.")
+
+        self.tasks[name] = (function, args, kwargs)
+        self.dependencies[name] = list(dependencies)
+
+        return name
+
+    def run(self, raise_on_failure=False):
+        """
+        Runs every task, returning a dictionary of the result of each task that finished.
+        """
+        dependents = {name: [] for name in self.tasks}
+        number_of_unfinished_dependencies = {}
+        for name, dependencies in self.dependencies.items():
+            number_of_unfinished_dependencies[name] = len(dependencies)
+            for dependency in dependencies:
+                dependents[dependency].append(name)
+
+        ready = [name for name in self.tasks if number_of_unfinished_dependencies[name] == 0]
+        running = {}  # dict(future: task name)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while ready or running:
+                for name in ready:
+                    function, args, kwargs = self.tasks[name]
+                    running[executor.submit(function, *args, **kwargs)] = name
+                ready = []
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    if future.exception() is not None:
+                        self.failures[name] = future.exception()
+                        self._skip_dependents_of(name, dependents)
+                        continue
+
+                    self.results[name] = future.result()
+                    for dependent in dependents[name]:
+                        number_of_unfinished_dependencies[dependent] -= 1
+                        if number_of_unfinished_dependencies[dependent] == 0 and dependent not in self.skipped:
+                            ready.append(dependent)
+
+        if raise_on_failure and self.failures:
+            raise TaskFailedError(self.failures)
+
+        return self.results
+
+    def _skip_dependents_of(self, name: str, dependents: dict):
+        names = list(dependents[name])
+        while names:
+            dependent = names.pop()
+            if dependent not in self.skipped:
+                self.skipped.append(dependent)
+                names.extend(dependents[dependent])
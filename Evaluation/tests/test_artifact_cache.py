@@ -0,0 +1,168 @@
+import glob
+import os
+import tempfile
+import threading
+import unittest
+
+from artifact_cache import ArtifactCache
+
+
+class TestArtifactCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.cache_dir = self.path('cache')
+        self.runs_file = self.path('runs')
+
+    def path(self, *names):
+        return os.path.join(self.directory.name, *names)
+
+    def write(self, path, contents):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as file:
+            file.write(contents)
+
+    def read(self, path):
+        with open(path) as file:
+            return file.read()
+
+    def number_of_runs(self):
+        return len(self.read(self.runs_file).splitlines()) if os.path.exists(self.runs_file) else 0
+
+    def copy_command(self, input_file, output_files):
+        # a fake program that records each run and copies its input to each of its outputs
+        return f'echo run >> {self.runs_file}; ' + '; '.join(f'cp {input_file} {output_file}'
+                                                             for output_file in output_files)
+
+    def call(self, cache, input_file, output_files):
+        return cache.call(self.copy_command(input_file, output_files), input_files=[input_file],
+                          output_files=output_files)
+
+    def test_miss_then_hit(self):
+        cache = ArtifactCache(self.cache_dir)
+        input_file, output_file = self.path('in.txt'), self.path('out.txt')
+        self.write(input_file, 'atoms')
+
+        result = self.call(cache, input_file, [output_file])
+        assert not result.cached
+        assert (cache.hits, cache.misses) == (0, 1)
+
+        os.remove(output_file)
+        cached_result = self.call(cache, input_file, [output_file])
+        assert cached_result.cached
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert self.number_of_runs() == 1
+        assert self.read(output_file) == 'atoms'
+        # the resources are those of the run that was cached
+        assert cached_result.return_code == 0
+        assert cached_result.wall_time == result.wall_time
+        assert cached_result.max_rss == result.max_rss
+
+    def test_input_change_is_a_miss(self):
+        cache = ArtifactCache(self.cache_dir)
+        input_file, output_file = self.path('in.txt'), self.path('out.txt')
+        self.write(input_file, 'atoms')
+        self.call(cache, input_file, [output_file])
+
+        self.write(input_file, 'other atoms')
+        assert not self.call(cache, input_file, [output_file]).cached
+        assert self.number_of_runs() == 2
+        assert self.read(output_file) == 'other atoms'
+
+    def test_aliased_paths_share_entries(self):
+        for experiment in ['experiment1', 'experiment2']:
+            self.write(self.path(experiment, 'in.txt'), 'atoms')
+
+        for experiment in ['experiment1', 'experiment2']:
+            cache = ArtifactCache(self.cache_dir, path_aliases={self.path(experiment): '{results_dir}'})
+            self.call(cache, self.path(experiment, 'in.txt'), [self.path(experiment, 'out.txt')])
+
+        assert self.number_of_runs() == 1
+        assert self.read(self.path('experiment2', 'out.txt')) == 'atoms'
+
+    def test_failed_command_is_not_stored(self):
+        cache = ArtifactCache(self.cache_dir)
+        input_file, output_file = self.path('in.txt'), self.path('out.txt')
+        self.write(input_file, 'atoms')
+        command = self.copy_command(input_file, [output_file]) + '; exit 1'
+
+        for _ in range(2):
+            result = cache.call(command, input_files=[input_file], output_files=[output_file])
+            assert result.return_code == 1
+            assert not result.cached
+        assert self.number_of_runs() == 2
+        assert cache.hits == 0
+
+    def test_entry_with_other_output_files_is_a_miss(self):
+        cache = ArtifactCache(self.cache_dir)
+        input_file = self.path('in.txt')
+        self.write(input_file, 'atoms')
+        output_files = [self.path('out1.txt'), self.path('out2.txt')]
+        command = self.copy_command(input_file, output_files)
+
+        cache.call(command, input_files=[input_file], output_files=output_files[:1])
+        result = cache.call(command, input_files=[input_file], output_files=output_files)
+
+        assert not result.cached
+        assert self.number_of_runs() == 2
+        assert self.read(output_files[1]) == 'atoms'
+        assert cache.call(command, input_files=[input_file], output_files=output_files).cached
+
+    def test_incomplete_entry_is_not_restored(self):
+        cache = ArtifactCache(self.cache_dir)
+        input_file = self.path('in.txt')
+        self.write(input_file, 'atoms')
+        output_files = [self.path('out1.txt'), self.path('out2.txt')]
+        command = self.copy_command(input_file, output_files)
+        cache.call(command, input_files=[input_file], output_files=output_files)
+
+        # the entry of the call loses one of its output files
+        key = cache.key(command, input_files=[input_file], output_files=output_files)
+        os.remove(os.path.join(cache._entry_dir(key), 'output1'))
+
+        assert not cache.call(command, input_files=[input_file], output_files=output_files).cached
+        assert self.number_of_runs() == 2
+        # and is replaced by a complete entry
+        assert cache.call(command, input_files=[input_file], output_files=output_files).cached
+
+    def test_missing_input_is_never_cached(self):
+        cache = ArtifactCache(self.cache_dir)
+        input_file, output_file = self.path('missing.txt'), self.path('out.txt')
+
+        for _ in range(2):
+            cache.call(f'echo run >> {self.runs_file}; echo atoms > {output_file}', input_files=[input_file],
+                       output_files=[output_file])
+        assert self.number_of_runs() == 2
+        assert (cache.hits, cache.misses) == (0, 0)
+
+    def test_concurrent_stores(self):
+        cache = ArtifactCache(self.cache_dir)
+        input_file, output_file = self.path('in.txt'), self.path('out.txt')
+        self.write(input_file, 'atoms')
+        command = self.copy_command(input_file, [output_file])
+        result = cache.call(command, input_files=[input_file], output_files=[output_file])
+        key = cache.key(command, input_files=[input_file], output_files=[output_file])
+
+        # the same step finishing in several tasks at once, after the entry was stored
+        barrier = threading.Barrier(8)
+
+        def store():
+            barrier.wait()
+            cache._store(key, command, [output_file], result)
+
+        threads = [threading.Thread(target=store) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert glob.glob(os.path.join(self.cache_dir, '*', '*.tmp')) == []
+        assert len(glob.glob(os.path.join(self.cache_dir, '*', '*'))) == 1
+        os.remove(output_file)
+        assert cache.call(command, input_files=[input_file], output_files=[output_file]).cached
+        assert self.read(output_file) == 'atoms'
+
+
+if __name__ == '__main__':
+    unittest.main()
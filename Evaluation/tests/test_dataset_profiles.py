@@ -0,0 +1,113 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from dataset_profiles import DatasetProfile, get_profile
+from MLNEvaluator import MLNEvaluator
+import MLNEvaluatorCORA
+
+# the parameters given to the evaluators of MLNEvaluatorIMDB_and_UWCSE.py and MLNEvaluatorCORA.py (and to the CORA
+# evaluator of MLNEvaluator.py) before they were replaced by dataset profiles, all of which queried every predicate of
+# the info file, with inference run by 'infer ... -maxSteps 300'
+previous_parameters = {
+    'imdb': {'database_files': ['imdb.1.db', 'imdb.2.db', 'imdb.3.db', 'imdb.4.db', 'imdb.5.db'],
+             'info_file': 'imdb.info', 'type_file': 'imdb.type', 'individual_query_predicates': False},
+    'uw_cse': {'database_files': ['ai.db', 'theory.db', 'graphics.db', 'systems.db', 'language.db'],
+               'info_file': 'ai.info', 'type_file': 'ai.type', 'individual_query_predicates': False},
+    'old_imdb': {'database_files': ['imdb1.db', 'imdb2.db', 'imdb3.db', 'imdb4.db', 'imdb5.db'],
+                 'info_file': 'imdb1.info', 'type_file': 'imdb1.type', 'individual_query_predicates': False},
+    'cora': {'database_files': ['cora0_filtered.db', 'cora1_filtered.db', 'cora2_filtered.db'],
+             'info_file': 'cora.info', 'type_file': 'cora.type', 'individual_query_predicates': True},
+}
+
+
+class TestDatasetProfiles(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.data_dir = self.directory.name
+
+    def evaluator(self, profile, evaluator_class=MLNEvaluator):
+        with open(os.path.join(self.data_dir, get_profile(profile).info_file), 'w') as file:
+            file.write('//predicates\nActor(person)\nWorkedUnder(person,person)\n')
+
+        return evaluator_class(profile=profile, data_dir=self.data_dir, mln_dir='/mlns', infer_dir='/infer',
+                               inference_calculations_dir='/inference')
+
+    def inference_commands(self, evaluator, test_database, method):
+        """
+        The commands run for inference on test_database, in the way the evaluator runs them.
+        """
+        commands = []
+        with mock.patch.object(evaluator, '_call', lambda program, command, **kwargs: commands.append(command)):
+            for query_predicate in evaluator._get_individual_query_predicates():
+                evaluator.run_inference_on_MLN_by_method(test_database.rstrip('.db'), test_database,
+                                                         query_predicate or evaluator.get_query_predicates(), method)
+
+        return commands
+
+    def previous_inference_commands(self, mln, test_database, query_predicates):
+        inference_file = os.path.join('/inference', mln + "." + test_database.strip('.db') + '.results')
+        evidence_database = os.path.join(self.data_dir, test_database)
+        return [f'/infer/infer -i /mlns/{mln}-rules-out.mln -r {inference_file}.positive -e {evidence_database} '
+                f'-q {query_predicates} -maxSteps 300 -queryEvidence 1',
+                f'/infer/infer -i /mlns/{mln}-rules-out.mln -r {inference_file}.negative -e {evidence_database} '
+                f'-q {query_predicates} -maxSteps 300']
+
+    def test_profiles_reproduce_the_previous_folds_and_files(self):
+        for profile, parameters in previous_parameters.items():
+            evaluator = self.evaluator(profile)
+
+            assert evaluator.database_files == parameters['database_files']
+            assert evaluator.number_to_run == len(parameters['database_files'])
+            assert evaluator.info_file == parameters['info_file']
+            assert evaluator.type_file == parameters['type_file']
+            assert evaluator.individual_query_predicates == parameters['individual_query_predicates']
+            assert evaluator.get_query_predicates() == 'Actor,WorkedUnder'
+
+    def test_profiles_reproduce_the_previous_inference_commands(self):
+        for profile in ['imdb', 'uw_cse', 'old_imdb']:
+            evaluator = self.evaluator(profile)
+            test_database = evaluator.database_files[0]
+
+            assert self.inference_commands(evaluator, test_database, 'FASTER') == \
+                self.previous_inference_commands('NOT' + test_database.rstrip('.db') + '_FASTER', test_database,
+                                                 'Actor,WorkedUnder')
+
+    def test_cora_profile_runs_inference_for_each_query_predicate(self):
+        for evaluator in [self.evaluator('cora'),
+                          self.evaluator('cora', evaluator_class=MLNEvaluatorCORA.MLNEvaluator)]:
+            test_database = evaluator.database_files[0]
+            mln = 'NOT' + test_database.rstrip('.db') + '_alchemy'
+
+            # as before, but each query predicate now writes its own .results files instead of overwriting those of
+            # the previous query predicate
+            expected_commands = []
+            for query_predicate in ['Actor', 'WorkedUnder']:
+                expected_commands += [command.replace('.results.positive', f'.results.{query_predicate}.positive')
+                                      .replace('.results.negative', f'.results.{query_predicate}.negative')
+                                      for command in self.previous_inference_commands(mln, test_database,
+                                                                                      query_predicate)]
+            assert self.inference_commands(evaluator, test_database, 'alchemy') == expected_commands
+
+    def test_arguments_override_the_profile(self):
+        evaluator = MLNEvaluator(profile='cora', database_files=['micro1.db', 'micro2.db'], info_file='micro.info',
+                                 type_file='micro.type', individual_query_predicates=False)
+
+        assert evaluator.database_files == ['micro1.db', 'micro2.db']
+        assert evaluator.info_file == 'micro.info'
+        assert evaluator.type_file == 'micro.type'
+        assert not evaluator.individual_query_predicates
+
+    def test_unknown_profile(self):
+        with self.assertRaises(ValueError):
+            get_profile('mutagenesis')
+        profile = DatasetProfile(name='micro', database_files=['micro1.db'], info_file='micro.info',
+                                 type_file='micro.type')
+        assert get_profile(profile) is profile
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from evaluation_metrics import compute_CLL
+
+# Actor(P1) appears twice in the positive file and WorkedUnder(P3,P1) twice in the negative file (each taking the
+# probability of its first appearance), Actor(P2) ties with Actor(P3) and WorkedUnder(P2,P3) with WorkedUnder(P3,P1)
+positive_results_file = './tests/fixtures/imdb.results.positive'
+negative_results_file = './tests/fixtures/imdb.results.negative'
+
+
+def compute_CLL_by_scanning_atoms(positive_results_file, negative_results_file):
+    """
+    The CLL as it was computed before compute_CLL, by looking up the first appearance of each ground atom in turn.
+    """
+    negative_results = pd.read_csv(negative_results_file, delimiter=' ', names=['Ground_Atom', 'prob'])
+    positive_results = pd.read_csv(positive_results_file, delimiter=' ', names=['Ground_Atom', 'prob'])
+    negative_probability_values = []
+    positive_probability_values = []
+    for ground_atom in negative_results['Ground_Atom']:
+        negative_probability_values.append(
+            1 - negative_results.loc[negative_results['Ground_Atom'] == ground_atom].iloc[0]['prob'])
+    for ground_atom in positive_results['Ground_Atom']:
+        positive_probability_values.append(
+            positive_results.loc[positive_results['Ground_Atom'] == ground_atom].iloc[0]['prob'])
+
+    return np.log(np.mean(negative_probability_values + positive_probability_values))
+
+
+class TestComputeCLL(unittest.TestCase):
+
+    def test_CLL_matches_scanning_atoms(self):
+        metrics = compute_CLL(positive_results_file, negative_results_file)
+
+        assert np.isclose(metrics['CLL'], compute_CLL_by_scanning_atoms(positive_results_file, negative_results_file))
+
+    def test_hand_computed_metrics(self):
+        metrics = compute_CLL(positive_results_file, negative_results_file)
+
+        # correct probabilities 0.9, 0.6, 0.9, 0.7, 0.4 (true atoms) and 0.4, 0.8, 0.6, 0.6 (false atoms)
+        assert np.isclose(metrics['CLL'], np.log(5.9 / 9))
+        # 17.5 of the 20 (true, false) pairs are ordered correctly, counting ties as one half
+        assert np.isclose(metrics['AUC'], 17.5 / 20)
+        assert metrics['number_of_atoms'] == 9
+
+        assert sorted(metrics['predicates']) == ['Actor', 'WorkedUnder']
+        assert np.isclose(metrics['predicates']['Actor']['CLL'], np.log(3.6 / 5))
+        assert np.isclose(metrics['predicates']['Actor']['AUC'], 5.5 / 6)
+        assert metrics['predicates']['Actor']['number_of_atoms'] == 5
+        assert np.isclose(metrics['predicates']['WorkedUnder']['CLL'], np.log(2.3 / 4))
+        assert np.isclose(metrics['predicates']['WorkedUnder']['AUC'], 3 / 4)
+        assert metrics['predicates']['WorkedUnder']['number_of_atoms'] == 4
+
+    def test_AUC_matches_sklearn(self):
+        from sklearn.metrics import roc_auc_score
+
+        positive_probabilities = [0.9, 0.6, 0.9, 0.7, 0.4]
+        negative_probabilities = [0.6, 0.2, 0.4, 0.4]
+        metrics = compute_CLL(positive_results_file, negative_results_file)
+
+        assert np.isclose(metrics['AUC'], roc_auc_score([1] * len(positive_probabilities) +
+                                                        [0] * len(negative_probabilities),
+                                                        positive_probabilities + negative_probabilities))
+
+    def test_results_files_of_each_query_predicate(self):
+        metrics = compute_CLL(positive_results_file, negative_results_file)
+        split_metrics = compute_CLL(
+            positive_results_file=[f'./tests/fixtures/imdb.results.{predicate}.positive'
+                                   for predicate in ['Actor', 'WorkedUnder']],
+            negative_results_file=[f'./tests/fixtures/imdb.results.{predicate}.negative'
+                                   for predicate in ['Actor', 'WorkedUnder']])
+
+        assert np.isclose(split_metrics['CLL'], metrics['CLL'])
+        assert np.isclose(split_metrics['AUC'], metrics['AUC'])
+        assert split_metrics['predicates'] == metrics['predicates']
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import pickle
+import stat
+import tempfile
+import unittest
+from multiprocessing import Pool
+
+from MLNEvaluator import MLNEvaluator
+
+
+class TestMLNEvaluator(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.master_results_file = os.path.join(self.directory.name, 'results')
+
+    def evaluator(self, **kwargs):
+        return MLNEvaluator(database_files=['a.db', 'b.db'], info_file='a.info', type_file='a.type',
+                            master_results_file=self.master_results_file, **kwargs)
+
+    def read_errors(self, method):
+        with open(f'{self.master_results_file}_{method}_errors') as file:
+            return file.read()
+
+    def test_timeouts_are_logged_for_every_program(self):
+        evaluator = self.evaluator(timeouts={'getcom': 0.2, 'FASTER': 0.2})
+        for program, method in [('getcom', 'alchemy'), ('FASTER', 'FASTER')]:
+            result = evaluator._call(program, 'sleep 5', input_files=[], output_files=[], method=method,
+                                     database='NOTa')
+
+            assert result.timed_out
+            assert f'{program} timed out after 0.2s' in self.read_errors(method)
+
+    def test_non_zero_return_codes_are_logged(self):
+        result = self.evaluator()._call('pfind', 'exit 3', input_files=[], output_files=[], method='alchemy',
+                                        database='NOTa')
+
+        assert result.return_code == 3
+        assert 'pfind exited with return code 3' in self.read_errors('alchemy')
+
+    def test_stochastic_programs_are_not_cached(self):
+        input_file, output_file = os.path.join(self.directory.name, 'in'), os.path.join(self.directory.name, 'out')
+        with open(input_file, 'w') as file:
+            file.write('atoms')
+
+        for cache_stochastic_programs in [False, True]:
+            evaluator = self.evaluator(cache_dir=os.path.join(self.directory.name, f'cache{cache_stochastic_programs}'),
+                                       cache_stochastic_programs=cache_stochastic_programs)
+            for program in ['getcom', 'rwl', 'infer']:
+                results = [evaluator._call(program, f'echo {program} > {output_file}', input_files=[input_file],
+                                           output_files=[output_file], method='alchemy', database='NOTa')
+                           for _ in range(2)]
+
+                assert not results[0].cached
+                stochastic = program in evaluator.stochastic_programs
+                assert results[1].cached == (cache_stochastic_programs or not stochastic)
+                if results[1].cached:
+                    # the wall time logged is that of the run that was cached
+                    assert results[1].wall_time == results[0].wall_time
+
+    def test_cached_steps_run_in_a_pool(self):
+        # execute_experiments(use_task_scheduler=False) runs the steps with Pool.starmap, which pickles the evaluator
+        lsm_dir = self.directory.name
+        os.makedirs(os.path.join(lsm_dir, 'pfind2'))
+        pfind = os.path.join(lsm_dir, 'pfind2', 'pfind')
+        with open(pfind, 'w') as file:
+            file.write('#!/bin/sh\necho "$3" > "$7"\n')
+        os.chmod(pfind, os.stat(pfind).st_mode | stat.S_IEXEC)
+        save_names = ['a_alchemy', 'b_alchemy']
+        for save_name in save_names:
+            with open(os.path.join(lsm_dir, f'NOT{save_name}.comb.ldb'), 'w') as file:
+                file.write(save_name)
+        with open(os.path.join(lsm_dir, 'a.info'), 'w') as file:
+            file.write('Pred(a)')
+
+        evaluator = self.evaluator(lsm_dir=lsm_dir, data_dir=lsm_dir, results_dir=lsm_dir, log_dir=lsm_dir,
+                                   cache_dir=os.path.join(self.directory.name, 'cache'))
+        evaluator = pickle.loads(pickle.dumps(evaluator))
+        for cached in [False, True]:
+            with Pool(processes=2) as pool:
+                results = pool.map(evaluator._run_path_finding, save_names)
+
+            assert all(result.return_code == 0 and result.cached == cached for result in results)
+            for save_name in save_names:
+                with open(os.path.join(lsm_dir, f'NOT{save_name}.rules')) as file:
+                    assert file.read() == '0\n'
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+from process_runner import run_process
+
+
+def python_command(code):
+    return f'{sys.executable} -c "{code}"'
+
+
+class TestRunProcess(unittest.TestCase):
+
+    def test_return_code_and_wall_time(self):
+        result = run_process('sleep 0.2; exit 3')
+
+        assert result.return_code == 3
+        assert not result.timed_out
+        assert 0.2 <= result.wall_time < 5
+
+    def test_timeout_kills_the_process_group(self):
+        with tempfile.TemporaryDirectory() as directory:
+            marker_file = os.path.join(directory, 'finished')
+            # the shell waits for a background process, which must be killed with it
+            result = run_process(f'(sleep 1; touch {marker_file}) & wait', timeout=0.2)
+
+            assert result.timed_out
+            assert result.return_code < 0
+            assert result.wall_time < 1
+            time.sleep(1.5)
+            assert not os.path.exists(marker_file)
+
+    def test_memory_limit(self):
+        allocate = python_command("b = b'x' * (400 << 20)")
+
+        assert run_process(allocate).return_code == 0
+        result = run_process(allocate, memory_limit=200 << 20)
+        assert result.return_code != 0
+        assert result.memory_limit == 200 << 20
+
+    def test_resource_usage(self):
+        result = run_process(python_command("b = b'x' * (100 << 20); sum(range(10 ** 7))"))
+
+        assert result.return_code == 0
+        assert result.user_time > 0
+        assert result.cpu_time == result.user_time + result.system_time
+        assert result.max_rss >= 100 << 20
+        assert set(result.as_dict()) == {'return_code', 'wall_time', 'cpu_time', 'user_time', 'system_time',
+                                         'max_rss_upper_bound', 'timed_out', 'timeout', 'memory_limit', 'cached'}
+
+    def test_max_rss_is_an_upper_bound(self):
+        # the memory of this process when it forks the shell is counted, however little the program uses
+        allocation = b'x' * (200 << 20)
+        result = run_process('true')
+        del allocation
+
+        assert result.max_rss >= 200 << 20
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import threading
+import unittest
+
+from task_scheduler import TaskFailedError, TaskScheduler
+
+
+def fail():
+    raise RuntimeError('failed')
+
+
+class TestTaskScheduler(unittest.TestCase):
+
+    def test_tasks_run_after_their_dependencies(self):
+        finished = []
+        lock = threading.Lock()
+
+        def task(name):
+            with lock:
+                finished.append(name)
+            return name
+
+        scheduler = TaskScheduler(max_workers=4)
+        scheduler.add_task('a', task, 'a')
+        scheduler.add_task('b', task, 'b')
+        scheduler.add_task('c', task, 'c', dependencies=['a', 'b'])
+        scheduler.add_task('d', task, 'd', dependencies=['c'])
+        scheduler.add_task('e', task, 'e', dependencies=['a'])
+        results = scheduler.run()
+
+        assert results == {name: name for name in 'abcde'}
+        assert finished.index('c') > finished.index('a')
+        assert finished.index('c') > finished.index('b')
+        assert finished.index('d') > finished.index('c')
+        assert finished.index('e') > finished.index('a')
+
+    def test_independent_tasks_run_in_parallel(self):
+        # each task waits for the other to start, so they can only finish if they run at the same time
+        barrier = threading.Barrier(2, timeout=5)
+
+        scheduler = TaskScheduler(max_workers=2)
+        scheduler.add_task('a', barrier.wait)
+        scheduler.add_task('b', barrier.wait)
+        results = scheduler.run()
+
+        assert sorted(results) == ['a', 'b']
+
+    def test_failure_skips_dependents_only(self):
+        scheduler = TaskScheduler(max_workers=2)
+        scheduler.add_task('a', fail)
+        scheduler.add_task('b', lambda: 'b', dependencies=['a'])
+        scheduler.add_task('c', lambda: 'c', dependencies=['b'])
+        scheduler.add_task('d', lambda: 'd')
+        scheduler.add_task('e', lambda: 'e', dependencies=['d'])
+        results = scheduler.run()
+
+        assert results == {'d': 'd', 'e': 'e'}
+        assert list(scheduler.failures) == ['a']
+        assert isinstance(scheduler.failures['a'], RuntimeError)
+        assert sorted(scheduler.skipped) == ['b', 'c']
+
+    def test_raise_on_failure(self):
+        scheduler = TaskScheduler(max_workers=1)
+        scheduler.add_task('a', fail)
+        scheduler.add_task('b', lambda: 'b')
+
+        with self.assertRaises(TaskFailedError) as context:
+            scheduler.run(raise_on_failure=True)
+        assert list(context.exception.failures) == ['a']
+        assert scheduler.results == {'b': 'b'}
+
+    def test_missing_dependency(self):
+        scheduler = TaskScheduler()
+        scheduler.add_task('a', lambda: 'a')
+
+        with self.assertRaises(ValueError):
+            scheduler.add_task('b', lambda: 'b', dependencies=['a', 'c'])
+        assert 'b' not in scheduler.tasks
+
+    def test_duplicate_task(self):
+        scheduler = TaskScheduler()
+        scheduler.add_task('a', lambda: 'a')
+
+        with self.assertRaises(ValueError):
+            scheduler.add_task('a', lambda: 'b')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+import json
+
+import networkx as nx
+
+from graph_utils import get_second_eigenpair
+from cheeger_cut import cheeger_cut
+from GraphObjects import Graph
+import instrumentation
+
+
+class BisectionTree(object):
+    """
+    The full tree of spectral bisections (Cheeger cuts) of a graph, from which the clusters of HierarchicalClusterer
+    are read off for any stopping criteria, without recomputing any eigenvectors or cuts.
+
+    The tree is built by splitting as HierarchicalClusterer does with the most permissive stopping criteria that will be
+    queried (min_cluster_size and max_lambda2). Any stricter criteria stop splitting at some of the nodes of this tree
+    and nowhere else, since every criterion met by the permissive ones is also met by the stricter ones. Each node of
+    the tree stores its lambda2, the conductance of its cut (if it is split) and the range of its graph nodes in an
+    ordering of the graph nodes in which the nodes of every subtree are contiguous, so a cluster is a slice of that
+    ordering.
+
+    The tree can be saved to (and loaded from) a JSON file, so that it is built once across runs.
+
+    Example usage:
+        bisection_tree = BisectionTree.build(hypergraph.convert_to_graph())
+        bisection_tree.save('imdb_bisection_tree.json')
+        clusters = BisectionTree.load('imdb_bisection_tree.json').get_clusters(min_cluster_size=5, max_lambda2=0.8)
+    """
+
+    def __init__(self, node_order: list[str], tree_nodes: list[tuple], min_cluster_size: int, max_lambda2: float):
+        self.node_order = node_order  # list(graph node), the nodes of each tree node being a contiguous slice
+        # list((lambda2, start, end, left child index, right child index, conductance of the cut)), in depth-first order
+        # from the root, where the child indices and conductance are None for the leaves of the tree
+        self.tree_nodes = tree_nodes
+        self.min_cluster_size = min_cluster_size
+        self.max_lambda2 = max_lambda2
+
+    @classmethod
+    def build(cls, graph: Graph, min_cluster_size=3, max_lambda2=2.0):
+        """
+        Builds the tree, splitting the graph for as long as the stopping criteria of HierarchicalClusterer with the
+        given min_cluster_size and max_lambda2 (the most permissive that the tree will be queried with) allow.
+        """
+        bisection_tree = cls(node_order=[], tree_nodes=[], min_cluster_size=min_cluster_size, max_lambda2=max_lambda2)
+        bisection_tree._add_tree_node(graph)
+        instrumentation.record_size('bisection_tree', bisection_tree.tree_nodes)
+
+        return bisection_tree
+
+    def _add_tree_node(self, graph: Graph):
+        """
+        Adds the tree node of the graph, and the tree nodes of its subgraphs, returning the index of the tree node.
+        """
+        with instrumentation.stage('spectral_split'):
+            v_2, lambda2 = get_second_eigenpair(graph)
+
+            split = lambda2 <= self.max_lambda2 and graph.number_of_nodes() >= 2 * self.min_cluster_size
+            if split:
+                subgraph1, subgraph2 = cheeger_cut(graph, v_2)
+                split = subgraph1.number_of_nodes() >= self.min_cluster_size and \
+                    subgraph2.number_of_nodes() >= self.min_cluster_size
+            if split:
+                conductance = nx.conductance(graph, subgraph1.nodes(), subgraph2.nodes(), weight='weight')
+
+        tree_node_index = len(self.tree_nodes)
+        self.tree_nodes.append(None)
+        if split:
+            left_child_index = self._add_tree_node(subgraph1)
+            right_child_index = self._add_tree_node(subgraph2)
+            start, end = self.tree_nodes[left_child_index][1], self.tree_nodes[right_child_index][2]
+        else:
+            left_child_index = right_child_index = conductance = None
+            start = len(self.node_order)
+            self.node_order.extend(graph.nodes())
+            end = len(self.node_order)
+        self.tree_nodes[tree_node_index] = (float(lambda2), start, end, left_child_index, right_child_index,
+                                            None if conductance is None else float(conductance))
+
+        return tree_node_index
+
+    def get_clusters(self, min_cluster_size: int, max_lambda2: float):
+        """
+        Returns list(list(graph node)), the clusters that HierarchicalClusterer finds with the given stopping criteria,
+        in the same order.
+        """
+        cluster_tree_nodes, _ = self.get_cluster_tree_nodes(min_cluster_size, max_lambda2)
+
+        return [self.get_nodes(tree_node_index) for tree_node_index in cluster_tree_nodes]
+
+    def get_cluster_tree_nodes(self, min_cluster_size: int, max_lambda2: float):
+        """
+        Returns the indices of the tree nodes of the clusters found with the given stopping criteria (in the order of
+        get_clusters), and the indices of the tree nodes that are split to find them.
+        """
+        if min_cluster_size < self.min_cluster_size or max_lambda2 > self.max_lambda2:
+            raise ValueError(f"The bisection tree was built for min_cluster_size >= {self.min_cluster_size} and "
+                             f"max_lambda2 <= {self.max_lambda2}, so cannot be queried with min_cluster_size = "
+                             f"{min_cluster_size} and max_lambda2 = {max_lambda2}.")
+
+        cluster_tree_nodes = []
+        split_tree_nodes = []
+        tree_node_indices = [0]
+        while tree_node_indices:
+            tree_node_index = tree_node_indices.pop()
+            if self.is_split(tree_node_index, min_cluster_size, max_lambda2):
+                split_tree_nodes.append(tree_node_index)
+                _, _, _, left_child_index, right_child_index, _ = self.tree_nodes[tree_node_index]
+                # visit the left subtree first
+                tree_node_indices.extend([right_child_index, left_child_index])
+            else:
+                cluster_tree_nodes.append(tree_node_index)
+
+        return cluster_tree_nodes, split_tree_nodes
+
+    def is_split(self, tree_node_index: int, min_cluster_size: int, max_lambda2: float):
+        """
+        Whether the graph of the tree node is split with the given stopping criteria (if it is reached).
+        """
+        lambda2, start, end, left_child_index, right_child_index, _ = self.tree_nodes[tree_node_index]
+
+        return left_child_index is not None and lambda2 <= max_lambda2 and end - start >= 2 * min_cluster_size and \
+            self.number_of_nodes(left_child_index) >= min_cluster_size and \
+            self.number_of_nodes(right_child_index) >= min_cluster_size
+
+    def get_nodes(self, tree_node_index: int):
+        _, start, end, _, _, _ = self.tree_nodes[tree_node_index]
+
+        return self.node_order[start:end]
+
+    def number_of_nodes(self, tree_node_index: int):
+        _, start, end, _, _, _ = self.tree_nodes[tree_node_index]
+
+        return end - start
+
+    def save(self, file_name: str):
+        with open(file_name, 'w') as file:
+            json.dump({'min_cluster_size': self.min_cluster_size,
+                       'max_lambda2': self.max_lambda2,
+                       'node_order': self.node_order,
+                       'tree_nodes': self.tree_nodes}, file)
+
+    @classmethod
+    def load(cls, file_name: str):
+        with open(file_name) as file:
+            bisection_tree = json.load(file)
+
+        return cls(node_order=bisection_tree['node_order'],
+                   tree_nodes=[tuple(tree_node) for tree_node in bisection_tree['tree_nodes']],
+                   min_cluster_size=bisection_tree['min_cluster_size'],
+                   max_lambda2=bisection_tree['max_lambda2'])
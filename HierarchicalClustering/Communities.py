@@ -1,13 +1,20 @@
+import random
+import zlib
 from multiprocessing import Pool, cpu_count
+
+import numpy as np
 from RandomWalker import RandomWalker
 from clustering_nodes_by_path_similarity import get_commonly_encountered_nodes, cluster_nodes_by_path_similarity, compute_theta_sym
 from GraphObjects import Hypergraph
+from ExactHittingTimes import exact_hitting_time_tolerance
+from colour_refinement import find_equivalent_source_nodes, find_symmetric_nodes
 from errors import check_argument
+import instrumentation
 
 
 class Communities(object):
 
-    def __init__(self, hypergraph: Hypergraph, config: dict):
+    def __init__(self, hypergraph: Hypergraph, config: dict, lazy=False):
 
         """
         Generates the communities associated with a hypergraph.
@@ -19,14 +26,29 @@ class Communities(object):
         the same cluster if they are of the same type.
 
         Config parameters:
-            epsilon, number_of_paths, max_num_paths, max_path_length, k, alpha_sym (see RandomWalker.py for details)
+            epsilon, number_of_paths, max_num_paths, max_path_length, k, alpha_sym, exact_hitting_times (optional),
+            seconds_per_walk_step (optional), seconds_per_exact_operation (optional), exact_path_distributions
+            (optional), path_distribution_state_budget (optional) (see RandomWalker.py for details)
             theta_p: the desired significance level for testing the null hypothesis of nodes being path symmetric
                      when clustering by JS divergence of by birch clustering on PCA path-count features. Smaller values
                      of theta_p give fewer clusters.
             pca_dim: the desired dimension of the path-count feature vectors after dimensionality reduction with PCA
             clustering_method_threshold: the threshold cluster size at which birch clustering on PCA path-count features
                      is used instead of clustering based on JS divergence (slower for large clusters)
+            multiprocessing: whether to compute the communities of the source nodes in parallel
+            number_of_processes (optional): the number of worker processes to use if multiprocessing (defaults to the
+                     number of CPUs)
+            collapse_equivalent_sources (optional): if True, random walks are only run from one source node of each set
+                     of structurally equivalent source nodes (see colour_refinement.py), and the communities of the
+                     others are copies of its community with the two source nodes exchanged. Defaults to False.
+            colour_refinement_pre_clustering (optional): if True, nodes that are exactly symmetric with respect to the
+                     source node (found by colour refinement, see colour_refinement.py) are clustered together before,
+                     and instead of, being clustered statistically. Defaults to False.
+            seed (optional): if given, the random number generators are seeded from the seed and the source node before
+                     computing each community, so that the communities are reproducible regardless of multiprocessing
 
+        If lazy is True, no communities are computed on construction. Instead, generate_communities() yields them one
+        source node at a time, which keeps memory flat when the hypergraph has very many source nodes.
         """
 
         self._check_arguments(config)
@@ -36,18 +58,13 @@ class Communities(object):
             print(f"Warning: Graph diameter of the hypergraph not known. Reverting to using default length of random "
                   f"walks.")
 
+        self.config = config
         self.random_walker = RandomWalker(hypergraph=hypergraph, config=config)
 
         self.communities = {}
 
-        if config['multiprocessing']:
-            pool = Pool(processes=cpu_count())
-            communities = pool.starmap_async(self.get_community, [(node, config) for node in hypergraph.nodes.keys()
-                                                                  if hypergraph.is_source_node[node]]).get()
-            self.communities = {community.source_node: community for community in communities}
-        else:
-            self.communities = {node: self.get_community(source_node=node, config=config) for node in
-                                hypergraph.nodes.keys() if hypergraph.is_source_node[node]}
+        if not lazy:
+            self.communities = {community.source_node: community for community in self.generate_communities()}
 
     def __str__(self):
         output_string = ''
@@ -56,7 +73,63 @@ class Communities(object):
 
         return output_string
 
+    def generate_communities(self):
+        """
+        Yields the community of each source node of the hypergraph in turn, in the order of hypergraph.nodes.
+
+        The communities are not stored (except those of representatives of equivalent source nodes, if
+        collapse_equivalent_sources is set, until the last source node equivalent to them), so a consumer that writes
+        each community out as it arrives (see CommunityWriter.py) only ever holds the communities that are currently in
+        flight.
+        """
+        source_nodes = [node for node in self.hypergraph.nodes.keys() if self.hypergraph.is_source_node[node]]
+
+        equivalent_source_nodes = {}  # dict(source node: representative source node whose community is copied)
+        if self.config.get('collapse_equivalent_sources'):
+            equivalent_source_nodes = find_equivalent_source_nodes(self.hypergraph, source_nodes)
+            instrumentation.count('collapsed_source_nodes', len(equivalent_source_nodes))
+        # dict(representative source node: the last source node equivalent to it)
+        last_equivalent_source_nodes = {equivalent_source_nodes[node]: node for node in source_nodes
+                                        if node in equivalent_source_nodes}
+
+        # a representative comes before the source nodes equivalent to it, so its community is kept until the last of
+        # them
+        communities_of_representatives = {}
+        communities = self._compute_communities([node for node in source_nodes
+                                                 if node not in equivalent_source_nodes])
+        for node in source_nodes:
+            if node in equivalent_source_nodes:
+                representative = equivalent_source_nodes[node]
+                community_of_representative = communities_of_representatives[representative]
+                if last_equivalent_source_nodes[representative] == node:
+                    del communities_of_representatives[representative]
+                yield community_of_representative.relabel({representative: node, node: representative})
+            else:
+                community = next(communities)
+                if node in last_equivalent_source_nodes:
+                    communities_of_representatives[node] = community
+                yield community
+        communities.close()
+
+    def _compute_communities(self, source_nodes: list[str]):
+        if self.config['multiprocessing']:
+            processes = self.config.get('number_of_processes') or cpu_count()
+            # the Communities (with its hypergraph and random walker) is sent once to each worker, and the source nodes
+            # in batches
+            with Pool(processes=processes, initializer=_set_worker_communities, initargs=(self,)) as pool:
+                # the statistics recorded in each worker are merged back in as its community arrives
+                for community, recorded in pool.imap(instrumentation.Collected(_get_community_in_worker), source_nodes,
+                                                     chunksize=max(1, len(source_nodes) // (4 * processes))):
+                    instrumentation.merge(recorded)
+                    yield community
+        else:
+            for node in source_nodes:
+                yield self.get_community(source_node=node, config=self.config)
+
     def get_community(self, source_node: str, config: dict):
+        if config.get('seed') is not None:
+            seed_random_number_generators(config['seed'], source_node)
+
         random_walk_data = self.random_walker.generate_node_random_walk_data(source_node=source_node)
 
         # remove the source node from the random_walk_data and add it to the set of single nodes
@@ -64,23 +137,35 @@ class Communities(object):
         single_nodes = {source_node}
         clusters = []
 
-        theta_sym = compute_theta_sym(config['alpha_sym'],
-                                      self.random_walker.number_of_walks_ran,
-                                      self.random_walker.length_of_walk)
+        if self.random_walker.exact_hitting_times is not None:
+            # the hitting times are exact, so only nodes with equal hitting times are distance-symmetric
+            theta_sym = exact_hitting_time_tolerance
+        else:
+            theta_sym = compute_theta_sym(config['alpha_sym'],
+                                          self.random_walker.number_of_walks_ran,
+                                          self.random_walker.length_of_walk)
 
         close_nodes = get_commonly_encountered_nodes(nodes_random_walk_data=random_walk_data,
                                                      number_of_walks_ran=self.random_walker.number_of_walks_ran,
                                                      epsilon=config['epsilon'])
 
-        for node_type in self.hypergraph.node_types:
-            nodes_of_type = [node for node in close_nodes if node.node_type == node_type]
+        symmetric_node_groups = None
+        if config.get('colour_refinement_pre_clustering'):
+            symmetric_node_groups = find_symmetric_nodes(self.hypergraph, source_node,
+                                                         number_of_iterations=self.random_walker.length_of_walk)
+
+        # iterate in a fixed order, so that seeded runs consume random numbers in the same order in every process
+        for node_type in sorted(self.hypergraph.node_types):
+            nodes_of_type = sorted((node for node in close_nodes if node.node_type == node_type),
+                                   key=lambda node: node.name)
             if nodes_of_type:
                 single_nodes_of_type, clusters_of_type = \
                     cluster_nodes_by_path_similarity(nodes=nodes_of_type,
                                                      number_of_walks=self.random_walker.number_of_walks_ran,
                                                      length_of_walks=self.random_walker.length_of_walk,
                                                      theta_sym=theta_sym,
-                                                     config=config)
+                                                     config=config,
+                                                     symmetric_node_groups=symmetric_node_groups)
 
                 single_nodes.update(single_nodes_of_type)
                 clusters.extend(clusters_of_type)
@@ -101,6 +186,47 @@ class Communities(object):
         check_argument('max_path_length', config['max_path_length'], int, 0)
         check_argument('theta_p', config['theta_p'], float, 0)
         check_argument('multiprocessing', config['multiprocessing'], bool)
+        if config.get('exact_hitting_times') not in (None, 'auto'):
+            check_argument('exact_hitting_times', config['exact_hitting_times'], bool)
+        if config.get('seconds_per_walk_step') is not None:
+            check_argument('seconds_per_walk_step', config['seconds_per_walk_step'], float, 0)
+        if config.get('seconds_per_exact_operation') is not None:
+            check_argument('seconds_per_exact_operation', config['seconds_per_exact_operation'], float, 0)
+        if config.get('exact_path_distributions') is not None:
+            check_argument('exact_path_distributions', config['exact_path_distributions'], bool)
+        if config.get('path_distribution_state_budget') is not None:
+            check_argument('path_distribution_state_budget', config['path_distribution_state_budget'], int, 0)
+        if config.get('number_of_processes') is not None:
+            check_argument('number_of_processes', config['number_of_processes'], int, 1, strict_inequalities=False)
+        if config.get('collapse_equivalent_sources') is not None:
+            check_argument('collapse_equivalent_sources', config['collapse_equivalent_sources'], bool)
+        if config.get('colour_refinement_pre_clustering') is not None:
+            check_argument('colour_refinement_pre_clustering', config['colour_refinement_pre_clustering'], bool)
+        if config.get('seed') is not None:
+            check_argument('seed', config['seed'], int)
+
+
+# the Communities whose communities are computed, sent once to each worker process by _compute_communities
+_worker_communities = None
+
+
+def _set_worker_communities(communities: Communities):
+    global _worker_communities
+    _worker_communities = communities
+
+
+def _get_community_in_worker(source_node: str):
+    return _worker_communities.get_community(source_node, config=_worker_communities.config)
+
+
+def seed_random_number_generators(seed: int, source_node: str):
+    """
+    Seeds the random number generators used by the random walks and the clustering of nodes from a seed and a source
+    node, so that the community of the source node does not depend on which process computes it, or when.
+    """
+    source_node_seed = zlib.crc32(f'{seed}:{source_node}'.encode())
+    random.seed(source_node_seed)
+    np.random.seed(source_node_seed)
 
 
 class Community(object):
@@ -129,3 +255,11 @@ class Community(object):
         output_str += source_str + single_nodes_str + clusters_str + "\n"
 
         return output_str
+
+    def relabel(self, node_mapping: dict[str, str]):
+        """
+        Returns a copy of the community with each node in node_mapping replaced by the node it maps to.
+        """
+        return Community(source_node=node_mapping.get(self.source_node, self.source_node),
+                         single_nodes={node_mapping.get(node, node) for node in self.single_nodes},
+                         clusters=[[node_mapping.get(node, node) for node in cluster] for cluster in self.clusters])
@@ -1,8 +1,13 @@
 import os
+import shutil
+import tempfile
 
 from Communities import *
+from CommunityRecord import CommunityRecord, write_records_to_alchemy_files
 from collections import defaultdict
+from multiprocessing import Pool, cpu_count
 import itertools
+from instrumentation import timed, record_attribute_sizes
 
 
 class CommunityPrinter(object):
@@ -13,9 +18,7 @@ class CommunityPrinter(object):
         self.num_of_communities = sum(len(communities.communities) for communities in self.list_of_communities)
 
         # Alchemy requires that each node in the original hypergraph is indexed with a unique id number
-        self.node_to_node_id = defaultdict(int)
-        for node_id, node in enumerate(original_hypergraph.nodes.keys()):
-            self.node_to_node_id[node] = node_id
+        self.node_to_node_id = self._get_node_to_node_id_map(original_hypergraph)
 
         assert self.num_of_communities <= original_hypergraph.number_of_nodes(), f"Incorrect hypergraph provided for " \
                                                                                  f"original_hypergraph. More " \
@@ -27,10 +30,12 @@ class CommunityPrinter(object):
 
         # .ldb is a type of file used by Alchemy. This maps each node to its string representation for the ldb file.
         self.node_to_ldb_string = self._get_node_to_ldb_string_map()
+        record_attribute_sizes('community_printer', self, ['node_to_node_id', 'node_to_ldb_string'])
 
         self.hypergraph_number = 0
         self.community_number = 0
 
+    @timed('file_output')
     def write_files(self, file_name: str):
         self._write_ldb_file(file_name)
         self._write_uldb_file(file_name)
@@ -59,13 +64,12 @@ class CommunityPrinter(object):
 
             self._write_header(file)
 
-            for hypergraph_number, communities in enumerate(self.list_of_communities):
+            for hypergraph_number, community_number, communities, community in self._enumerate_communities():
                 self.hypergraph_number = hypergraph_number
-                for community_number, community in enumerate(communities.communities.values()):
-                    self.community_number = community_number
-                    ldb_atoms = self._get_atoms_of_community(community, hypergraph_of_community=communities.hypergraph,
-                                                             string_type='ldb')
-                    self._write_atoms_to_file(ldb_atoms, file)
+                self.community_number = community_number
+                ldb_atoms = self._get_atoms_of_community(community, hypergraph_of_community=communities.hypergraph,
+                                                         string_type='ldb')
+                self._write_atoms_to_file(ldb_atoms, file)
 
             self._write_footer(file)
 
@@ -93,13 +97,12 @@ class CommunityPrinter(object):
 
             self._write_header(file)
 
-            for hypergraph_number, communities in enumerate(self.list_of_communities):
+            for hypergraph_number, community_number, communities, community in self._enumerate_communities():
                 self.hypergraph_number = hypergraph_number
-                for community_number, community in enumerate(communities.communities.values()):
-                    self.community_number = community_number
-                    uldb_atoms = self._get_atoms_of_community(community, hypergraph_of_community=communities.hypergraph,
-                                                              string_type='uldb')
-                    self._write_atoms_to_file(uldb_atoms, file)
+                self.community_number = community_number
+                uldb_atoms = self._get_atoms_of_community(community, hypergraph_of_community=communities.hypergraph,
+                                                          string_type='uldb')
+                self._write_atoms_to_file(uldb_atoms, file)
 
             self._write_footer(file)
 
@@ -124,19 +127,32 @@ class CommunityPrinter(object):
 
             self._write_header(file)
 
-            for hypergraph_number, communities in enumerate(self.list_of_communities):
+            for hypergraph_number, community_number, communities, community in self._enumerate_communities():
                 self.hypergraph_number = hypergraph_number
-                for community_number, community in enumerate(communities.communities.values()):
-                    self.community_number = community_number
-                    single_node_ids, cluster_node_ids = self._get_node_ids(community)
+                self.community_number = community_number
+                single_node_ids, cluster_node_ids = self._get_node_ids(community)
 
-                    self._write_community_source_node_to_file(community, file)
-                    self._write_single_node_ids_to_file(single_node_ids, file)
-                    self._write_cluster_node_ids_to_file(cluster_node_ids, file)
-                    self._write_all_node_ids_to_file(single_node_ids, cluster_node_ids, file)
+                self._write_community_source_node_to_file(community, file)
+                self._write_single_node_ids_to_file(single_node_ids, file)
+                self._write_cluster_node_ids_to_file(cluster_node_ids, file)
+                self._write_all_node_ids_to_file(single_node_ids, cluster_node_ids, file)
 
             self._write_footer(file)
 
+    def _enumerate_communities(self):
+        """
+        Iterates over the communities of every hypergraph cluster, yielding
+        (hypergraph_number, community_number, communities, community).
+
+        Communities are numbered consecutively across all hypergraph clusters, so that each #START_DB id is unique
+        within a file.
+        """
+        community_number = 0
+        for hypergraph_number, communities in enumerate(self.list_of_communities):
+            for community in communities.communities.values():
+                yield hypergraph_number, community_number, communities, community
+                community_number += 1
+
     def _write_header(self, file):
         header = '#START_GRAPH  #COMS {}\n\n'.format(self.num_of_communities)
         file.write(header)
@@ -259,6 +275,14 @@ class CommunityPrinter(object):
 
         return single_node_ids, cluster_node_ids  # list[int], list[list[int]]
 
+    @staticmethod
+    def _get_node_to_node_id_map(original_hypergraph):
+        node_to_node_id = defaultdict(int)
+        for node_id, node in enumerate(original_hypergraph.nodes.keys()):
+            node_to_node_id[node] = node_id
+
+        return node_to_node_id
+
     def _get_node_to_ldb_string_map(self):
         """
         Loops over every node in the communities and assigns it an appropriate
@@ -268,15 +292,121 @@ class CommunityPrinter(object):
                                         representation for output to the .ldb file
         """
         node_to_ldb_string = defaultdict(lambda: defaultdict(dict))
-        for hypergraph_id, communities in enumerate(self.list_of_communities):
-            for community_number, community in enumerate(communities.communities.values()):
-                for single_node in community.single_nodes:
-                    node_to_ldb_string[hypergraph_id][community_number][single_node] = 'NODE_' + str(
-                        self.node_to_node_id[single_node])
+        for hypergraph_id, community_number, communities, community in self._enumerate_communities():
+            node_to_ldb_string[hypergraph_id][community_number] = self._get_node_to_ldb_string_map_of_community(
+                community)
+
+        return node_to_ldb_string
 
-                for cluster_number, cluster in enumerate(community.clusters):
-                    for cluster_node in cluster:
-                        node_to_ldb_string[hypergraph_id][community_number][cluster_node] = 'CLUST_' + str(
-                            cluster_number)
+    def _get_node_to_ldb_string_map_of_community(self, community: Community):
+        node_to_ldb_string = {}
+        for single_node in community.single_nodes:
+            node_to_ldb_string[single_node] = 'NODE_' + str(self.node_to_node_id[single_node])
+
+        for cluster_number, cluster in enumerate(community.clusters):
+            for cluster_node in cluster:
+                node_to_ldb_string[cluster_node] = 'CLUST_' + str(cluster_number)
 
         return node_to_ldb_string
+
+
+class BufferedCommunityPrinter(CommunityPrinter):
+    """
+    Writes the same .ldb, .uldb and .srcnclusts files as CommunityPrinter, but in a single pass over the communities.
+
+    The atoms of each community are computed once (see CommunityRecord.py) and all three entries are rendered from
+    them. Entries are accumulated in memory and written to the files in batches of roughly buffer_size characters,
+    rather than through many small writes.
+    """
+
+    def __init__(self, list_of_communities: list[Communities], original_hypergraph, buffer_size=1 << 22):
+        super().__init__(list_of_communities, original_hypergraph)
+        self.buffer_size = buffer_size
+
+    @timed('file_output')
+    def write_files(self, file_name: str):
+        records = (CommunityRecord.from_community(community, hypergraph_of_community=communities.hypergraph,
+                                                  node_to_node_id=self.node_to_node_id)
+                   for _, _, communities, community in self._enumerate_communities())
+
+        write_records_to_alchemy_files(file_name, records, self.num_of_communities, buffer_size=self.buffer_size)
+
+    def _get_node_to_ldb_string_map(self):
+        # the ldb strings are derived from each community's CommunityRecord as it is written
+        return {}
+
+
+class ParallelCommunityPrinter(BufferedCommunityPrinter):
+    """
+    Writes the same .ldb, .uldb and .srcnclusts files as CommunityPrinter, rendering the entries in worker processes.
+
+    Each hypergraph cluster is a shard: a worker renders the entries of all of its communities into three temporary
+    shard files. Since the number of communities of every cluster is known up front, each worker is told the number of
+    its first community and numbers its entries consecutively from there, so the shards can be concatenated in order,
+    byte for byte, behind a header carrying the total number of communities.
+    """
+
+    def __init__(self, list_of_communities: list[Communities], original_hypergraph, processes=None,
+                 buffer_size=1 << 22):
+        super().__init__(list_of_communities, original_hypergraph, buffer_size=buffer_size)
+        self.processes = cpu_count() if processes is None else processes
+
+    @timed('file_output')
+    def write_files(self, file_name: str):
+        extensions = ['.ldb', '.uldb', '.srcnclusts']
+        shard_directory = tempfile.mkdtemp(prefix='shards_', dir=os.path.dirname(os.path.abspath(file_name)))
+
+        try:
+            shard_arguments = []
+            first_community_number = 0
+            for shard_number, communities in enumerate(self.list_of_communities):
+                shard_arguments.append((os.path.join(shard_directory, str(shard_number)),
+                                        list(communities.communities.values()),
+                                        communities.hypergraph,
+                                        first_community_number,
+                                        self.buffer_size))
+                first_community_number += len(communities.communities)
+
+            with Pool(processes=self.processes, initializer=_set_shard_node_to_node_id,
+                      initargs=(self.node_to_node_id,)) as pool:
+                shard_prefixes = pool.starmap(_write_shard, shard_arguments)
+
+            for extension in extensions:
+                with open(os.path.join(file_name + extension), 'wb') as file:
+                    file.write('#START_GRAPH  #COMS {}\n\n'.format(self.num_of_communities).encode())
+                    for shard_prefix in shard_prefixes:
+                        with open(shard_prefix + extension, 'rb') as shard_file:
+                            shutil.copyfileobj(shard_file, file, self.buffer_size)
+                    file.write('#END_GRAPH\n'.encode())
+        finally:
+            shutil.rmtree(shard_directory, ignore_errors=True)
+
+
+# node ids of the original hypergraph, sent once to each worker process of a ParallelCommunityPrinter
+_shard_node_to_node_id = None
+
+
+def _set_shard_node_to_node_id(node_to_node_id: dict):
+    global _shard_node_to_node_id
+    _shard_node_to_node_id = node_to_node_id
+
+
+def _write_shard(shard_prefix: str, communities: list[Community], hypergraph_of_communities, first_community_number: int,
+                 buffer_size: int):
+    """
+    Renders the .ldb, .uldb and .srcnclusts entries of a list of communities into three shard files, numbering the
+    communities consecutively from first_community_number. Returns the common prefix of the shard files.
+    """
+    entries = ([], [], [])
+    for community_number, community in enumerate(communities, start=first_community_number):
+        record = CommunityRecord.from_community(community, hypergraph_of_community=hypergraph_of_communities,
+                                                node_to_node_id=_shard_node_to_node_id)
+        entries[0].append(record.ldb_string(community_number))
+        entries[1].append(record.uldb_string(community_number))
+        entries[2].append(record.srcnclusts_string(community_number))
+
+    for extension, entries_of_file in zip(['.ldb', '.uldb', '.srcnclusts'], entries):
+        with open(shard_prefix + extension, 'w', buffering=buffer_size) as shard_file:
+            shard_file.write(''.join(entries_of_file))
+
+    return shard_prefix
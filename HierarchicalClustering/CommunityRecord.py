@@ -0,0 +1,160 @@
+import os
+
+from Communities import Community
+from GraphObjects import Hypergraph
+
+
+class CommunityRecord(object):
+    """
+    Integer-coded representation of a community, holding everything needed to render its entries in the .ldb, .uldb
+    and .srcnclusts files required by Alchemy.
+
+    The atoms of the community (the hyperedges of the hypergraph whose nodes are all members of the community) are
+    computed once, and both the .ldb and the .uldb strings are rendered from them. Nodes are referred to by their
+    Alchemy node ids, and every list is sorted so that the rendered records do not depend on set iteration order.
+    """
+
+    def __init__(self, source_node_id: int, single_node_ids: list[int], cluster_node_ids: list[list[int]],
+                 atoms: list[tuple[str, tuple[int, ...]]]):
+        self.source_node_id = source_node_id
+        self.single_node_ids = single_node_ids      # list(node_id), sorted
+        self.cluster_node_ids = cluster_node_ids    # list(list(node_id)), each sorted, in the order of the clusters
+        self.atoms = atoms                          # list((predicate, tuple(node_id))), sorted
+
+        self.number_of_single_nodes = len(single_node_ids)
+        self.number_of_clusters = len(cluster_node_ids)
+        self.number_of_nodes = self.number_of_single_nodes + sum(len(node_ids) for node_ids in cluster_node_ids)
+
+    @classmethod
+    def from_community(cls, community: Community, hypergraph_of_community: Hypergraph, node_to_node_id: dict):
+        single_node_ids = sorted(node_to_node_id[node] for node in community.single_nodes)
+        cluster_node_ids = [sorted(node_to_node_id[node] for node in cluster) for cluster in community.clusters]
+
+        atoms = {(predicate, tuple(node_to_node_id[node] for node in nodes_of_edge))
+                 for predicate, nodes_of_edge in get_atoms_of_community(community, hypergraph_of_community)}
+
+        return cls(source_node_id=node_to_node_id[community.source_node],
+                   single_node_ids=single_node_ids,
+                   cluster_node_ids=cluster_node_ids,
+                   atoms=sorted(atoms))
+
+    def ldb_string(self, community_number: int):
+        """
+        The .ldb entry of the community, with each node replaced by its node id if it is a single node, or by its
+        cluster id if it belongs to a cluster. Atoms which become identical after this replacement are written once.
+        """
+        node_id_to_ldb_string = {node_id: 'NODE_' + str(node_id) for node_id in self.single_node_ids}
+        for cluster_number, node_ids in enumerate(self.cluster_node_ids):
+            cluster_string = 'CLUST_' + str(cluster_number)
+            node_id_to_ldb_string.update((node_id, cluster_string) for node_id in node_ids)
+
+        atom_strings = sorted({predicate + '(' + ','.join(node_id_to_ldb_string[node_id] for node_id in node_ids) +
+                               ')\n' for predicate, node_ids in self.atoms})
+
+        return self._atoms_string(atom_strings, community_number)
+
+    def uldb_string(self, community_number: int):
+        """
+        The .uldb entry of the community, with each node replaced by its node id.
+        """
+        atom_strings = sorted({predicate + '(' + ','.join('NODE_' + str(node_id) for node_id in node_ids) + ')\n'
+                               for predicate, node_ids in self.atoms})
+
+        return self._atoms_string(atom_strings, community_number)
+
+    def srcnclusts_string(self, community_number: int):
+        """
+        The .srcnclusts entry of the community, listing the source node, the single nodes, the nodes of each cluster
+        and finally all nodes of the community.
+        """
+        lines = ['#START_DB {} #NUM_SINGLES {} #NUM_CLUSTS {} #NUM_NODES {}\n'.format(community_number,
+                                                                                    self.number_of_single_nodes,
+                                                                                    self.number_of_clusters,
+                                                                                    self.number_of_nodes),
+                 'SRC {}\n'.format(self.source_node_id)]
+        lines.extend(str(node_id) + '\n' for node_id in self.single_node_ids)
+        lines.extend('CLUST {}  {}\n'.format(cluster_number, ' '.join(map(str, node_ids)))
+                     for cluster_number, node_ids in enumerate(self.cluster_node_ids))
+
+        all_node_ids = sorted(self.single_node_ids + [node_id for node_ids in self.cluster_node_ids
+                                                      for node_id in node_ids])
+        lines.append('NODES {}\n'.format(' '.join(map(str, all_node_ids))))
+        lines.append('#END_DB\n\n')
+
+        return ''.join(lines)
+
+    @staticmethod
+    def _atoms_string(atom_strings: list[str], community_number: int):
+        return '#START_DB {} #COM 1 #NUM_ATOMS {} \n'.format(community_number, len(atom_strings)) + \
+               ''.join(atom_strings) + '#END_DB\n\n'
+
+
+def get_atoms_of_community(community: Community, hypergraph_of_community: Hypergraph):
+    """
+    Finds all hyperedges of the hypergraph whose nodes are all members of the community.
+
+    Each hyperedge is visited once, via the membership lists of the community's nodes, and the singleton edges are
+    looked up directly by node, so the cost is proportional to the degrees of the community's nodes rather than to the
+    size of the hypergraph.
+
+    :returns: atoms - a set of (predicate, tuple(node_name)) pairs
+    """
+    atoms = set()
+    visited_edges = set()
+    for node in community.nodes:
+        for edge in hypergraph_of_community.memberships.get(node, ()):
+            if edge in visited_edges:
+                continue
+            visited_edges.add(edge)
+
+            nodes_of_edge = hypergraph_of_community.edges[edge]
+            if all(node_of_edge in community.nodes for node_of_edge in nodes_of_edge):
+                atoms.add((hypergraph_of_community.predicates[edge], tuple(nodes_of_edge)))
+
+        for predicate in hypergraph_of_community.singleton_edges.get(node, ()):
+            atoms.add((predicate, (node,)))
+
+    return atoms
+
+
+def write_records_to_alchemy_files(file_name: str, records, number_of_communities: int, buffer_size=1 << 22):
+    """
+    Writes the .ldb, .uldb and .srcnclusts files required by Alchemy from an iterable of CommunityRecords, numbering the
+    communities consecutively from zero.
+
+    Entries are accumulated in memory and written to the files in batches of roughly buffer_size characters, rather
+    than through many small writes.
+    """
+    extensions = ['.ldb', '.uldb', '.srcnclusts']
+    files = [open(os.path.join(file_name + extension), 'w', buffering=buffer_size) for extension in extensions]
+    buffers = [[] for _ in extensions]
+    buffered_size = 0
+
+    try:
+        for file in files:
+            file.write('#START_GRAPH  #COMS {}\n\n'.format(number_of_communities))
+
+        for community_number, record in enumerate(records):
+            for buffer, entry in zip(buffers, [record.ldb_string(community_number),
+                                               record.uldb_string(community_number),
+                                               record.srcnclusts_string(community_number)]):
+                buffer.append(entry)
+                buffered_size += len(entry)
+
+            if buffered_size >= buffer_size:
+                _flush_buffers(buffers, files)
+                buffered_size = 0
+
+        _flush_buffers(buffers, files)
+
+        for file in files:
+            file.write('#END_GRAPH\n')
+    finally:
+        for file in files:
+            file.close()
+
+
+def _flush_buffers(buffers: list[list[str]], files):
+    for buffer, file in zip(buffers, files):
+        file.write(''.join(buffer))
+        buffer.clear()
@@ -0,0 +1,104 @@
+import os
+import shutil
+import tempfile
+
+from Communities import Communities, Community
+from CommunityPrinter import CommunityPrinter
+from CommunityRecord import CommunityRecord
+from GraphObjects import Hypergraph
+from instrumentation import timed
+
+
+class CommunityWriter(object):
+    """
+    Writes the .ldb, .uldb and .srcnclusts files required by Alchemy incrementally, one community at a time.
+
+    Unlike CommunityPrinter, the communities do not need to be known up front. Each community is appended to a
+    temporary body file (next to the output files) as soon as it is received and is then discarded, so memory stays
+    flat regardless of the number of source nodes. The #COMS count in the header of each file is not known until the
+    last community has been written, so the files are only assembled, from the exact header, the body and the footer,
+    when the writer is closed. The files written are the same as those of BufferedCommunityPrinter for the same
+    communities.
+
+    Example usage:
+        with CommunityWriter(file_name='imdb', original_hypergraph=original_hypergraph) as writer:
+            for hypergraph in hypergraph_clusters:
+                writer.write_communities(Communities(hypergraph, config=config, lazy=True))
+    """
+
+    def __init__(self, file_name: str, original_hypergraph: Hypergraph):
+        self.original_hypergraph = original_hypergraph
+        self.num_of_communities = 0
+
+        # Alchemy requires that each node in the original hypergraph is indexed with a unique id number
+        self.node_to_node_id = CommunityPrinter._get_node_to_node_id_map(original_hypergraph)
+
+        self.hypergraph_number = -1
+        self.community_number = 0
+
+        self.file_name = file_name
+        self.body_directory = tempfile.mkdtemp(prefix='bodies_', dir=os.path.dirname(os.path.abspath(file_name)))
+        self.files = {extension: open(os.path.join(self.body_directory, extension), 'w')
+                      for extension in ['.ldb', '.uldb', '.srcnclusts']}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def write_communities(self, communities: Communities):
+        """
+        Consumes the communities of a hypergraph cluster lazily, writing each one out as it is generated.
+        """
+        self.start_hypergraph()
+        for community in communities.generate_communities():
+            self.write_community(community, hypergraph_of_community=communities.hypergraph)
+
+    def start_hypergraph(self):
+        """
+        Marks the start of the communities of a new hypergraph cluster. As in CommunityPrinter, communities are
+        numbered consecutively across hypergraph clusters.
+        """
+        self.hypergraph_number += 1
+
+    @timed('file_output')
+    def write_community(self, community: Community, hypergraph_of_community: Hypergraph):
+        if self.hypergraph_number < 0:
+            self.start_hypergraph()
+
+        record = CommunityRecord.from_community(community, hypergraph_of_community=hypergraph_of_community,
+                                                node_to_node_id=self.node_to_node_id)
+        self.files['.ldb'].write(record.ldb_string(self.community_number))
+        self.files['.uldb'].write(record.uldb_string(self.community_number))
+        self.files['.srcnclusts'].write(record.srcnclusts_string(self.community_number))
+
+        self.community_number += 1
+        self.num_of_communities += 1
+
+    @timed('file_output')
+    def close(self):
+        """
+        Writes the files, each with its header, the communities written and its footer, and removes the body files.
+        """
+        if not self.files:
+            return None
+
+        try:
+            for file in self.files.values():
+                file.close()
+
+            assert self.num_of_communities <= self.original_hypergraph.number_of_nodes(), \
+                f"Incorrect hypergraph provided for original_hypergraph. More communities written " \
+                f"({self.num_of_communities}) than the number of nodes in original_hypergraph " \
+                f"({self.original_hypergraph.number_of_nodes()})."
+
+            for extension in self.files:
+                with open(os.path.join(self.file_name + extension), 'w') as file:
+                    file.write('#START_GRAPH  #COMS {}\n\n'.format(self.num_of_communities))
+                    with open(os.path.join(self.body_directory, extension), 'r') as body_file:
+                        shutil.copyfileobj(body_file, file)
+                    CommunityPrinter._write_footer(file)
+        finally:
+            self.files = {}
+            shutil.rmtree(self.body_directory, ignore_errors=True)
@@ -0,0 +1,199 @@
+import gzip
+import io
+import json
+import struct
+
+import numpy as np
+
+from Communities import Communities
+from CommunityRecord import CommunityRecord, write_records_to_alchemy_files
+from GraphObjects import Hypergraph
+from instrumentation import timed
+
+
+class CompactCommunityFile(object):
+    """
+    Columnar, integer-coded store of the communities of a hypergraph, written as a single compressed file.
+
+    The text files required by Alchemy repeat every predicate name and every node id once per atom, and do so three
+    times over (.ldb, .uldb and .srcnclusts). This file instead holds one flat array per field of the CommunityRecords
+    (source node ids, single node ids, cluster members, atom predicates and atom arguments), with offset arrays marking
+    where each community (and each cluster and atom) begins. Predicate and node names are stored once, in a header.
+
+    File layout:
+        magic (8 bytes) | compression (1 byte) | compressed payload
+    where the payload is
+        header length (uint32, little endian) | JSON header | column 0 | column 1 | ...
+    and each column is a little endian int32 array whose length is given in the header.
+
+    The Alchemy files are regenerated with write_alchemy_files. They are identical to those written by
+    BufferedCommunityPrinter (and ParallelCommunityPrinter) for the same communities, with the same ordering of the
+    atoms and the same numbering of the communities. CommunityPrinter writes the same records, but orders the atoms of
+    each community differently.
+
+    Example usage:
+        CompactCommunityFile.from_communities(hypergraph_communities, original_hypergraph).write('imdb.coms')
+        CompactCommunityFile.read('imdb.coms').write_alchemy_files('imdb')
+    """
+
+    magic = b'MLNCOMS1'
+    compressions = {'gzip': 1, 'zstd': 2}
+    column_names = ['source_node_ids',
+                    'single_node_offsets', 'single_node_ids',
+                    'cluster_offsets', 'cluster_member_offsets', 'cluster_member_ids',
+                    'atom_offsets', 'atom_predicate_ids', 'atom_argument_offsets', 'atom_argument_ids']
+    dtype = np.dtype('<i4')
+
+    def __init__(self, predicates: list[str], node_names: list[str], columns: dict[str, np.ndarray]):
+        self.predicates = predicates        # list(predicate), indexed by predicate id
+        self.node_names = node_names        # list(node), indexed by Alchemy node id
+        self.columns = columns              # dict(column name: np.array(int32))
+
+        self.number_of_communities = len(columns['source_node_ids'])
+
+    @classmethod
+    def from_communities(cls, list_of_communities: list[Communities], original_hypergraph: Hypergraph):
+        """
+        Encodes the communities of each hypergraph cluster, numbering them consecutively across clusters as the
+        community printers do.
+        """
+        node_to_node_id = {node: node_id for node_id, node in enumerate(original_hypergraph.nodes.keys())}
+        records = (CommunityRecord.from_community(community, hypergraph_of_community=communities.hypergraph,
+                                                  node_to_node_id=node_to_node_id)
+                   for communities in list_of_communities for community in communities.communities.values())
+
+        return cls.from_records(records, node_names=list(node_to_node_id.keys()))
+
+    @classmethod
+    def from_records(cls, records, node_names: list[str]):
+        predicate_to_predicate_id = {}
+        columns = {column_name: [] for column_name in cls.column_names}
+        for column_name in ['single_node_offsets', 'cluster_offsets', 'cluster_member_offsets', 'atom_offsets',
+                            'atom_argument_offsets']:
+            columns[column_name].append(0)
+
+        for record in records:
+            columns['source_node_ids'].append(record.source_node_id)
+
+            columns['single_node_ids'].extend(record.single_node_ids)
+            columns['single_node_offsets'].append(len(columns['single_node_ids']))
+
+            for node_ids in record.cluster_node_ids:
+                columns['cluster_member_ids'].extend(node_ids)
+                columns['cluster_member_offsets'].append(len(columns['cluster_member_ids']))
+            columns['cluster_offsets'].append(len(columns['cluster_member_offsets']) - 1)
+
+            for predicate, node_ids in record.atoms:
+                predicate_id = predicate_to_predicate_id.setdefault(predicate, len(predicate_to_predicate_id))
+                columns['atom_predicate_ids'].append(predicate_id)
+                columns['atom_argument_ids'].extend(node_ids)
+                columns['atom_argument_offsets'].append(len(columns['atom_argument_ids']))
+            columns['atom_offsets'].append(len(columns['atom_predicate_ids']))
+
+        return cls(predicates=list(predicate_to_predicate_id.keys()),
+                   node_names=node_names,
+                   columns={column_name: np.asarray(column, dtype=cls.dtype) for column_name, column in columns.items()})
+
+    def records(self):
+        """
+        Decodes the CommunityRecords, in the order in which the communities are numbered.
+        """
+        columns = {column_name: column.tolist() for column_name, column in self.columns.items()}
+        single_node_offsets = columns['single_node_offsets']
+        cluster_offsets = columns['cluster_offsets']
+        cluster_member_offsets = columns['cluster_member_offsets']
+        atom_offsets = columns['atom_offsets']
+        atom_argument_offsets = columns['atom_argument_offsets']
+
+        for community_number, source_node_id in enumerate(columns['source_node_ids']):
+            single_node_ids = columns['single_node_ids'][single_node_offsets[community_number]:
+                                                         single_node_offsets[community_number + 1]]
+
+            cluster_node_ids = [columns['cluster_member_ids'][cluster_member_offsets[cluster]:
+                                                              cluster_member_offsets[cluster + 1]]
+                                for cluster in range(cluster_offsets[community_number],
+                                                     cluster_offsets[community_number + 1])]
+
+            atoms = [(self.predicates[columns['atom_predicate_ids'][atom]],
+                      tuple(columns['atom_argument_ids'][atom_argument_offsets[atom]:atom_argument_offsets[atom + 1]]))
+                     for atom in range(atom_offsets[community_number], atom_offsets[community_number + 1])]
+
+            yield CommunityRecord(source_node_id=source_node_id,
+                                  single_node_ids=single_node_ids,
+                                  cluster_node_ids=cluster_node_ids,
+                                  atoms=atoms)
+
+    @timed('file_output')
+    def write(self, path: str, compression='gzip', level=None):
+        if compression not in self.compressions:
+            raise ValueError(f"Unsupported compression {compression}. Expected one of {list(self.compressions)}.")
+
+        header = json.dumps({'number_of_communities': self.number_of_communities,
+                             'predicates': self.predicates,
+                             'node_names': self.node_names,
+                             'columns': [[column_name, len(self.columns[column_name])]
+                                         for column_name in self.column_names]}).encode()
+
+        payload = io.BytesIO()
+        payload.write(struct.pack('<I', len(header)))
+        payload.write(header)
+        for column_name in self.column_names:
+            payload.write(self.columns[column_name].astype(self.dtype, copy=False).tobytes())
+
+        with open(path, 'wb') as file:
+            file.write(self.magic)
+            file.write(bytes([self.compressions[compression]]))
+            file.write(_compress(payload.getvalue(), compression, level))
+
+    @classmethod
+    def read(cls, path: str):
+        with open(path, 'rb') as file:
+            if file.read(len(cls.magic)) != cls.magic:
+                raise ValueError(f"{path} is not a compact community file.")
+            compression_code = file.read(1)[0]
+            compression = {code: compression for compression, code in cls.compressions.items()}.get(compression_code)
+            if compression is None:
+                raise ValueError(f"{path} uses an unknown compression ({compression_code}).")
+            payload = memoryview(_decompress(file.read(), compression))
+
+        header_length, = struct.unpack_from('<I', payload)
+        header = json.loads(bytes(payload[4:4 + header_length]))
+
+        columns = {}
+        offset = 4 + header_length
+        for column_name, length in header['columns']:
+            columns[column_name] = np.frombuffer(payload, dtype=cls.dtype, count=length, offset=offset)
+            offset += length * cls.dtype.itemsize
+
+        return cls(predicates=header['predicates'], node_names=header['node_names'], columns=columns)
+
+    @timed('file_output')
+    def write_alchemy_files(self, file_name: str, buffer_size=1 << 22):
+        """
+        Writes the .ldb, .uldb and .srcnclusts files required by Alchemy.
+        """
+        write_records_to_alchemy_files(file_name, self.records(), self.number_of_communities, buffer_size=buffer_size)
+
+
+def _compress(data: bytes, compression: str, level=None):
+    if compression == 'gzip':
+        return gzip.compress(data, compresslevel=9 if level is None else level)
+    else:
+        return _import_zstandard().ZstdCompressor(level=3 if level is None else level).compress(data)
+
+
+def _decompress(data: bytes, compression: str):
+    if compression == 'gzip':
+        return gzip.decompress(data)
+    else:
+        return _import_zstandard().ZstdDecompressor().decompress(data)
+
+
+def _import_zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("zstd compression requires the zstandard package (pip install zstandard).")
+
+    return zstandard
+
@@ -0,0 +1,126 @@
+from functools import partial
+from multiprocessing import Pool, cpu_count
+
+from database import parse_line, is_empty_or_comment
+from errors import InvalidLineSyntaxError
+from GraphObjects import Hypergraph
+from instrumentation import timed
+
+
+class DatabaseBatch(object):
+    """
+    The databases of a cross-validation experiment (one .db file per fold, sharing one .info file), each parsed once.
+
+    The info file is parsed once and the database files are parsed in parallel. The constants of all the databases are
+    interned into one shared dictionary, so that a constant that appears in several folds is held in memory once.
+    Hypergraphs of single folds, and of the union of all folds but one (the training set of a leave-one-out
+    experiment), are then built from the parsed atoms without reading the database files again.
+
+    Example usage:
+        batch = DatabaseBatch(database_files=['imdb1.db', 'imdb2.db', 'imdb3.db'], info_file='imdb.info')
+        test_hypergraph = batch.fold_hypergraph(0)                  # the same as Hypergraph('imdb1.db', 'imdb.info')
+        training_hypergraph = batch.leave_one_out_hypergraph(0)     # imdb2.db and imdb3.db together
+    """
+
+    def __init__(self, database_files: list[str], info_file: str, processes=None):
+        if not database_files:
+            raise ValueError("Cannot load databases. No database files provided.")
+
+        self.database_files = list(database_files)
+        self.info_file = info_file
+
+        schema = Hypergraph()
+        self.predicate_argument_types = schema._get_predicate_argument_types_from_info_file(info_file)
+        self.node_types = schema.node_types
+
+        self.constants = {}     # dict(constant: constant), the canonical copy of each constant across all folds
+        self.fold_atoms = self._parse_database_files(processes)  # list(list((predicate, list(constant)))), per fold
+
+    def __len__(self):
+        return len(self.database_files)
+
+    @timed('hypergraph_load')
+    def _parse_database_files(self, processes=None):
+        parse = partial(_parse_database_file, predicate_argument_types=self.predicate_argument_types,
+                        info_file=self.info_file)
+        if processes == 1 or len(self.database_files) == 1:
+            parsed_files = [parse(database_file) for database_file in self.database_files]
+        else:
+            with Pool(processes=min(processes or cpu_count(), len(self.database_files))) as pool:
+                parsed_files = pool.map(parse, self.database_files)
+
+        # each worker process returns its own copies of the constants, which are replaced by the shared copy
+        return [[(predicate, [self.constants.setdefault(constant, constant) for constant in constants])
+                 for predicate, constants in atoms]
+                for atoms in parsed_files]
+
+    def fold_hypergraph(self, fold: int):
+        """
+        The hypergraph of a single database file, identical to Hypergraph(database_file, info_file).
+        """
+        self._check_fold(fold)
+
+        return self._build_hypergraph([fold])
+
+    def leave_one_out_hypergraph(self, fold: int):
+        """
+        The hypergraph of all database files except the given fold, with edges numbered consecutively in fold order.
+        """
+        self._check_fold(fold)
+
+        return self._build_hypergraph([other_fold for other_fold in range(len(self)) if other_fold != fold])
+
+    def leave_one_out_hypergraphs(self):
+        """
+        Yields (test database file, hypergraph of the remaining database files) for each fold.
+        """
+        for fold, database_file in enumerate(self.database_files):
+            yield database_file, self.leave_one_out_hypergraph(fold)
+
+    def _build_hypergraph(self, folds: list[int]):
+        hypergraph = Hypergraph()
+        hypergraph.predicate_argument_types = dict(self.predicate_argument_types)
+        hypergraph.node_types = set(self.node_types)
+
+        edge_id = 0
+        for fold in folds:
+            for predicate, constants in self.fold_atoms[fold]:
+                # the lists of constants are shared between hypergraphs, and must not be modified
+                hypergraph.add_edge(edge_id=edge_id, predicate=predicate, nodes=constants)
+                edge_id += 1
+
+        for node_name in hypergraph.nodes.keys():
+            hypergraph.is_source_node[node_name] = True
+
+        assert hypergraph.is_connected()
+
+        return hypergraph
+
+    def _check_fold(self, fold: int):
+        if not 0 <= fold < len(self):
+            raise IndexError(f"Fold {fold} out of range. There are {len(self)} database files.")
+
+
+def _parse_database_file(database_file: str, predicate_argument_types: dict, info_file: str):
+    """
+    Parses the ground atoms of a database file, returning a list of (predicate, list(constant)), and checks that they
+    agree with the predicate argument types of the info file.
+    """
+    atoms = []
+    with open(database_file, 'r') as file:
+        for line_idx, line in enumerate(file):
+            if is_empty_or_comment(line):
+                continue
+            predicate, constants = parse_line(line, line_idx, database_file)
+            if predicate is None:
+                raise InvalidLineSyntaxError(line.strip(), line_idx, database_file)
+            if predicate not in predicate_argument_types:
+                raise ValueError(f'Line {line_idx} "{line.strip()}" of {database_file} uses the predicate {predicate}, '
+                                 f'which is not in the info file {info_file}.')
+            if len(constants) != len(predicate_argument_types[predicate]):
+                raise ValueError(f'Line {line_idx} "{line.strip()}" of {database_file} has {len(constants)} arguments '
+                                 f'but {predicate} has {len(predicate_argument_types[predicate])} in the info file '
+                                 f'{info_file}.')
+            atoms.append((predicate, constants))
+
+    return atoms
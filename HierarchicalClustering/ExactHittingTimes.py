@@ -0,0 +1,101 @@
+import numpy as np
+
+from GraphObjects import Hypergraph
+from instrumentation import timed
+
+# the largest difference, due to round-off, between exactly computed hitting times that are equal
+exact_hitting_time_tolerance = 1e-9
+
+
+class ExactHittingTimes(object):
+    """
+    The exact average truncated hitting times of the random walks run by RandomWalker, computed from the transition
+    matrix of the walk rather than estimated by sampling walks.
+
+    At each step, the walk moves from a node to a uniformly random other member of a uniformly random non-singleton
+    hyperedge of the node (see Hypergraph.get_random_edge_and_neighbor_of_node). The truncated hitting time of a node v
+    by a walk of length L is min(T_v, L), where T_v >= 1 is the first step at which the walk is at v, so its average is
+        h(s, v) = sum_{t=0}^{L-1} P(T_v > t | walk started at s),
+    the same quantity that NodeRandomWalkData.calculate_average_hitting_time estimates. The survival probabilities of
+    every source s are computed together, by the backward recursion
+        g_0 = 1,    g_t = P (g_{t-1} with the entry of v set to zero),
+    in which the target v is taboo (absorbing). Several targets are propagated at once as the columns of a dense block,
+    so that the hitting times of all pairs of nodes cost (length of walk) x (number of nodes) x (non-zeros of P)
+    multiply-adds.
+
+    Example usage:
+        exact_hitting_times = ExactHittingTimes(hypergraph, length_of_walk=5)
+        hitting_times = exact_hitting_times.average_truncated_hitting_times(source_node='Person1')
+    """
+
+    def __init__(self, hypergraph: Hypergraph, length_of_walk: int, target_block_size=256):
+        self.length_of_walk = length_of_walk
+        self.target_block_size = target_block_size
+        self.node_names = list(hypergraph.nodes.keys())
+        self.node_indices = {node: node_index for node_index, node in enumerate(self.node_names)}
+        self.transition_matrix = compute_transition_matrix(hypergraph, self.node_indices)
+        self._hitting_times = None  # (number of nodes) x (number of nodes) array, computed when first needed
+
+    def average_truncated_hitting_times(self, source_node: str):
+        """
+        Returns dict(node: average truncated hitting time of the node by walks from source_node), for every node of
+        the hypergraph (including the source node, which is hit when the walk returns to it).
+        """
+        if self._hitting_times is None:
+            self._hitting_times = self.compute_hitting_times()
+
+        return dict(zip(self.node_names, self._hitting_times[self.node_indices[source_node]].tolist()))
+
+    @timed('exact_hitting_times')
+    def compute_hitting_times(self):
+        """
+        Returns an array of size (number of nodes) x (number of nodes) whose (s, v) entry is the average truncated
+        hitting time of node v by walks from node s.
+        """
+        number_of_nodes = len(self.node_names)
+        hitting_times = np.empty((number_of_nodes, number_of_nodes))
+        for block_start in range(0, number_of_nodes, self.target_block_size):
+            targets = np.arange(block_start, min(block_start + self.target_block_size, number_of_nodes))
+            columns = np.arange(len(targets))
+
+            survival_probabilities = np.ones((number_of_nodes, len(targets)))
+            block_hitting_times = survival_probabilities.copy()
+            for _ in range(self.length_of_walk - 1):
+                survival_probabilities[targets, columns] = 0
+                survival_probabilities = self.transition_matrix @ survival_probabilities
+                block_hitting_times += survival_probabilities
+
+            hitting_times[:, targets] = block_hitting_times
+
+        return hitting_times
+
+
+def compute_transition_matrix(hypergraph: Hypergraph, node_indices: dict[str, int]):
+    """
+    Returns the transition matrix of the random walk on the hypergraph, as a scipy.sparse CSR matrix whose (u, w) entry
+    is the probability that a walk at node u moves to node w in one step.
+    """
+    from scipy.sparse import csr_matrix
+
+    rows = []
+    columns = []
+    probabilities = []
+    for node, node_index in node_indices.items():
+        edges = hypergraph.memberships[node]
+        for edge in edges:
+            neighbors = hypergraph.edges[edge].copy()
+            neighbors.remove(node)
+            for neighbor in neighbors:
+                rows.append(node_index)
+                columns.append(node_indices[neighbor])
+                probabilities.append(1 / (len(edges) * len(neighbors)))
+
+    # repeated (u, w) entries, from several edges joining u and w, are summed
+    return csr_matrix((probabilities, (rows, columns)), shape=(len(node_indices), len(node_indices)))
+
+
+def number_of_transitions(hypergraph: Hypergraph):
+    """
+    An upper bound on the number of non-zero entries of the transition matrix of the hypergraph, without building it.
+    """
+    return sum(len(hypergraph.edges[edge]) - 1 for edges in hypergraph.memberships.values() for edge in edges)
@@ -0,0 +1,109 @@
+from collections import defaultdict
+
+import numpy as np
+
+from GraphObjects import Hypergraph
+from NodeRandomWalkData import NodeRandomWalkData
+from instrumentation import timed
+
+
+class ExactPathDistributions(object):
+    """
+    The exact path distributions (and average truncated hitting times) of the nodes of a hypergraph for random walks
+    from a source node, as estimated by RandomWalker from sampled walks, computed by dynamic programming over the states
+    (current node, sequence of predicates traversed so far) of the walk.
+
+    The path of a node is the sequence of predicates traversed up to the first step at which the walk is at the node.
+    Each state holds, for every target node, the probability of the walk being in that state without having hit the
+    target yet. When the walk moves into a state at a node, the probability held for that node is the probability of
+    it being first hit with the path of the state, and it is then removed from the state (the node is absorbing for
+    itself). The number of states can grow exponentially with the length of the walk, so the computation gives up, and
+    returns None, as soon as the states would hold more than state_budget probabilities.
+
+    Example usage:
+        exact_path_distributions = ExactPathDistributions(hypergraph, length_of_walk=5)
+        nodes_random_walk_data = exact_path_distributions.compute_node_random_walk_data('Person1', number_of_walks=1000)
+    """
+
+    def __init__(self, hypergraph: Hypergraph, length_of_walk: int, state_budget=10 ** 7):
+        self.hypergraph = hypergraph
+        self.length_of_walk = length_of_walk
+        self.state_budget = state_budget
+        self.node_names = list(hypergraph.nodes.keys())
+        self.node_indices = {node: node_index for node_index, node in enumerate(self.node_names)}
+        self.transitions = self._get_transitions()
+
+    def _get_transitions(self):
+        """
+        Returns dict(node: list((predicate, neighbor, probability))), the probability of each move of the walk from
+        each node, merging the moves to the same neighbor along edges of the same predicate.
+        """
+        transitions = {}
+        for node in self.node_names:
+            edges = self.hypergraph.memberships[node]
+            node_transitions = defaultdict(float)
+            for edge in edges:
+                neighbors = self.hypergraph.edges[edge].copy()
+                neighbors.remove(node)
+                predicate = str(self.hypergraph.predicates[edge]) + ','
+                for neighbor in neighbors:
+                    node_transitions[(predicate, neighbor)] += 1 / (len(edges) * len(neighbors))
+            transitions[node] = [(predicate, neighbor, probability)
+                                 for (predicate, neighbor), probability in node_transitions.items()]
+
+        return transitions
+
+    @timed('exact_path_distributions')
+    def compute_node_random_walk_data(self, source_node: str, number_of_walks: int):
+        """
+        Returns dict(node: NodeRandomWalkData) holding the expected statistics of number_of_walks random walks from
+        source_node: the path counts, number of hits and accumulated hitting times are number_of_walks times their
+        exact probabilities (so need not be integers), and the average truncated hitting times are exact. Returns None
+        if the computation would exceed the state budget.
+        """
+        number_of_nodes = len(self.node_names)
+        path_probabilities = [defaultdict(float) for _ in range(number_of_nodes)]
+        hit_probabilities = np.zeros(number_of_nodes)
+        accumulated_hitting_times = np.zeros(number_of_nodes)
+
+        # dict((node, path): probabilities of being in the state without having hit each node yet)
+        states = {(source_node, ''): np.ones(number_of_nodes)}
+        for step in range(1, self.length_of_walk + 1):
+            next_states = {}
+            for (node, path), probabilities in states.items():
+                for predicate, neighbor, transition_probability in self.transitions[node]:
+                    next_state = (neighbor, path + predicate)
+                    if next_state in next_states:
+                        next_states[next_state] += transition_probability * probabilities
+                    else:
+                        next_states[next_state] = transition_probability * probabilities
+
+                if len(next_states) * number_of_nodes > self.state_budget:
+                    return None
+
+            states = {}
+            for (node, path), probabilities in next_states.items():
+                node_index = self.node_indices[node]
+                first_hit_probability = probabilities[node_index]
+                if first_hit_probability > 0:
+                    path_probabilities[node_index][path] += float(first_hit_probability)
+                    hit_probabilities[node_index] += first_hit_probability
+                    accumulated_hitting_times[node_index] += step * first_hit_probability
+                    probabilities[node_index] = 0
+                if step < self.length_of_walk and probabilities.any():
+                    states[(node, path)] = probabilities
+
+        nodes_random_walk_data = {}
+        for node_index, node in enumerate(self.node_names):
+            node_random_walk_data = NodeRandomWalkData(node, self.hypergraph.nodes[node])
+            for path, probability in path_probabilities[node_index].items():
+                node_random_walk_data.path_counts[path] = number_of_walks * probability
+            hit_probability = float(hit_probabilities[node_index])
+            accumulated_hitting_time = float(accumulated_hitting_times[node_index])
+            node_random_walk_data.number_of_hits = number_of_walks * hit_probability
+            node_random_walk_data.accumulated_hitting_time = number_of_walks * accumulated_hitting_time
+            node_random_walk_data.average_hitting_time = accumulated_hitting_time + \
+                (1 - hit_probability) * self.length_of_walk
+            nodes_random_walk_data[node] = node_random_walk_data
+
+        return nodes_random_walk_data
@@ -5,6 +5,7 @@ from itertools import combinations
 from collections import defaultdict
 from networkx.algorithms.approximation.distance_measures import diameter as estimate_diameter
 from database import parse_line, is_empty_or_comment
+from instrumentation import timed, record_attribute_sizes
 
 
 class Graph(nx.Graph):
@@ -120,6 +121,7 @@ class Hypergraph(object):
 
         return is_connected
 
+    @timed('hypergraph_load')
     def construct_from_database(self, path_to_db_file: str, path_to_info_file=None):
 
         self.predicate_argument_types = self._get_predicate_argument_types_from_info_file(path_to_info_file)
@@ -146,6 +148,9 @@ class Hypergraph(object):
 
         assert self.is_connected()
 
+        record_attribute_sizes('hypergraph', self, ['singleton_edges', 'edges', 'predicates', 'nodes', 'memberships',
+                                                    'is_source_node'])
+
     def _get_predicate_argument_types_from_info_file(self, path_to_info_file: str):
         """
         Parses the info file and returns a dictionary that maps predicate names to a list of strings which specify
@@ -207,6 +212,7 @@ class Hypergraph(object):
 
         return edge, neighbor
 
+    @timed('clique_expansion')
     def convert_to_graph(self, weighted=True):
         """
         Convert to a weighted graph by replacing each n-ary hyperedge with n-cliques.
@@ -1,7 +1,10 @@
-from graph_utils import get_second_eigenpair
+from graph_utils import create_subgraph, get_second_eigenpair
 from cheeger_cut import cheeger_cut
 from GraphObjects import Graph, Hypergraph
+from BisectionTree import BisectionTree
+from cost_model import tune_stopping_criteria
 from errors import check_argument
+import instrumentation
 
 
 class HierarchicalClusterer(object):
@@ -20,6 +23,8 @@ class HierarchicalClusterer(object):
     3. Convert the graphs from the leaf nodes of the tree into hypergraphs using the original hypergraph as a template.
        Return the list of hypergraphs.
 
+    The stop criteria can instead be chosen by the cost model of cost_model.py, see from_cost_model.
+
     Configuration parameters (to specify stop criteria):
         min_cluster_size (int) - the smallest size (number of nodes) of the final graphs that are permitted.
         max_lambda2 (float in interval 0-2)    - the largest value of the second smallest eigenvalue of the graph's
@@ -33,19 +38,63 @@ class HierarchicalClusterer(object):
         self.hypergraph = hypergraph
         self.graph_clusters = []
         self.hypergraph_clusters = []
+        self.bisection_tree = None
 
         check_argument('min_cluster_size', self.min_cluster_size, int, 2)
         check_argument('max_lambda2', self.max_lambda2, float, 0, 2)
         assert self.hypergraph.number_of_nodes() > self.min_cluster_size, \
             "min_cluster_size needs to be smaller than the number of nodes in the hypergraph"
 
-    def run_hierarchical_clustering(self):
+    @classmethod
+    def from_cost_model(cls, hypergraph: Hypergraph, min_leaf_size=None, max_conductance=None,
+                        bisection_tree: BisectionTree = None):
+        """
+        Returns a HierarchicalClusterer whose stop criteria minimise the predicted cost of the random walks of the
+        hypergraph clusters, subject to the quality constraints min_leaf_size (the smallest number of nodes of a
+        cluster) and max_conductance (the largest conductance of a cut), see cost_model.tune_stopping_criteria.
+
+        The bisection tree of the hypergraph is built (unless given) to search the stop criteria, and is kept to run
+        the hierarchical clustering.
+
+        Example usage:
+            HC = HierarchicalClusterer.from_cost_model(hypergraph, min_leaf_size=5, max_conductance=0.5)
+            hypergraph_clusters = HC.run_hierarchical_clustering()
+        """
+        graph = hypergraph.convert_to_graph()
+        if bisection_tree is None:
+            bisection_tree = BisectionTree.build(graph)
+
+        config = tune_stopping_criteria(hypergraph, bisection_tree, min_leaf_size=min_leaf_size,
+                                        max_conductance=max_conductance, graph=graph)
+        if config is None:
+            raise ValueError(f"No stop criteria give clusters of at least {min_leaf_size} nodes.")
+
+        hierarchical_clusterer = cls(hypergraph, config=config)
+        hierarchical_clusterer.bisection_tree = bisection_tree
+
+        return hierarchical_clusterer
+
+    def run_hierarchical_clustering(self, bisection_tree: BisectionTree = None):
+        """
+        :param bisection_tree: if given, a BisectionTree of the graph of the hypergraph, from which the clusters are
+                               read off instead of being computed (e.g. when clustering with many stopping criteria).
+                               Defaults to the bisection tree kept by from_cost_model, if any.
+        """
+        if bisection_tree is None:
+            bisection_tree = self.bisection_tree
 
         # 1. Convert hypergraph to graph
         original_graph = self.hypergraph.convert_to_graph()
+        instrumentation.record_size('clique_graph', original_graph)
 
         # 2. Hierarchical cluster the graph
-        self.get_clusters(original_graph)
+        if bisection_tree is not None:
+            if set(bisection_tree.node_order) != set(original_graph.nodes()):
+                raise ValueError("The bisection tree is not a tree of the graph of the hypergraph.")
+            self.graph_clusters = [create_subgraph(original_graph, set(cluster)) for cluster in
+                                   bisection_tree.get_clusters(self.min_cluster_size, self.max_lambda2)]
+        else:
+            self.get_clusters(original_graph)
 
         # 3. Convert the graph clusters into hypergraphs
         self.hypergraph_clusters = [graph.convert_to_hypergraph_from_template(self.hypergraph) for graph in
@@ -54,15 +103,18 @@ class HierarchicalClusterer(object):
         return self.hypergraph_clusters
 
     def get_clusters(self, graph: Graph):
-        v_2, lambda2 = get_second_eigenpair(graph)
+        with instrumentation.stage('spectral_split'):
+            v_2, lambda2 = get_second_eigenpair(graph)
 
-        # stop splitting if lambda2 stop criterion met or cluster size criterion surely met
-        if lambda2 > self.max_lambda2 or graph.number_of_nodes() < 2 * self.min_cluster_size:
+            # stop splitting if lambda2 stop criterion met or cluster size criterion surely met
+            stop_splitting = lambda2 > self.max_lambda2 or graph.number_of_nodes() < 2 * self.min_cluster_size
+            if not stop_splitting:
+                subgraph1, subgraph2 = cheeger_cut(graph, v_2)
+
+        if stop_splitting:
             self.graph_clusters.append(graph)
             return None
         else:
-            subgraph1, subgraph2 = cheeger_cut(graph, v_2)
-
             # stop splitting if cluster size stop criterion met
             if (self.min_cluster_size and
                     (subgraph1.number_of_nodes() < self.min_cluster_size or
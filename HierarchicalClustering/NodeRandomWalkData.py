@@ -2,6 +2,10 @@ from collections import defaultdict
 import operator
 import warnings
 
+import numpy as np
+
+from errors import check_argument
+
 
 class NodeRandomWalkData(object):
     """
@@ -30,8 +34,12 @@ class NodeRandomWalkData(object):
         if self.average_hitting_time != 0:
             warnings.warn('Method "calculate_average_hitting_time" called more than once when running random walks')
 
-        self.average_hitting_time = (self.accumulated_hitting_time + (number_of_walks - self.number_of_hits)
-                                     * max_length) / number_of_walks
+        if number_of_walks == 0:
+            # with no walks the node is never hit, so its truncated hitting time is the length of the walks
+            self.average_hitting_time = max_length
+        else:
+            self.average_hitting_time = (self.accumulated_hitting_time + (number_of_walks - self.number_of_hits)
+                                         * max_length) / number_of_walks
 
     def get_count_of_nth_path(self, n):
         """
@@ -69,6 +77,90 @@ class NodeRandomWalkData(object):
         return top_paths
 
 
+class MultiLengthRandomWalkData(object):
+    """
+    Data structure to store the first hits of each node during random walks of length max_length, from which the
+    hitting time and path count information of the same walks truncated to any length up to max_length is derived.
+
+    A node first hit at step t of a walk is first hit at step t, along the same path, by the walk truncated to any
+    length L >= t, and is not hit at all by the walk truncated to a length L < t. So only the path of each first hit
+    is recorded (as an index into the paths encountered, whose length is the step of the hit).
+    """
+
+    def __init__(self, nodes: dict[str, str], max_length: int):
+        """
+        :param nodes: dict(node name: node type)
+        """
+        self.nodes = nodes
+        self.max_length = max_length
+        self.number_of_walks = 0
+        self.paths = []  # list(path), indexed by path id
+        self.path_ids = {}  # dict(path: path id)
+        self.path_lengths = []  # list(int), the number of predicates of each path, indexed by path id
+        self.first_hit_path_ids = {node: [] for node in nodes}  # dict(node: list(path id))
+
+    def add_first_hit(self, node: str, path: str):
+        """
+        Records the first hit of the node in the current walk, along the path (whose length is the hitting time).
+        """
+        path_id = self.path_ids.get(path)
+        if path_id is None:
+            path_id = len(self.paths)
+            self.path_ids[path] = path_id
+            self.paths.append(path)
+            self.path_lengths.append(path.count(','))
+        self.first_hit_path_ids[node].append(path_id)
+
+    def _get_first_hits(self, node: str, length_of_walk: int, path_lengths: np.ndarray):
+        """
+        Returns the path ids and steps of the first hits of the node in the walks truncated to length_of_walk.
+        """
+        path_ids = np.array(self.first_hit_path_ids[node], dtype=int)
+        steps = path_lengths[path_ids]
+        within_length = steps <= length_of_walk
+
+        return path_ids[within_length], steps[within_length]
+
+    def average_hitting_times(self, length_of_walk: int):
+        """
+        Returns dict(node: average truncated hitting time) for the walks truncated to length_of_walk.
+        """
+        check_argument('length_of_walk', length_of_walk, int, 1, self.max_length, strict_inequalities=False)
+        path_lengths = np.array(self.path_lengths, dtype=int)
+        average_hitting_times = {}
+        for node in self.nodes:
+            if self.number_of_walks == 0:
+                # as in NodeRandomWalkData.calculate_average_hitting_time
+                average_hitting_times[node] = length_of_walk
+                continue
+            _, steps = self._get_first_hits(node, length_of_walk, path_lengths)
+            average_hitting_times[node] = (int(steps.sum()) + (self.number_of_walks - len(steps)) * length_of_walk) \
+                / self.number_of_walks
+
+        return average_hitting_times
+
+    def node_random_walk_data(self, length_of_walk: int):
+        """
+        Returns dict(node: NodeRandomWalkData) for the walks truncated to length_of_walk, as if they had been run with
+        that length.
+        """
+        check_argument('length_of_walk', length_of_walk, int, 1, self.max_length, strict_inequalities=False)
+        path_lengths = np.array(self.path_lengths, dtype=int)
+        nodes_random_walk_data = {}
+        for node, node_type in self.nodes.items():
+            node_random_walk_data = NodeRandomWalkData(node, node_type)
+            path_ids, steps = self._get_first_hits(node, length_of_walk, path_lengths)
+            path_id_counts = np.bincount(path_ids)
+            for path_id in np.flatnonzero(path_id_counts):
+                node_random_walk_data.path_counts[self.paths[path_id]] = int(path_id_counts[path_id])
+            node_random_walk_data.number_of_hits = len(steps)
+            node_random_walk_data.accumulated_hitting_time = int(steps.sum())
+            node_random_walk_data.calculate_average_hitting_time(self.number_of_walks, length_of_walk)
+            nodes_random_walk_data[node] = node_random_walk_data
+
+        return nodes_random_walk_data
+
+
 class NodeClusterRandomWalkData(object):
     """
     Data structure to store path count information for a collection of nodes.
@@ -1,6 +1,9 @@
 import numpy as np
-from NodeRandomWalkData import NodeRandomWalkData
+from NodeRandomWalkData import NodeRandomWalkData, MultiLengthRandomWalkData
 from GraphObjects import Hypergraph
+from ExactHittingTimes import ExactHittingTimes, number_of_transitions
+from ExactPathDistributions import ExactPathDistributions
+import instrumentation
 
 
 class RandomWalker:
@@ -23,8 +26,25 @@ class RandomWalker:
        diameter of the graph from which the hypergraph is based.
     alpha_sym: The significance level at which the truncated hitting times of two nodes need to deviate by for the null
                 hypothesis of them being path-symmetric to be rejected. Used in the calculation of theta_sym.
+    exact_hitting_times (optional): Whether to compute the average truncated hitting times exactly (see
+                ExactHittingTimes.py), in which case random walks are only run for the path distributions. Defaults to
+                False. If 'auto', they are computed exactly when the cost model of _use_exact_hitting_times estimates
+                that to be cheaper than running the extra random walks needed to estimate them, given the costs
+                seconds_per_walk_step and seconds_per_exact_operation (optional, defaulting to rough estimates).
+    exact_path_distributions (optional): Whether to compute the path distributions and hitting times exactly (see
+                ExactPathDistributions.py) instead of running random walks, falling back to running random walks for
+                any source node whose computation would exceed path_distribution_state_budget (optional, the maximum
+                number of probabilities held at once). Defaults to False.
     """
 
+    # rough default costs, in seconds, of one step of a sampled random walk and of one multiply-add of the exact
+    # hitting time computation, used to decide whether computing the hitting times exactly is cheaper than estimating
+    # them (they depend on the machine, so can be measured and set in the config)
+    seconds_per_walk_step = 2e-6
+    seconds_per_exact_operation = 5e-9
+    # the exact hitting times of every pair of nodes are held in memory, which limits the size of the hypergraph
+    max_number_of_nodes_for_exact_hitting_times = 5000
+
     def __init__(self, hypergraph: Hypergraph, config: dict):
         self.hypergraph = hypergraph
         self.number_of_paths = config['max_num_paths']
@@ -44,8 +64,24 @@ class RandomWalker:
         self.number_of_walks_for_path_distribution = \
             self._get_number_of_walks_for_path_distribution(M=self.number_of_paths)
 
-        self.max_number_of_walks = max(self.number_of_walks_for_truncated_hitting_times,
-                                       self.number_of_walks_for_path_distribution)
+        self.seconds_per_walk_step = config.get('seconds_per_walk_step') or RandomWalker.seconds_per_walk_step
+        self.seconds_per_exact_operation = config.get('seconds_per_exact_operation') or \
+            RandomWalker.seconds_per_exact_operation
+
+        self.exact_hitting_times = None
+        if self._use_exact_hitting_times(config):
+            self.exact_hitting_times = ExactHittingTimes(hypergraph, self.length_of_walk)
+            # the walks are only needed for the path distributions
+            self.max_number_of_walks = self.number_of_walks_for_path_distribution
+        else:
+            self.max_number_of_walks = max(self.number_of_walks_for_truncated_hitting_times,
+                                           self.number_of_walks_for_path_distribution)
+
+        self.exact_path_distributions = None
+        if config.get('exact_path_distributions'):
+            self.exact_path_distributions = ExactPathDistributions(
+                hypergraph, self.length_of_walk,
+                state_budget=config.get('path_distribution_state_budget') or 10 ** 7)
 
         self.number_of_walks_ran = 0
 
@@ -64,6 +100,34 @@ class RandomWalker:
 
         return length_of_walk
 
+    def _use_exact_hitting_times(self, config: dict):
+        """
+        Decides whether to compute the average truncated hitting times exactly. Unless config['exact_hitting_times'] is
+        'auto', it decides (defaulting to False). Otherwise, the exact computation is used when its estimated cost per
+        source node is smaller than that of the random walks it saves, i.e. those needed for the hitting times beyond
+        those needed for the path distributions.
+        """
+        if config.get('exact_hitting_times') != 'auto':
+            return bool(config.get('exact_hitting_times'))
+
+        number_of_nodes = len(self.hypergraph.nodes)
+        if number_of_nodes > self.max_number_of_nodes_for_exact_hitting_times:
+            return False
+
+        number_of_walks_saved = self.number_of_walks_for_truncated_hitting_times - \
+            self.number_of_walks_for_path_distribution
+        if number_of_walks_saved <= 0:
+            return False
+
+        exact_cost = (self.length_of_walk - 1) * number_of_nodes * number_of_transitions(self.hypergraph) * \
+            self.seconds_per_exact_operation
+        if not config.get('multiprocessing'):
+            # the hitting times of every source node are computed at once, and shared by the source nodes
+            exact_cost /= number_of_nodes
+        random_walk_cost = number_of_walks_saved * self.length_of_walk * self.seconds_per_walk_step
+
+        return exact_cost < random_walk_cost
+
     def _get_number_of_walks_for_truncated_hitting_times(self, length_of_walk: int):
         """
         Calculates an upper bound on the number of random walks needed to get estimates of a node's average truncated
@@ -97,21 +161,77 @@ class RandomWalker:
         return int(round(min(M + 1, max_num_of_unique_paths + 1) *
                          np.log(max_num_of_unique_paths) / (self.epsilon ** 2)))
 
+    @instrumentation.timed('random_walks')
     def generate_node_random_walk_data(self, source_node: str):
         """
         Runs random walks originating from the source_node. Returns a data structure which holds information
         about the number of times each node was hit, the average hitting time, and the frequency distribution
         of unique random walks paths that led to hitting the node.
+
+        If the path distributions are computed exactly, the data are the expected statistics of max_number_of_walks
+        random walks.
         """
+        if self.exact_path_distributions is not None:
+            nodes_random_walk_data = self.exact_path_distributions.compute_node_random_walk_data(
+                source_node, number_of_walks=self.max_number_of_walks)
+            if nodes_random_walk_data is not None:
+                self.number_of_walks_ran = self.max_number_of_walks
+                instrumentation.record_size('node_random_walk_data', nodes_random_walk_data)
+                instrumentation.count('source_nodes')
+                instrumentation.count('exact_path_distribution_sources')
+
+                return nodes_random_walk_data
+
         nodes_random_walk_data, number_of_walks = self._run_random_walks(source_node)
 
-        [nodes_random_walk_data[node].calculate_average_hitting_time(number_of_walks, self.length_of_walk)
-         for node in self.hypergraph.nodes.keys()]
+        if self.exact_hitting_times is not None:
+            hitting_times = self.exact_hitting_times.average_truncated_hitting_times(source_node)
+            for node, hitting_time in hitting_times.items():
+                nodes_random_walk_data[node].average_hitting_time = hitting_time
+        else:
+            [nodes_random_walk_data[node].calculate_average_hitting_time(number_of_walks, self.length_of_walk)
+             for node in self.hypergraph.nodes.keys()]
 
         self.number_of_walks_ran = number_of_walks
+        instrumentation.record_size('node_random_walk_data', nodes_random_walk_data)
+        instrumentation.count('source_nodes')
+        instrumentation.count('walks_run', number_of_walks)
 
         return nodes_random_walk_data  # dict[str, NodeRandomWalkData]
 
+    @instrumentation.timed('random_walks')
+    def generate_multi_length_random_walk_data(self, source_node: str, number_of_walks=None):
+        """
+        Runs random walks of length length_of_walk originating from the source_node, recording the first hits of the
+        nodes so that the random walk data of every walk length up to length_of_walk can be derived from the same walks
+        (see MultiLengthRandomWalkData), instead of running a new set of walks for each length.
+
+        :param number_of_walks: the number of walks to run, max_number_of_walks by default (which is at least the number
+                                of walks needed for any shorter walk length)
+        """
+        if number_of_walks is None:
+            number_of_walks = self.max_number_of_walks
+
+        multi_length_random_walk_data = MultiLengthRandomWalkData(self.hypergraph.nodes, self.length_of_walk)
+        for _ in range(number_of_walks):
+            current_node = source_node
+            encountered_nodes = set()
+            path = ''
+            for step in range(self.length_of_walk):
+                next_edge, next_node = self.hypergraph.get_random_edge_and_neighbor_of_node(current_node)
+                path += str(self.hypergraph.predicates[next_edge]) + ','
+                if next_node not in encountered_nodes:
+                    multi_length_random_walk_data.add_first_hit(next_node, path)
+                    encountered_nodes.add(next_node)
+                current_node = next_node
+        multi_length_random_walk_data.number_of_walks = number_of_walks
+
+        self.number_of_walks_ran = number_of_walks
+        instrumentation.count('source_nodes')
+        instrumentation.count('walks_run', number_of_walks)
+
+        return multi_length_random_walk_data
+
     def _run_random_walks(self, source_node: str):
         """
         Run random walks from a source node.
@@ -172,8 +292,11 @@ class RandomWalker:
 
         number_of_unique_paths = self._compute_number_of_unique_paths(nodes_random_walk_data)
 
-        number_of_additional_walks_for_truncated_hitting_time = \
-            self.number_of_walks_for_truncated_hitting_times - number_of_completed_walks
+        if self.exact_hitting_times is not None:
+            number_of_additional_walks_for_truncated_hitting_time = 0
+        else:
+            number_of_additional_walks_for_truncated_hitting_time = \
+                self.number_of_walks_for_truncated_hitting_times - number_of_completed_walks
 
         number_of_additional_walks_for_path_distribution = \
             self._get_number_of_walks_for_path_distribution(M=self.number_of_paths,
@@ -0,0 +1,306 @@
+"""
+Benchmark suite for the hierarchical clustering and random walk pipeline.
+
+Times each stage of the pipeline, that is
+    hypergraph_construction   - Hypergraph(database_file, info_file)
+    hierarchical_clustering   - HierarchicalClusterer.run_hierarchical_clustering()
+    random_walks              - RandomWalker.generate_node_random_walk_data(), for a sample of source nodes
+    communities               - Communities(hypergraph, config), for every hypergraph cluster
+    write_files               - CommunityPrinter.write_files()
+on synthetic hypergraphs of increasing size (see synthetic_hypergraph.py) and on the bundled MovieLens database. Each
+stage is repeated and every wall time is kept, along with throughput and (optionally) the tracemalloc peak of the
+stage. The results are written as JSON, together with the commit and machine they were obtained on, so that runs of
+different versions can be compared.
+
+With --imports, the time taken to import each of the pipeline modules in a fresh interpreter is recorded as well,
+along with any of the slow optional dependencies (see heavy_modules) that the import pulled in.
+
+Example usage (from the HierarchicalClustering directory):
+    python benchmark.py --sizes 100 300 1000 --repeats 3 --memory --imports --output benchmark_results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from Communities import Communities
+from CommunityPrinter import CommunityPrinter
+from GraphObjects import Hypergraph
+from HierarchicalClusterer import HierarchicalClusterer
+from RandomWalker import RandomWalker
+from synthetic_hypergraph import write_synthetic_database
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+default_config = {
+    'clustering_params': {
+        'min_cluster_size': 10,
+        'max_lambda2': 0.8,
+    },
+    'random_walk_params': {
+        'epsilon': 0.1,
+        'max_num_paths': 3,
+        'alpha_sym': 0.1,
+        'pca_dim': 2,
+        'clustering_method_threshold': 50,
+        'k': 1.25,
+        'max_path_length': 5,
+        'theta_p': 0.5,
+        'multiprocessing': False
+    }
+}
+
+# modules imported by the pipeline, and slow optional dependencies which only the functions that need them import
+pipeline_modules = ['GraphObjects', 'HierarchicalClusterer', 'Communities', 'CommunityPrinter', 'CommunityWriter',
+                    'CompactCommunityFile', 'cli']
+heavy_modules = ['sklearn', 'matplotlib', 'chi2comb', 'scipy.stats', 'tqdm', 'pandas']
+
+# the schema of the MovieLens databases written by MovieLens/generate_database.py
+movielens_info = ['Rating(user,movie,rating)', 'Male(user)', 'Female(user)', 'Youthful(user)', 'MiddleAged(user)',
+                  'Old(user)'] + [f'{genre}(movie)' for genre in
+                                  ['Action', 'Adventure', 'Animation', 'Childrens', 'Comedy', 'Crime', 'Documentary',
+                                   'Drama', 'Fantasy', 'FilmNoir', 'Horror', 'Musical', 'Mystery', 'Romance', 'SciFi',
+                                   'Thriller', 'War', 'Western']]
+
+
+def time_stage(function, repeats: int, trace_memory: bool):
+    """
+    Calls function repeats times, returning the result of the last call and the wall times (and, if trace_memory is
+    True, the largest tracemalloc peak) of the calls.
+    """
+    wall_times = []
+    peak_memory = 0
+    result = None
+    for _ in range(repeats):
+        if trace_memory:
+            tracemalloc.start()
+        start_time = time.perf_counter()
+        result = function()
+        wall_times.append(time.perf_counter() - start_time)
+        if trace_memory:
+            peak_memory = max(peak_memory, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+    timings = {'wall_times': wall_times,
+               'min_wall_time': min(wall_times),
+               'median_wall_time': statistics.median(wall_times)}
+    if trace_memory:
+        timings['peak_memory'] = peak_memory
+
+    return result, timings
+
+
+def benchmark_database(database_file: str, info_file: str, config: dict, repeats=3, trace_memory=False,
+                       number_of_walk_sources=10, seed=0):
+    """
+    Runs and times each stage of the pipeline on a database.
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+    stages = {}
+
+    hypergraph, stages['hypergraph_construction'] = time_stage(
+        lambda: Hypergraph(database_file=database_file, info_file=info_file), repeats, trace_memory)
+    stages['hypergraph_construction']['edges_per_second'] = \
+        hypergraph.number_of_edges() / stages['hypergraph_construction']['min_wall_time']
+
+    hypergraph_clusters, stages['hierarchical_clustering'] = time_stage(
+        lambda: HierarchicalClusterer(hypergraph, config=config['clustering_params']).run_hierarchical_clustering(),
+        repeats, trace_memory)
+
+    # random walks are timed on the largest hypergraph cluster, from a sample of its source nodes
+    largest_cluster = max(hypergraph_clusters, key=lambda cluster: cluster.number_of_nodes())
+    random_walker = RandomWalker(hypergraph=largest_cluster, config=config['random_walk_params'])
+    source_nodes = random.sample(list(largest_cluster.nodes.keys()),
+                                 min(number_of_walk_sources, len(largest_cluster.nodes)))
+
+    def run_random_walks():
+        number_of_walks = 0
+        for source_node in source_nodes:
+            random_walker.generate_node_random_walk_data(source_node=source_node)
+            number_of_walks += random_walker.number_of_walks_ran
+        return number_of_walks
+
+    number_of_walks, stages['random_walks'] = time_stage(run_random_walks, repeats, trace_memory)
+    stages['random_walks']['number_of_source_nodes'] = len(source_nodes)
+    stages['random_walks']['number_of_walks'] = number_of_walks
+    stages['random_walks']['walks_per_second'] = number_of_walks / stages['random_walks']['min_wall_time']
+
+    hypergraph_communities, stages['communities'] = time_stage(
+        lambda: [Communities(cluster, config=config['random_walk_params']) for cluster in hypergraph_clusters],
+        repeats, trace_memory)
+    stages['communities']['source_nodes_per_second'] = \
+        hypergraph.number_of_nodes() / stages['communities']['min_wall_time']
+
+    output_directory = tempfile.mkdtemp(prefix='benchmark_')
+    try:
+        _, stages['write_files'] = time_stage(
+            lambda: CommunityPrinter(hypergraph_communities, original_hypergraph=hypergraph).write_files(
+                os.path.join(output_directory, 'communities')), repeats, trace_memory)
+    finally:
+        shutil.rmtree(output_directory, ignore_errors=True)
+
+    return {'hypergraph': {'number_of_nodes': hypergraph.number_of_nodes(),
+                           'number_of_edges': hypergraph.number_of_edges(),
+                           'number_of_predicates': hypergraph.number_of_predicates(),
+                           'number_of_clusters': len(hypergraph_clusters)},
+            'stages': stages}
+
+
+def get_import_statistics(module: str):
+    """
+    Imports a module in a fresh interpreter, returning the time taken and the heavy modules that were imported with it.
+    """
+    code = (f'import sys, time, json\n'
+            f'start_time = time.perf_counter()\n'
+            f'import {module}\n'
+            f'import_time = time.perf_counter() - start_time\n'
+            f'print(json.dumps([import_time, [name for name in {heavy_modules!r} if name in sys.modules]]))\n')
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)), env=environment).stdout
+    import_time, imported_heavy_modules = json.loads(output.strip().splitlines()[-1])
+
+    return import_time, imported_heavy_modules
+
+
+def benchmark_imports(modules: list[str], repeats=3):
+    import_statistics = {}
+    for module in modules:
+        import_times = []
+        imported_heavy_modules = []
+        for _ in range(repeats):
+            import_time, imported_heavy_modules = get_import_statistics(module)
+            import_times.append(import_time)
+        import_statistics[module] = {'import_times': import_times,
+                                     'min_import_time': min(import_times),
+                                     'heavy_modules': imported_heavy_modules}
+
+    return import_statistics
+
+
+def get_environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+
+    return {'commit': commit,
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'cpu_count': os.cpu_count()}
+
+
+def max_rss():
+    """
+    The peak resident set size of this process so far, in bytes (None if it cannot be measured).
+    """
+    if resource is None:
+        return None
+
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+
+
+def run_benchmarks(sizes: list[int], edges_per_node=2.0, number_of_predicates=5, max_arity=3, number_of_node_types=2,
+                   movielens=True, repeats=3, trace_memory=False, number_of_walk_sources=10, seed=0,
+                   config=None, imports=False):
+    config = default_config if config is None else config
+    results = {'environment': get_environment(),
+               'config': config,
+               'cases': []}
+
+    if imports:
+        print('Benchmarking imports...')
+        results['imports'] = benchmark_imports(pipeline_modules, repeats=repeats)
+
+    database_directory = tempfile.mkdtemp(prefix='benchmark_databases_')
+    try:
+        cases = []
+        for size in sizes:
+            parameters = {'number_of_nodes': size,
+                          'number_of_edges': int(edges_per_node * size),
+                          'number_of_predicates': number_of_predicates,
+                          'max_arity': max_arity,
+                          'number_of_node_types': number_of_node_types,
+                          'seed': seed}
+            database_file, info_file = write_synthetic_database(os.path.join(database_directory, f'synthetic_{size}'),
+                                                                **parameters)
+            cases.append((f'synthetic_{size}', parameters, database_file, info_file))
+
+        if movielens:
+            info_file = os.path.join(database_directory, 'MovieLensMini.info')
+            with open(info_file, 'w') as file:
+                file.writelines(line + '\n' for line in movielens_info)
+            database_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Databases', 'MovieLensMini.db')
+            cases.append(('MovieLensMini', {}, database_file, info_file))
+
+        for name, parameters, database_file, info_file in cases:
+            print(f'Benchmarking {name}...')
+            case = {'name': name, 'parameters': parameters}
+            try:
+                case.update(benchmark_database(database_file, info_file, config, repeats=repeats,
+                                               trace_memory=trace_memory,
+                                               number_of_walk_sources=number_of_walk_sources, seed=seed))
+            except Exception as error:
+                # record the failure and carry on with the remaining cases
+                case['error'] = f'{type(error).__name__}: {error}'
+            case['max_rss'] = max_rss()
+            results['cases'].append(case)
+    finally:
+        shutil.rmtree(database_directory, ignore_errors=True)
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark the hierarchical clustering and random walk pipeline.')
+    parser.add_argument('--sizes', type=int, nargs='*', default=[100, 300, 1000],
+                        help='numbers of nodes of the synthetic hypergraphs')
+    parser.add_argument('--edges-per-node', type=float, default=2.0)
+    parser.add_argument('--predicates', type=int, default=5)
+    parser.add_argument('--max-arity', type=int, default=3)
+    parser.add_argument('--node-types', type=int, default=2)
+    parser.add_argument('--no-movielens', action='store_true', help='skip the MovieLensMini database')
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--walk-sources', type=int, default=10,
+                        help='number of source nodes to time random walks from')
+    parser.add_argument('--memory', action='store_true', help='record the tracemalloc peak of each stage')
+    parser.add_argument('--imports', action='store_true', help='record the import time of each pipeline module')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='benchmark_results.json')
+    arguments = parser.parse_args()
+
+    benchmark_results = run_benchmarks(sizes=arguments.sizes,
+                                       edges_per_node=arguments.edges_per_node,
+                                       number_of_predicates=arguments.predicates,
+                                       max_arity=arguments.max_arity,
+                                       number_of_node_types=arguments.node_types,
+                                       movielens=not arguments.no_movielens,
+                                       repeats=arguments.repeats,
+                                       trace_memory=arguments.memory,
+                                       number_of_walk_sources=arguments.walk_sources,
+                                       seed=arguments.seed,
+                                       imports=arguments.imports)
+
+    with open(arguments.output, 'w') as results_file:
+        json.dump(benchmark_results, results_file, indent=4)
+    print(f'Results written to {arguments.output}')
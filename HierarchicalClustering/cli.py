@@ -0,0 +1,222 @@
+"""
+Command-line driver for the full pipeline: loads a database, hierarchically clusters its hypergraph, computes the
+communities of every source node and writes the .ldb, .uldb and .srcnclusts files required by Alchemy.
+
+Every parameter of the config used by main.py can be given as a flag, or in a JSON config file with the same layout,
+e.g.
+    {
+        "clustering_params": {"min_cluster_size": 10, "max_lambda2": 0.8},
+        "random_walk_params": {"epsilon": 0.1, "max_path_length": 5}
+    }
+Flags take precedence over the config file, which takes precedence over the defaults.
+
+Example usage (from the HierarchicalClustering directory):
+    python cli.py Databases/imdb1.db Databases/imdb.info --output imdb --workers 4 --seed 0 --cache-dir .cache --profile
+
+The pipeline modules (and with them numpy, scipy, networkx and sklearn) are only imported once the arguments have been
+parsed, so that --help and argument errors return immediately.
+"""
+
+import argparse
+import copy
+import hashlib
+import json
+import os
+import pickle
+import sys
+import tempfile
+
+default_config = {
+    'clustering_params': {
+        'min_cluster_size': 10,
+        'max_lambda2': 0.8,
+    },
+    'random_walk_params': {
+        'epsilon': 0.1,
+        'max_num_paths': 3,
+        'alpha_sym': 0.1,
+        'pca_dim': 2,
+        'clustering_method_threshold': 50,
+        'k': 1.25,
+        'max_path_length': 5,
+        'theta_p': 0.5,
+    }
+}
+
+# bump to invalidate the entries of existing cache directories when the pipeline's results change
+cache_version = 1
+
+
+def get_argument_parser():
+    parser = argparse.ArgumentParser(description='Hierarchically cluster a relational database and write the '
+                                                 'communities of its nodes in the format required by Alchemy.')
+    parser.add_argument('database_file', help='the .db file of ground atoms')
+    parser.add_argument('info_file', help='the .info file of predicate argument types')
+    parser.add_argument('--output', '-o', default=None,
+                        help='prefix of the .ldb, .uldb and .srcnclusts files written (defaults to the name of the '
+                             'database file)')
+    parser.add_argument('--config', default=None, help='JSON file of clustering_params and random_walk_params')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='number of worker processes used to compute communities and write files')
+    parser.add_argument('--seed', type=int, default=None, help='seed for reproducible random walks')
+    parser.add_argument('--cache-dir', default=None,
+                        help='directory in which the hypergraph clusters and communities are cached between runs')
+    parser.add_argument('--profile', action='store_true',
+                        help='write per-stage timings and counters to <output>.profile.json')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='with --profile, also account for memory (slow)')
+
+    for section, params in default_config.items():
+        group = parser.add_argument_group(section)
+        for name, value in params.items():
+            group.add_argument('--' + name.replace('_', '-'), dest=name, type=type(value), default=None,
+                               help=f'(default: {value})')
+
+    return parser
+
+
+def get_config(arguments: argparse.Namespace):
+    config = copy.deepcopy(default_config)
+
+    if arguments.config is not None:
+        with open(arguments.config, 'r') as config_file:
+            file_config = json.load(config_file)
+        for section, params in file_config.items():
+            if section not in config:
+                raise ValueError(f"Unknown section {section} in config file {arguments.config}. Expected one of "
+                                 f"{list(config.keys())}.")
+            config[section].update(params)
+
+    for params in config.values():
+        for name in params.keys():
+            if getattr(arguments, name) is not None:
+                params[name] = getattr(arguments, name)
+
+    if arguments.workers < 1:
+        raise ValueError(f"--workers should be at least 1, got {arguments.workers}.")
+
+    config['random_walk_params']['multiprocessing'] = arguments.workers > 1
+    config['random_walk_params']['number_of_processes'] = arguments.workers
+    config['random_walk_params']['seed'] = arguments.seed
+
+    return config
+
+
+def file_hash(path: str):
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            sha256.update(block)
+
+    return sha256.hexdigest()
+
+
+def cached(cache_dir, stage: str, key: dict, compute):
+    """
+    Returns compute(), reusing the result of an earlier call with the same stage and key if it is in cache_dir.
+    """
+    if cache_dir is None:
+        return compute()
+
+    key_hash = hashlib.sha256(json.dumps({'stage': stage, 'cache_version': cache_version, **key},
+                                         sort_keys=True).encode()).hexdigest()
+    cache_file = os.path.join(cache_dir, f'{stage}-{key_hash[:32]}.pickle')
+
+    if os.path.exists(cache_file):
+        print(f'Loading {stage} from {cache_file}')
+        with open(cache_file, 'rb') as file:
+            return pickle.load(file)
+
+    result = compute()
+
+    os.makedirs(cache_dir, exist_ok=True)
+    # write to a temporary file first, so that an interrupted run never leaves a truncated entry behind
+    file_descriptor, temporary_file = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    with os.fdopen(file_descriptor, 'wb') as file:
+        pickle.dump(result, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary_file, cache_file)
+
+    return result
+
+
+def run_pipeline(database_file: str, info_file: str, output: str, config: dict, workers=1, seed=None, cache_dir=None,
+                 profile=False, profile_memory=False):
+    import random
+    import numpy as np
+    import instrumentation
+    from GraphObjects import Hypergraph
+    from HierarchicalClusterer import HierarchicalClusterer
+    from Communities import Communities
+    from CommunityPrinter import BufferedCommunityPrinter, ParallelCommunityPrinter
+
+    if profile:
+        instrumentation.enable(trace_memory=profile_memory)
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+
+    def compute_hypergraph_clusters():
+        print('Loading hypergraph...')
+        hypergraph = Hypergraph(database_file=database_file, info_file=info_file)
+        print(hypergraph)
+        print('Running hierarchical clustering...')
+        clusters = HierarchicalClusterer(hypergraph, config=config['clustering_params']).run_hierarchical_clustering()
+        return hypergraph, clusters
+
+    clusters_key = {'database': file_hash(database_file),
+                    'info': file_hash(info_file),
+                    'clustering_params': config['clustering_params']}
+    original_hypergraph, hypergraph_clusters = cached(cache_dir, 'hypergraph_clusters', clusters_key,
+                                                      compute_hypergraph_clusters)
+
+    def compute_communities():
+        print(f'Computing communities of {len(hypergraph_clusters)} hypergraph clusters...')
+        return [Communities(hypergraph, config=config['random_walk_params']) for hypergraph in hypergraph_clusters]
+
+    # the number of processes does not change the communities, so it is not part of the key
+    random_walk_params = {name: value for name, value in config['random_walk_params'].items()
+                          if name not in ['multiprocessing', 'number_of_processes']}
+    communities_key = dict(clusters_key, random_walk_params=random_walk_params)
+    # without a seed, every run draws different random walks, so the communities are only reused if seeded
+    hypergraph_communities = cached(cache_dir if seed is not None else None, 'communities', communities_key,
+                                    compute_communities)
+
+    print(f'Writing {output}.ldb, {output}.uldb and {output}.srcnclusts...')
+    if workers > 1:
+        community_printer = ParallelCommunityPrinter(hypergraph_communities, original_hypergraph=original_hypergraph,
+                                                     processes=workers)
+    else:
+        community_printer = BufferedCommunityPrinter(hypergraph_communities, original_hypergraph=original_hypergraph)
+    community_printer.write_files(output)
+
+    if profile:
+        instrumentation.write_report(output + '.profile.json', database=database_file, config=config,
+                                     workers=workers, seed=seed)
+        print(f'Profile written to {output}.profile.json')
+
+
+def main(argv=None):
+    parser = get_argument_parser()
+    arguments = parser.parse_args(argv)
+
+    try:
+        config = get_config(arguments)
+    except (ValueError, OSError) as error:
+        parser.error(str(error))
+
+    output = arguments.output
+    if output is None:
+        output = os.path.splitext(arguments.database_file)[0]
+
+    run_pipeline(arguments.database_file, arguments.info_file, output, config,
+                 workers=arguments.workers,
+                 seed=arguments.seed,
+                 cache_dir=arguments.cache_dir,
+                 profile=arguments.profile,
+                 profile_memory=arguments.profile_memory)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
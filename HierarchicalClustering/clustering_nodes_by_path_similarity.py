@@ -1,12 +1,12 @@
 import numpy as np
 from NodeRandomWalkData import *
-from sklearn.decomposition import PCA
-from sklearn.cluster import Birch
-from scipy.stats import norm, t
 from js_divergence_utils import compute_sk_divergence_of_top_n_paths
 
 from hypothesis_test import hypothesis_test_path_symmetric_nodes, test_quality_of_clusters
-import matplotlib.pyplot as plt
+from instrumentation import count, timed
+
+# scipy.stats, sklearn and matplotlib are slow to import, so they are imported by the functions that use them, rather
+# than by every process that imports this module
 
 
 def compute_theta_sym(alpha_sym, number_of_walks_ran, length_of_walk):
@@ -16,6 +16,7 @@ def compute_theta_sym(alpha_sym, number_of_walks_ran, length_of_walk):
 
     return: theta_sym: used as a parameter for clustering based on truncated hitting time
     """
+    from scipy.stats import t
 
     return ((length_of_walk - 1) / (2 * number_of_walks_ran) ** 0.5) * t.isf(alpha_sym, df=number_of_walks_ran - 1)
 
@@ -35,10 +36,14 @@ def cluster_nodes_by_path_similarity(nodes: list[NodeRandomWalkData],
                                      number_of_walks: int,
                                      length_of_walks: int,
                                      theta_sym: float,
-                                     config: dict):
+                                     config: dict,
+                                     symmetric_node_groups=None):
     """
     Clusters nodes from a hypergraph into groups which are symmetrically related relative to a source node.
 
+    If symmetric_node_groups is given (see colour_refinement.find_symmetric_nodes), each group of nodes that are
+    exactly symmetric is first merged, i.e. only its first node is clustered, and the others join it afterwards.
+
     Firstly, nodes are grouped into distance-symmetric clusters; sets of nodes where the difference in the average
     truncated hitting times from the source node for any two nodes in the set is no greater than a specified threshold.
 
@@ -48,6 +53,10 @@ def cluster_nodes_by_path_similarity(nodes: list[NodeRandomWalkData],
 
     returns: the set of single nodes and a list of path-symmetric node clusters
     """
+    symmetric_nodes = {}  # dict(node name: names of the nodes merged into it)
+    if symmetric_node_groups:
+        nodes, symmetric_nodes = merge_symmetric_nodes(nodes, symmetric_node_groups)
+
     single_nodes = set()
     clusters = []
 
@@ -67,9 +76,45 @@ def cluster_nodes_by_path_similarity(nodes: list[NodeRandomWalkData],
         single_nodes.update(path_symmetric_single_nodes)
         clusters.extend(path_symmetric_clusters)
 
+    if symmetric_nodes:
+        single_nodes, clusters = split_merged_symmetric_nodes(single_nodes, clusters, symmetric_nodes)
+
     return single_nodes, clusters
 
 
+def merge_symmetric_nodes(nodes: list[NodeRandomWalkData], symmetric_node_groups: list[list[str]]):
+    """
+    Removes from nodes all but the first node of each group of symmetric nodes (ignoring the members of the groups that
+    are not in nodes).
+
+    :return: the remaining nodes, and dict(node name: names of the nodes of its group)
+    """
+    node_names = {node.name for node in nodes}
+    symmetric_nodes = {}
+    merged_node_names = set()
+    for group in symmetric_node_groups:
+        group = [node_name for node_name in group if node_name in node_names]
+        if len(group) > 1:
+            symmetric_nodes[group[0]] = group
+            merged_node_names.update(group[1:])
+    count('pre_clustered_nodes', len(merged_node_names))
+
+    return [node for node in nodes if node.name not in merged_node_names], symmetric_nodes
+
+
+def split_merged_symmetric_nodes(single_nodes: set[str], clusters: list[list[str]], symmetric_nodes: dict):
+    """
+    Puts back the nodes removed by merge_symmetric_nodes, in the cluster of the node of their group.
+    """
+    clusters = [[node_name for merged_node_name in cluster for node_name in symmetric_nodes.get(merged_node_name,
+                                                                                                [merged_node_name])]
+                for cluster in clusters]
+    for node_name in single_nodes.intersection(symmetric_nodes):
+        clusters.append(symmetric_nodes[node_name])
+
+    return single_nodes.difference(symmetric_nodes), clusters
+
+
 def cluster_nodes_by_truncated_hitting_times(nodes: list[NodeRandomWalkData], threshold_hitting_time_difference: float):
     """
     Clusters a list of nodes from a hypergraph into groups based on the truncated hitting criterion as follows:
@@ -110,6 +155,35 @@ def cluster_nodes_by_truncated_hitting_times(nodes: list[NodeRandomWalkData], th
     return distance_symmetric_single_nodes, distance_symmetric_clusters
 
 
+def sweep_truncated_hitting_time_thresholds(nodes: list[NodeRandomWalkData], thresholds: list[float]):
+    """
+    Clusters the nodes by cluster_nodes_by_truncated_hitting_times for each of a list of thresholds, sorting the nodes
+    by hitting time only once.
+
+    For a given threshold, a new group starts at every gap between consecutive sorted hitting times which is not smaller
+    than the threshold, so the groups of every threshold are read off the same sequence of gaps.
+
+    :return: dict(threshold: (single nodes, clusters)), as returned by cluster_nodes_by_truncated_hitting_times
+    """
+    nodes = sorted(nodes, key=lambda n: n.average_hitting_time)
+    hitting_time_gaps = np.diff([node.average_hitting_time for node in nodes])
+
+    clusterings = {}
+    for threshold in thresholds:
+        group_starts = np.flatnonzero(~(hitting_time_gaps < threshold)) + 1
+        distance_symmetric_clusters = []
+        distance_symmetric_single_nodes = set()
+        for group_start, group_end in zip(np.concatenate(([0], group_starts)),
+                                          np.concatenate((group_starts, [len(nodes)]))):
+            if group_end - group_start > 1:
+                distance_symmetric_clusters.append(nodes[group_start:group_end])
+            else:
+                distance_symmetric_single_nodes.add(nodes[group_start])
+        clusterings[threshold] = (distance_symmetric_single_nodes, distance_symmetric_clusters)
+
+    return clusterings
+
+
 def cluster_nodes_by_path_distributions(nodes: list[NodeRandomWalkData],
                                         number_of_walks: int,
                                         length_of_walks: int,
@@ -151,42 +225,43 @@ def cluster_nodes_by_path_distributions(nodes: list[NodeRandomWalkData],
     return single_nodes, clusters
 
 
-def compute_top_paths(nodes: list[NodeRandomWalkData], max_number_of_paths: int, path_length=None):
+def compute_top_paths(nodes: list[NodeRandomWalkData], max_number_of_paths: int, path_length=None, sparse=False):
     """
     From each node in the list, finds the most common paths and constructs a path count vector.
     Returns a path-count feature array of the nodes of size (number of paths) x (number of nodes) where the (i,j) entry
     corresponds to the number of times that the ith indexed path occurred for the jth indexed node.
 
     :param path_length: if not None, then only computes top path counts for paths of a specified length (int)
+    :param sparse: if True, then the array is returned as a scipy.sparse CSR matrix, storing only the non-zero counts
     """
+    path_string_to_path_index = {}
+    path_indices = []
+    node_indices = []
+    path_counts = []
+    for node_index, node in enumerate(nodes):
+        for path, path_count in node.get_top_paths(max_number_of_paths, path_length).items():
+            path_indices.append(path_string_to_path_index.setdefault(path, len(path_string_to_path_index)))
+            node_indices.append(node_index)
+            path_counts.append(path_count)
+
+    number_unique_paths = len(path_string_to_path_index)
+    if number_unique_paths == 0:
+        return None
 
-    top_paths_of_each_node = []  # list[dict(path: path_counts)]
-    [top_paths_of_each_node.append(node.get_top_paths(max_number_of_paths, path_length)) for node in nodes]
-
-    unique_paths = set()
-    [unique_paths.update(paths.keys()) for paths in top_paths_of_each_node]
-    number_unique_paths = len(unique_paths)
-    del unique_paths
+    if sparse:
+        from scipy.sparse import csr_matrix
 
-    if number_unique_paths > 0:
-        path_string_to_path_index = {}
-        # Array size (number of paths) x (number of nodes), each entry is the count of that path for that node:
-        node_path_counts = np.zeros([number_unique_paths, len(nodes)])
-        for node_index, node_paths in enumerate(top_paths_of_each_node):
-            for path, path_count in node_paths.items():
-                if path not in path_string_to_path_index.keys():
-                    path_index = len(path_string_to_path_index)
-                    path_string_to_path_index[path] = path_index
-                else:
-                    path_index = path_string_to_path_index[path]
+        return csr_matrix((np.array(path_counts, dtype=float), (path_indices, node_indices)),
+                          shape=(number_unique_paths, len(nodes)))
 
-                node_path_counts[path_index][node_index] = path_count
+    # Array size (number of paths) x (number of nodes), each entry is the count of that path for that node:
+    node_path_counts = np.zeros([number_unique_paths, len(nodes)])
+    node_path_counts[path_indices, node_indices] = path_counts
 
-        return node_path_counts
-    else:
-        return None
+    return node_path_counts
 
 
+@timed('js_clustering')
 def cluster_nodes_by_js_divergence(nodes: list[NodeRandomWalkData],
                                    significance_level: float,
                                    number_of_walks: int,
@@ -209,6 +284,8 @@ def cluster_nodes_by_js_divergence(nodes: list[NodeRandomWalkData],
     :return single_nodes, clusters: the final clustering of the nodes
     """
 
+    from scipy.stats import norm
+
     # z-score for hypothesis test
     z = norm.isf(significance_level)
     js_clusters = [NodeClusterRandomWalkData([node]) for node in nodes]
@@ -254,6 +331,77 @@ def cluster_nodes_by_js_divergence(nodes: list[NodeRandomWalkData],
     return single_nodes, clusters
 
 
+@timed('js_clustering')
+def compute_js_divergence_merge_order(nodes: list[NodeRandomWalkData], number_of_walks: int, max_number_of_paths: int):
+    """
+    Computes the full sequence of merges of agglomerative clustering of the nodes by the Jensen-Shannon divergence
+    between the distributions of their paths, merging the two closest clusters until a single cluster is left.
+
+    With a fixed divergence threshold, the agglomerative clustering merges the two closest clusters for as long as
+    their divergence is smaller than the threshold, so its merges are the merges of this sequence up to the first one
+    whose divergence is not smaller than the threshold (see sweep_js_divergence_thresholds). The divergences between
+    clusters are computed once, and only those of the newly merged cluster are recomputed after each merge.
+
+    :return: list((divergence, i, j)), where the clusters at positions i < j of the list of clusters (which starts with
+             one cluster per node, in the order of nodes) are merged into position i, and position j is removed
+    """
+    js_clusters = [NodeClusterRandomWalkData([node]) for node in nodes]
+    divergences = np.full((len(nodes), len(nodes)), np.inf)
+    for i in range(len(js_clusters)):
+        for j in range(i + 1, len(js_clusters)):
+            divergences[i, j] = compute_sk_divergence_of_top_n_paths(js_clusters[i], js_clusters[j],
+                                                                     max_number_of_paths, number_of_walks)
+
+    merge_order = []
+    while len(js_clusters) > 1:
+        # the first of the closest pairs of clusters, in the order in which cluster_nodes_by_js_divergence finds them
+        i, j = np.unravel_index(np.argmin(divergences), divergences.shape)
+        merge_order.append((float(divergences[i, j]), int(i), int(j)))
+
+        js_clusters[i].merge(js_clusters[j])
+        del js_clusters[j]
+        divergences = np.delete(np.delete(divergences, j, axis=0), j, axis=1)
+        for k in range(len(js_clusters)):
+            if k != i:
+                divergences[min(i, k), max(i, k)] = compute_sk_divergence_of_top_n_paths(
+                    js_clusters[min(i, k)], js_clusters[max(i, k)], max_number_of_paths, number_of_walks)
+
+    return merge_order
+
+
+def sweep_js_divergence_thresholds(nodes: list[NodeRandomWalkData], thresholds: list[float], number_of_walks: int,
+                                   max_number_of_paths: int):
+    """
+    Performs agglomerative clustering of the nodes by the Jensen-Shannon divergence between the distributions of their
+    paths, merging clusters whose divergence is smaller than a fixed threshold, for each of a list of thresholds. The
+    merge order is computed once (see compute_js_divergence_merge_order) and replayed up to each threshold.
+
+    :return: dict(threshold: (single nodes, clusters)), as returned by cluster_nodes_by_js_divergence
+    """
+    merge_order = compute_js_divergence_merge_order(nodes, number_of_walks, max_number_of_paths)
+
+    clusterings = {}
+    for threshold in thresholds:
+        node_clusters = [{node.name} for node in nodes]
+        for divergence, i, j in merge_order:
+            if not divergence < threshold:
+                break
+            node_clusters[i].update(node_clusters[j])
+            del node_clusters[j]
+
+        single_nodes = set()
+        clusters = []
+        for node_cluster in node_clusters:
+            if len(node_cluster) == 1:
+                single_nodes.update(node_cluster)
+            else:
+                clusters.append(node_cluster)
+        clusterings[threshold] = (single_nodes, clusters)
+
+    return clusterings
+
+
+@timed('birch_clustering')
 def cluster_nodes_by_birch(nodes: list[NodeRandomWalkData], pca_target_dimension: int, max_number_of_paths: int,
                            number_of_walks: int, significance_level: float):
     """
@@ -273,7 +421,7 @@ def cluster_nodes_by_birch(nodes: list[NodeRandomWalkData], pca_target_dimension
                                paths is tolerated before they are considered not path-symmetric.
     :return: single_nodes, clusters: the final clustering of the nodes
     """
-    node_path_counts = compute_top_paths(nodes, max_number_of_paths)
+    node_path_counts = compute_top_paths(nodes, max_number_of_paths, sparse=True)
 
     clustering_labels = compute_optimal_birch_clustering(node_path_counts,
                                                          pca_target_dimension,
@@ -290,32 +438,108 @@ def compute_optimal_birch_clustering(node_path_counts: np.array,
                                      number_of_walks: int,
                                      significance_level: float):
     """
-    Given an array of node path counts, clusters the nodes into an optimal number of clusters using birch clustering.
-    The number of clusters is incrementally increased. The optimal number of clusters is the smallest number of clusters
-    such that have statistically similar path count distributions at a specified significance level.
+    Given an array (or sparse matrix) of node path counts, clusters the nodes into an optimal number of clusters using birch clustering.
+    The optimal number of clusters is the smallest number of clusters such that the clusters have statistically similar
+    path count distributions at a specified significance level.
+
+    The CF-tree of the birch clustering is built once (see BirchClustering), and the number of clusters is found by a
+    galloping search (trying 2, 3, 5, 9, ... clusters) followed by a linear scan up from the last number of clusters
+    that failed the hypothesis test. The hypothesis test need not pass for every number of clusters above one that
+    passes, so the scan (rather than a bisection) finds the same number of clusters as trying every number from 2
+    upwards would, unless a number skipped by the galloping search also passes. If no number of clusters passes, the
+    labels of the largest number of clusters are returned.
     """
-    standardized_path_counts = (
-            (node_path_counts - np.mean(node_path_counts, axis=1)[:, None]) / np.mean(node_path_counts, axis=1)[:,
-                                                                              None]).T
+    from scipy.sparse import issparse
 
-    feature_vectors = compute_principal_components(feature_vectors=standardized_path_counts,
-                                                   target_dimension=pca_target_dimension)
+    if issparse(node_path_counts):
+        feature_vectors = compute_principal_components_of_sparse_path_counts(node_path_counts,
+                                                                             target_dimension=pca_target_dimension)
+        # the clusters select columns of the path counts
+        node_path_counts = node_path_counts.tocsc()
+    else:
+        standardized_path_counts = (
+                (node_path_counts - np.mean(node_path_counts, axis=1)[:, None]) / np.mean(node_path_counts, axis=1)[:,
+                                                                                  None]).T
+
+        feature_vectors = compute_principal_components(feature_vectors=standardized_path_counts,
+                                                       target_dimension=pca_target_dimension)
 
     number_of_feature_vectors = feature_vectors.shape[0]
+    if number_of_feature_vectors <= 2:  # zero/one clusters is invalid
+        return None
+
+    birch_clustering = BirchClustering(feature_vectors, threshold=0.05)
+    # beyond the number of subclusters, every subcluster is its own cluster, so larger numbers give the same labels
+    max_number_of_clusters = max(2, min(number_of_feature_vectors - 1, birch_clustering.number_of_subclusters))
+
+    cluster_labels = {}  # dict(number_of_clusters: cluster labels)
+    passes = {}  # dict(number_of_clusters: whether the clusters pass the hypothesis test)
+
+    def clusters_pass(number_of_clusters):
+        if number_of_clusters not in passes:
+            cluster_labels[number_of_clusters] = birch_clustering.labels(number_of_clusters)
+            node_path_counts_of_clusters = get_node_path_counts_of_clusters(node_path_counts,
+                                                                            cluster_labels[number_of_clusters])
+            passes[number_of_clusters] = test_quality_of_clusters(node_path_counts_of_clusters, number_of_walks,
+                                                                  significance_level)
+        return passes[number_of_clusters]
+
+    # galloping search for a number of clusters that passes, then a linear scan up to it from the last that failed
+    failing_number_of_clusters = 1
+    step = 1
+    number_of_clusters = 2
+    while not clusters_pass(number_of_clusters):
+        if number_of_clusters == max_number_of_clusters:
+            return cluster_labels[number_of_clusters]
+        failing_number_of_clusters = number_of_clusters
+        number_of_clusters = min(number_of_clusters + step, max_number_of_clusters)
+        step *= 2
+
+    passing_number_of_clusters = next(number_of_clusters for number_of_clusters
+                                      in range(failing_number_of_clusters + 1, number_of_clusters + 1)
+                                      if clusters_pass(number_of_clusters))
+
+    return cluster_labels[passing_number_of_clusters]
+
+
+class BirchClustering(object):
+    """
+    Birch clustering of a fixed set of feature vectors into any number of clusters.
 
-    cluster_labels = None
-    for number_of_clusters in range(2, number_of_feature_vectors):  # start from 2 since zero/one clusters is invalid
-        # clusterer = KMeans(n_clusters=number_of_clusters, max_iter=30, n_init=8)
-        clusterer = Birch(n_clusters=number_of_clusters, threshold=0.05)
+    The CF-tree of the feature vectors, and so the subcluster of each feature vector, is computed once. The global step
+    of birch clustering (agglomerative clustering of the subcluster centroids, with Ward linkage as in sklearn's Birch)
+    is also computed once, as a linkage tree, so that the labels for a given number of clusters only require a cut of
+    the tree.
+    """
+
+    def __init__(self, feature_vectors: np.array, threshold: float):
+        from sklearn.cluster import Birch
+        from scipy.cluster.hierarchy import linkage
+
+        birch = Birch(n_clusters=None, threshold=threshold).fit(feature_vectors)
+        self.subcluster_labels = birch.labels_  # the index of the subcluster of each feature vector
+        self.number_of_subclusters = len(birch.subcluster_centers_)
+        if self.number_of_subclusters > 1:
+            self._linkage = linkage(birch.subcluster_centers_, method='ward')
+        else:
+            self._linkage = None
+
+    def labels(self, number_of_clusters: int):
+        """
+        Returns the cluster label (from 0 to the number of clusters - 1) of each feature vector. If there are fewer
+        subclusters than number_of_clusters, then each subcluster is a cluster.
+        """
+        from scipy.cluster.hierarchy import fcluster
 
-        cluster_labels = clusterer.fit_predict(feature_vectors)
-        node_path_counts_of_clusters = get_node_path_counts_of_clusters(node_path_counts, cluster_labels)
-        if test_quality_of_clusters(node_path_counts_of_clusters, number_of_walks, significance_level):
-            return cluster_labels
+        if number_of_clusters >= self.number_of_subclusters:
+            subcluster_cluster_labels = np.arange(self.number_of_subclusters)
         else:
-            continue
+            subcluster_cluster_labels = fcluster(self._linkage, number_of_clusters, criterion='maxclust')
 
-    return cluster_labels
+        # relabel the clusters from zero, in order of their first appearance
+        _, first_appearances, cluster_labels = np.unique(subcluster_cluster_labels[self.subcluster_labels],
+                                                         return_index=True, return_inverse=True)
+        return np.argsort(np.argsort(first_appearances))[cluster_labels]
 
 
 def compute_principal_components(feature_vectors: np.array, target_dimension: int):
@@ -326,6 +550,8 @@ def compute_principal_components(feature_vectors: np.array, target_dimension: in
     :param target_dimension: the desired dimension of the dimensionality-reduced data
     :return: principal_components: the dimensionality-reduced feature vectors
     """
+    from sklearn.decomposition import PCA
+
     original_dimension = feature_vectors.shape[1]
     if original_dimension > target_dimension:
         pca = PCA(n_components=target_dimension)
@@ -336,21 +562,75 @@ def compute_principal_components(feature_vectors: np.array, target_dimension: in
     return principal_components
 
 
-def get_node_path_counts_of_clusters(node_path_counts: np.array, cluster_labels: np.array):
-    number_of_clusters = len(set(cluster_labels))
+def compute_principal_components_of_sparse_path_counts(node_path_counts, target_dimension: int,
+                                                      number_of_oversamples=10, number_of_power_iterations=4,
+                                                      random_state=0):
+    """
+    Computes the principal components of the standardized path count features of the nodes, as PCA on
+    ((node_path_counts - path means) / path means).T does, from a sparse path count matrix and without materialising
+    the dense standardized features.
+
+    The standardized features are S - 1, where S is the sparse matrix of path counts divided by their path means. The
+    mean of each column of S is one, so S - 1 is already centred, and its principal components are given by its
+    truncated SVD. This is computed with a randomized SVD (Halko et al. 2011) in which S - 1 is only ever multiplied
+    by thin dense matrices, so that only target_dimension + number_of_oversamples dense vectors per node are stored.
+
+    :param node_path_counts: sparse matrix of size (number of paths) x (number of nodes)
+    :param target_dimension: the desired dimension of the dimensionality-reduced data
+    :return: principal_components: (number of nodes) x (target_dimension) array, equal to that of PCA up to the sign
+             of each component
+    """
+    from scipy.sparse import diags
+
+    path_means = np.asarray(node_path_counts.mean(axis=1)).ravel()
+    # (number of nodes) x (number of paths)
+    scaled_path_counts = (diags(1 / path_means) @ node_path_counts).T.tocsr()
+    number_of_nodes, number_of_paths = scaled_path_counts.shape
+    if number_of_paths <= target_dimension:
+        return scaled_path_counts.toarray() - 1
+
+    def multiply(matrix):
+        # (S - 1) @ matrix
+        return scaled_path_counts @ matrix - matrix.sum(axis=0)[None, :]
+
+    def multiply_transpose(matrix):
+        # (S - 1).T @ matrix
+        return scaled_path_counts.T @ matrix - matrix.sum(axis=0)[None, :]
 
-    path_counts_for_cluster = [[] for _ in range(number_of_clusters)]
+    number_of_components = min(target_dimension + number_of_oversamples, number_of_nodes, number_of_paths)
+    random_matrix = np.random.RandomState(random_state).normal(size=(number_of_paths, number_of_components))
+    range_basis, _ = np.linalg.qr(multiply(random_matrix))
+    for _ in range(number_of_power_iterations):
+        range_basis, _ = np.linalg.qr(multiply(multiply_transpose(range_basis)))
 
-    for node_index, cluster_index in enumerate(cluster_labels):
-        path_counts_for_cluster[cluster_index].append(node_path_counts[:, node_index])
+    left_singular_vectors, singular_values, _ = np.linalg.svd(multiply_transpose(range_basis).T, full_matrices=False)
+    left_singular_vectors = range_basis @ left_singular_vectors[:, :target_dimension]
 
-    for cluster_index in range(number_of_clusters):
-        # transpose the arrays into the standard shape of (# unique paths in cluster) x (# nodes in cluster)
-        path_counts_for_cluster[cluster_index] = np.array(path_counts_for_cluster[cluster_index]).T
-        # remove any paths that have zero count for every node in the cluster
-        path_counts_for_cluster[cluster_index] = path_counts_for_cluster[cluster_index][~np.all(
-            path_counts_for_cluster[cluster_index] == 0,
-            axis=1)]
+    # make the largest entry of each component positive, so that the components are deterministic
+    signs = np.sign(left_singular_vectors[np.argmax(np.abs(left_singular_vectors), axis=0),
+                                          range(target_dimension)])
+    signs[signs == 0] = 1
+
+    return left_singular_vectors * (signs * singular_values[:target_dimension])
+
+
+def get_node_path_counts_of_clusters(node_path_counts: np.array, cluster_labels: np.array):
+    """
+    Splits a path-count feature array of size (number of paths) x (number of nodes) into one array for each cluster,
+    of size (number of paths of the cluster) x (number of nodes in the cluster), without the paths that have a zero
+    count for every node in the cluster. The path-count feature array may be a sparse matrix (preferably CSC), in which
+    case only the arrays of the clusters are dense.
+    """
+    from scipy.sparse import issparse
+
+    path_counts_for_cluster = []
+    for node_indices in _split_indices_by_cluster(cluster_labels):
+        cluster_path_counts = node_path_counts[:, node_indices]
+        if issparse(cluster_path_counts):
+            cluster_path_counts = cluster_path_counts.tocsr()
+            path_counts_for_cluster.append(cluster_path_counts[np.diff(cluster_path_counts.indptr) > 0].toarray())
+        else:
+            path_counts_for_cluster.append(cluster_path_counts[cluster_path_counts.any(axis=1)])
 
     return path_counts_for_cluster
 
@@ -362,26 +642,33 @@ def group_nodes_by_clustering_labels(nodes: list[NodeRandomWalkData], cluster_la
     :param nodes: the nodes to be grouped
     :param cluster_labels: a list of integers assigning each node to a given cluster
     """
-    number_of_clusters = len(set(cluster_labels))
-    original_clusters = [[] for _ in range(number_of_clusters)]
-    for node_index, cluster_index in enumerate(cluster_labels):
-        original_clusters[cluster_index].append(nodes[node_index].name)
-
-    # split into single nodes and clusters
     single_nodes = set()
     clusters = []
-    for cluster in original_clusters:
+    for node_indices in _split_indices_by_cluster(cluster_labels):
+        cluster = [nodes[node_index].name for node_index in node_indices]
         if len(cluster) == 1:
-            node_name = cluster[0]
-            single_nodes.add(node_name)
+            single_nodes.add(cluster[0])
         else:
             clusters.append(cluster)
 
     return single_nodes, clusters
 
 
+def _split_indices_by_cluster(cluster_labels):
+    """
+    Returns the indices of the members of each cluster, in increasing order, for cluster labels 0, 1, 2, ...
+    """
+    cluster_labels = np.asarray(cluster_labels)
+    node_indices = np.argsort(cluster_labels, kind='stable')
+    cluster_sizes = np.bincount(cluster_labels)
+
+    return [indices for indices in np.split(node_indices, np.cumsum(cluster_sizes)[:-1]) if len(indices)]
+
+
 # TODO: remove after debugging
 def plot_clustering(principal_components: np.array, cluster_labels: list[int]):
+    import matplotlib.pyplot as plt
+
     x, y = zip(*principal_components)
     x = np.array(x)
     y = np.array(y)
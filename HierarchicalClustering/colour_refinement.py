@@ -0,0 +1,125 @@
+from collections import Counter
+
+from GraphObjects import Hypergraph
+
+
+def refine_colours(hypergraph: Hypergraph, initial_colours: dict, number_of_iterations=None):
+    """
+    Weisfeiler-Lehman colour refinement of the nodes of a hypergraph, with edges labelled by their predicate and the
+    argument position of each of their nodes.
+
+    Starting from the initial colours, the colour of each node is repeatedly replaced by a colour for the pair (colour
+    of the node, multiset over the edges of the node of (predicate, argument position of the node, colours of the
+    arguments of the edge)), until no colour class splits or number_of_iterations iterations have been run. Two nodes of
+    different colours cannot be exchanged by an automorphism of the hypergraph that preserves the initial colours; two
+    nodes of the same colour usually, but not always, can.
+
+    :param initial_colours: dict(node: hashable colour) for every node of hypergraph.nodes
+    :return: dict(node: int colour)
+    """
+    colours = _relabel(initial_colours)
+    number_of_colours = len(set(colours.values()))
+    iteration = 0
+    while number_of_iterations is None or iteration < number_of_iterations:
+        signatures = {}
+        for node, colour in colours.items():
+            neighbourhood = []
+            for edge in set(hypergraph.memberships[node]):
+                nodes_of_edge = hypergraph.edges[edge]
+                argument_colours = tuple(colours[argument] for argument in nodes_of_edge)
+                neighbourhood.extend((hypergraph.predicates[edge], position, argument_colours)
+                                     for position, argument in enumerate(nodes_of_edge) if argument == node)
+            signatures[node] = (colour, tuple(sorted(neighbourhood)))
+
+        colours = _relabel(signatures)
+        iteration += 1
+        if len(set(colours.values())) == number_of_colours:
+            break
+        number_of_colours = len(set(colours.values()))
+
+    return colours
+
+
+def _relabel(signatures: dict):
+    colour_of_signature = {}
+
+    return {node: colour_of_signature.setdefault(signature, len(colour_of_signature))
+            for node, signature in signatures.items()}
+
+
+def find_equivalent_source_nodes(hypergraph: Hypergraph, source_nodes: list[str]):
+    """
+    Finds source nodes whose communities are copies of the community of another source node, relabelled.
+
+    Source nodes are grouped by colour refinement (starting from their type and singleton predicates), and the first
+    source node of each colour is its representative. Another source node of the same colour is equivalent to the
+    representative if exchanging the two is an automorphism of the hypergraph, in which case its random walks are
+    exactly those of the representative with the two exchanged. Source nodes for which this check fails are not
+    collapsed.
+
+    :return: dict(source node: representative source node), for the source nodes that are not representatives
+    """
+    initial_colours = {node: (node_type, tuple(sorted(hypergraph.singleton_edges.get(node, ()))),
+                              hypergraph.is_source_node[node])
+                       for node, node_type in hypergraph.nodes.items()}
+    colours = refine_colours(hypergraph, initial_colours)
+
+    representatives = {}  # dict(colour: representative source node)
+    equivalent_source_nodes = {}
+    for node in source_nodes:
+        representative = representatives.setdefault(colours[node], node)
+        if representative != node and is_transposition_automorphism(hypergraph, representative, node):
+            equivalent_source_nodes[node] = representative
+
+    return equivalent_source_nodes
+
+
+def find_symmetric_nodes(hypergraph: Hypergraph, source_node: str, number_of_iterations=None):
+    """
+    Finds groups of nodes that are exactly symmetric with respect to the source node, i.e. that have the same path
+    distributions and truncated hitting times for random walks from the source node.
+
+    Nodes are grouped by colour refinement (starting from their type and singleton predicates, with the source node
+    given a colour of its own), running at most number_of_iterations iterations (e.g. the length of the walks, beyond
+    which further splits rarely matter). Within each colour, nodes are grouped with the first node that they can be
+    exchanged with by an automorphism of the hypergraph (which fixes the source node); as the exchanges of a group
+    compose, every two nodes of a group are symmetric.
+
+    :return: list(list(node)), the groups of two or more symmetric nodes
+    """
+    initial_colours = {node: (node_type, tuple(sorted(hypergraph.singleton_edges.get(node, ()))), node == source_node)
+                       for node, node_type in hypergraph.nodes.items()}
+    colours = refine_colours(hypergraph, initial_colours, number_of_iterations)
+
+    groups_of_colour = {}  # dict(colour: list(list(node)))
+    for node, colour in colours.items():
+        if node == source_node:
+            continue
+        groups = groups_of_colour.setdefault(colour, [])
+        for group in groups:
+            if is_transposition_automorphism(hypergraph, group[0], node):
+                group.append(node)
+                break
+        else:
+            groups.append([node])
+
+    return [group for groups in groups_of_colour.values() for group in groups if len(group) > 1]
+
+
+def is_transposition_automorphism(hypergraph: Hypergraph, node1: str, node2: str):
+    """
+    Whether exchanging node1 and node2 (and leaving every other node in place) maps the hypergraph onto itself.
+    """
+    if hypergraph.nodes[node1] != hypergraph.nodes[node2] or \
+            hypergraph.singleton_edges.get(node1, set()) != hypergraph.singleton_edges.get(node2, set()):
+        return False
+
+    exchange = {node1: node2, node2: node1}
+    # only the edges of node1 or node2 are changed by the exchange
+    edges = set(hypergraph.memberships[node1]).union(hypergraph.memberships[node2])
+    original_edges = Counter((hypergraph.predicates[edge], tuple(hypergraph.edges[edge])) for edge in edges)
+    exchanged_edges = Counter((hypergraph.predicates[edge], tuple(exchange.get(node, node)
+                                                                  for node in hypergraph.edges[edge]))
+                              for edge in edges)
+
+    return original_edges == exchanged_edges
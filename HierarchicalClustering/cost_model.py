@@ -0,0 +1,105 @@
+import numpy as np
+
+from BisectionTree import BisectionTree
+from GraphObjects import Graph, Hypergraph
+from graph_utils import create_subgraph
+
+# lambda2 lies in [0, 2], but HierarchicalClusterer requires max_lambda2 to lie strictly within (0, 2)
+lambda2_margin = 1e-9
+
+
+def P_star(n, L):
+    if n > 1:
+        return 1 + (n * (n ** L - 1) / (n - 1))
+    else:
+        return 1
+
+
+def N_paths(P_star, epsilon=0.05, k=3):
+    return ((k + 1) * (0.577 + np.log(P_star)) - 1) / epsilon ** 2
+
+
+def N_THT(L, epsilon=0.05):
+    return (L - 1) ** 2 / (4 * epsilon ** 2)
+
+
+def compute_execution_cost(L, n, nodes):
+    return max(N_paths(P_star(n, L)), N_THT(L)) * nodes
+
+
+def compute_hypergraph_cost(hypergraph: Hypergraph):
+    """
+    The predicted cost of running the random walks of the communities of a hypergraph.
+    """
+    return compute_execution_cost(L=hypergraph.diameter(),
+                                  n=hypergraph.number_of_predicates(),
+                                  nodes=hypergraph.number_of_nodes())
+
+
+def compute_speed_up(original_hypergraph, hypergraph_clusters):
+    original_cost = compute_hypergraph_cost(original_hypergraph)
+    final_cost = sum([compute_hypergraph_cost(hypergraph) for hypergraph in hypergraph_clusters])
+
+    return round(original_cost / final_cost, 2)
+
+
+def tune_stopping_criteria(hypergraph: Hypergraph, bisection_tree: BisectionTree, min_leaf_size=None,
+                           max_conductance=None, graph: Graph = None):
+    """
+    Finds the stopping criteria of HierarchicalClusterer (min_cluster_size and max_lambda2) that minimise the predicted
+    cost of the random walks of the hypergraph clusters, subject to every cluster having at least min_leaf_size nodes
+    and every cut made having a conductance of at most max_conductance (if given).
+
+    A node of the bisection tree is split for every min_cluster_size up to the smaller of half its size and the size of
+    its smaller subgraph, and for every max_lambda2 from its lambda2 upwards, so only the criteria at these breakpoints
+    give different clusterings, and trying them all finds the best clustering that any criteria give. The predicted
+    cost of each cluster is computed once.
+
+    :param graph: the graph of the hypergraph, if it has already been computed
+    :return: dict('min_cluster_size': int, 'max_lambda2': float), or None if no criteria satisfy the constraints
+    """
+    if graph is None:
+        graph = hypergraph.convert_to_graph()
+
+    split_tree_nodes = [tree_node for tree_node in bisection_tree.tree_nodes if tree_node[3] is not None]
+    min_cluster_size_breakpoints = {min((end - start) // 2,
+                                        bisection_tree.number_of_nodes(left_child_index),
+                                        bisection_tree.number_of_nodes(right_child_index))
+                                    for _, start, end, left_child_index, right_child_index, _ in split_tree_nodes}
+    # the largest min_cluster_size does not split the graph at all
+    min_cluster_sizes = sorted(min_cluster_size_breakpoints.union(
+        {max(min_cluster_size_breakpoints, default=bisection_tree.min_cluster_size - 1) + 1}))
+    max_lambda2s = sorted({min(max(lambda2, lambda2_margin), bisection_tree.max_lambda2, 2 - lambda2_margin)
+                           for lambda2, _, _, _, _, _ in split_tree_nodes}) or \
+        [min(bisection_tree.max_lambda2, 2 - lambda2_margin)]
+
+    cluster_costs = {}  # dict(tree node index: predicted cost of its cluster)
+
+    def get_cluster_cost(tree_node_index):
+        if tree_node_index not in cluster_costs:
+            cluster_graph = create_subgraph(graph, set(bisection_tree.get_nodes(tree_node_index)))
+            cluster_costs[tree_node_index] = compute_hypergraph_cost(
+                cluster_graph.convert_to_hypergraph_from_template(hypergraph))
+
+        return cluster_costs[tree_node_index]
+
+    best_config = None
+    best_cost = float('inf')
+    for min_cluster_size in min_cluster_sizes:
+        for max_lambda2 in max_lambda2s:
+            cluster_tree_nodes, cut_tree_nodes = bisection_tree.get_cluster_tree_nodes(min_cluster_size, max_lambda2)
+            if max_conductance is not None and \
+                    any(bisection_tree.tree_nodes[tree_node_index][5] > max_conductance
+                        for tree_node_index in cut_tree_nodes):
+                continue
+            if min_leaf_size is not None and \
+                    any(bisection_tree.number_of_nodes(tree_node_index) < min_leaf_size
+                        for tree_node_index in cluster_tree_nodes):
+                continue
+
+            cost = sum(get_cluster_cost(tree_node_index) for tree_node_index in cluster_tree_nodes)
+            if cost < best_cost:
+                best_cost = cost
+                best_config = {'min_cluster_size': int(min_cluster_size), 'max_lambda2': float(max_lambda2)}
+
+    return best_config
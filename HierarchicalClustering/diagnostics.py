@@ -1,45 +1,20 @@
 from collections import defaultdict
-import matplotlib.pyplot as plt
 import numpy as np
 from HierarchicalClustering.HierarchicalClusterer import HierarchicalClusterer
-from tqdm import tqdm
+from HierarchicalClustering.BisectionTree import BisectionTree
+from HierarchicalClustering.cost_model import P_star, N_paths, N_THT, compute_execution_cost, compute_speed_up
 
 from HierarchicalClustering.RandomWalker import RandomWalker
 
 
-def P_star(n, L):
-    if n > 1:
-        return 1 + (n * (n ** L - 1) / (n - 1))
-    else:
-        return 1
-
-def N_paths(P_star, epsilon=0.05, k=3):
-    return ((k + 1) * (0.577 + np.log(P_star)) - 1) / epsilon ** 2
-
-
-def N_THT(L, epsilon=0.05):
-    return (L - 1) ** 2 / (4 * epsilon ** 2)
-
-
-def compute_execution_cost(L, n, nodes):
-    return max(N_paths(P_star(n, L)), N_THT(L)) * nodes
-
-
-def compute_speed_up(original_hypergraph, hypergraph_clusters):
-    original_cost = compute_execution_cost(L=original_hypergraph.diameter(),
-                                           n=original_hypergraph.number_of_predicates(),
-                                           nodes=original_hypergraph.number_of_nodes())
-    final_cost = sum([compute_execution_cost(L=hypergraph.diameter(),
-                                             n=hypergraph.number_of_predicates(),
-                                             nodes=hypergraph.number_of_nodes())
-                      for hypergraph in hypergraph_clusters])
-
-    return round(original_cost / final_cost, 2)
-
-
 def hierarchical_clustering_diagnostics(hypergraph):
+    import matplotlib.pyplot as plt
+    from tqdm import tqdm
+
     speed_up_records = defaultdict(lambda: [])
     lambda2s = np.arange(0.1, 2.0, 0.1)
+    # the eigenvectors and cuts are computed once, for the most permissive stopping criteria of the grid
+    bisection_tree = BisectionTree.build(hypergraph.convert_to_graph(), min_cluster_size=3, max_lambda2=2.0)
     for min_cluster_size in tqdm(np.arange(3, min(10, hypergraph.number_of_nodes()), 1)):
         for lambda2 in lambda2s:
             config = {
@@ -48,7 +23,7 @@ def hierarchical_clustering_diagnostics(hypergraph):
                     'max_lambda2': lambda2,
                 }}
             hc = HierarchicalClusterer(hypergraph=hypergraph, config=config['clustering_params'])
-            hc.run_hierarchical_clustering()
+            hc.run_hierarchical_clustering(bisection_tree=bisection_tree)
             speed_up_records[min_cluster_size].append(compute_speed_up(hypergraph,
                                                                        hc.hypergraph_clusters))
 
@@ -63,6 +38,8 @@ def hierarchical_clustering_diagnostics(hypergraph):
 
 
 def hypergraph_diagnostics(hypergraph):
+    import matplotlib.pyplot as plt
+
     degrees = [len(membership_array) for membership_array in hypergraph.memberships.values()]
     plt.xlabel('Degree')
     plt.ylabel('Count')
@@ -73,22 +50,38 @@ def hypergraph_diagnostics(hypergraph):
 
 
 def random_walk_diagnostics(hypergraph):
+    """
+    Plots, for each path length from 2 to 9, how far the path distributions of the random walks are from Zipf's law
+    and the average number of distinct paths that hit each node.
+
+    The walks are run once per source node, at length 9, and truncated to each shorter length. So every length uses the
+    number of walks that RandomWalker runs for length 9, which is at least the number it runs for that length on its
+    own. The curves of the shorter lengths therefore come from more walks than when each length ran its own walks, and
+    can show more of the rarer paths.
+    """
+    import matplotlib.pyplot as plt
+    from tqdm import tqdm
+
     rsd_dict = dict()
     average_number_of_paths = dict()
-    for path_length in tqdm(np.arange(2, 10)):
-        config = {
-            'random_walk_params': {
-                'epsilon': 0.1,
-                'max_num_paths': 3,
-                'alpha_sym': 0.1,
-                'pca_dim': 2,
-                'clustering_method_threshold': 50,
-                'max_path_length': int(path_length),
-                'theta_p': 0.5,
-            }
+    config = {
+        'random_walk_params': {
+            'epsilon': 0.1,
+            'max_num_paths': 3,
+            'alpha_sym': 0.1,
+            'pca_dim': 2,
+            'clustering_method_threshold': 50,
+            'max_path_length': 9,
+            'theta_p': 0.5,
         }
-        rw = RandomWalker(hypergraph=hypergraph, config=config['random_walk_params'])
-        rw_data = [rw.generate_node_random_walk_data(source_node=node) for node in hypergraph.nodes.keys()]
+    }
+    # the walks are run once, at the longest length, and truncated to each shorter path length (see above)
+    rw = RandomWalker(hypergraph=hypergraph, config=config['random_walk_params'])
+    multi_length_rw_data = [rw.generate_multi_length_random_walk_data(source_node=node)
+                            for node in tqdm(hypergraph.nodes.keys())]
+    for path_length in np.arange(2, rw.length_of_walk + 1):
+        rw_data = [rw_data_from_a_node.node_random_walk_data(int(path_length))
+                   for rw_data_from_a_node in multi_length_rw_data]
         rsd_data = []
         num_paths_data = []
         max_number_of_paths = 0
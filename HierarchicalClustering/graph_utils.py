@@ -1,4 +1,5 @@
 import networkx as nx
+import numpy as np
 from scipy.sparse.linalg import eigsh
 from GraphObjects import Graph
 
@@ -10,8 +11,10 @@ def get_second_eigenpair(graph: Graph):
     assert isinstance(graph, nx.Graph)
 
     laplacian_matrix = nx.normalized_laplacian_matrix(graph)
-    # Compute the second smallest eigenvalue of the laplacian matrix
-    eigen_values, eigen_vectors = eigsh(laplacian_matrix, which="SM", k=2)
+    # Compute the second smallest eigenvalue of the laplacian matrix. ARPACK starts from a random vector unless given
+    # one, which makes the sign of the eigenvector (and so the order of the clusters) differ between runs
+    initial_vector = np.random.default_rng(0).random(laplacian_matrix.shape[0])
+    eigen_values, eigen_vectors = eigsh(laplacian_matrix, which="SM", k=2, v0=initial_vector)
     vector2 = eigen_vectors[:, 1]
     lambda2 = eigen_values[1]
 
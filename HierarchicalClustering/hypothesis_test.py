@@ -3,6 +3,7 @@ import numpy as np
 from HierarchicalClustering.NodeRandomWalkData import NodeRandomWalkData
 from HierarchicalClustering.stats_utils import compute_generalised_chi_squared_critical_value
 from clustering_nodes_by_path_similarity import compute_top_paths
+from instrumentation import timed
 
 
 def test_quality_of_clusters(cluster_node_path_counts: list[np.array], number_of_walks: int, significance_level: float):
@@ -60,6 +61,7 @@ def append_null_counts(node_path_counts: np.array, number_of_walks: int):
     return np.vstack([node_path_counts, zero_counts])
 
 
+@timed('hypothesis_test')
 def hypothesis_test_path_symmetric_nodes(nodes: list[NodeRandomWalkData],
                                          number_of_walks: int,
                                          max_path_length: int,
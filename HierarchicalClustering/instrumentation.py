@@ -0,0 +1,370 @@
+"""
+Stage timers and counters for the clustering pipeline.
+
+Instrumentation is disabled by default, in which case a timed function costs one extra flag check per call. Once
+enabled, every timed stage records its number of calls, total and maximum wall time, and counters (e.g. the number of
+random walks run) are accumulated alongside. The results are exported as a JSON report.
+
+If instrumentation is enabled with trace_memory=True, memory is accounted for as well: each stage also records the
+largest increase in memory allocated (as traced by tracemalloc) during any one of its calls, and the deep sizes of the
+major data structures of the pipeline are recorded as they are built. Tracing memory slows the pipeline down
+considerably, so it is off by default.
+
+Example usage:
+    import instrumentation
+
+    instrumentation.enable()
+    original_hypergraph = Hypergraph(database_file='imdb1.db', info_file='imdb.info')
+    ...
+    instrumentation.write_report('imdb_report.json', database='imdb1.db')
+
+Stages recorded by the pipeline:
+    hypergraph_load      - parsing a database into a Hypergraph
+    clique_expansion     - converting a Hypergraph into a Graph
+    spectral_split       - computing the second eigenpair of a graph and, if required, its Cheeger cut
+    random_walks         - generating the random walk data of a source node
+    exact_hitting_times  - computing the exact average truncated hitting times of every pair of nodes
+    exact_path_distributions - computing the exact path distributions of the nodes for walks from a source node
+    hypothesis_test      - the path-symmetry and cluster quality hypothesis tests
+    js_clustering        - clustering nodes by the JS divergence of their path distributions
+    birch_clustering     - clustering nodes by birch clustering on PCA path-count features
+    file_output          - writing the files required by Alchemy
+
+Counters recorded by the pipeline:
+    source_nodes         - the number of source nodes random walks were run from
+    walks_run            - the total number of random walks run
+    collapsed_source_nodes - the number of source nodes whose communities were copied from an equivalent source node
+    pre_clustered_nodes  - the number of nodes clustered with an exactly symmetric node before statistical clustering
+    exact_path_distribution_sources - the number of source nodes whose path distributions were computed exactly
+
+Sizes recorded by the pipeline (with trace_memory=True):
+    hypergraph.*                  - the dicts of the Hypergraph parsed from a database
+    clique_graph                  - the networkx graph the hypergraph is converted into for hierarchical clustering
+    bisection_tree                - the nodes of the full tree of spectral bisections of a graph
+    node_random_walk_data         - the NodeRandomWalkData of all nodes, for one source node
+    community_printer.*           - the node maps of a CommunityPrinter
+"""
+
+import json
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import nullcontext
+from functools import wraps
+from types import FunctionType, ModuleType
+
+_enabled = False
+_trace_memory = False
+_started_tracemalloc = False
+_start_time = time.perf_counter()
+_stages = {}                    # dict(stage name: [number of calls, total wall time, max wall time, peak memory])
+_counters = defaultdict(int)    # dict(counter name: count)
+_sizes = {}                     # dict(structure name: [number of records, total size, max size])
+_peak_memory_stack = []         # the peak memory of each stage currently running, outermost first
+_peak_memory = 0                # the peak memory of the run, in bytes, as far as it is known
+_worker_peak_memory = 0         # the largest peak memory of a worker process (see Collected), in bytes
+
+
+def enable(trace_memory=False):
+    """
+    Enables instrumentation, discarding anything recorded before. If trace_memory is True, memory is accounted for too.
+    """
+    global _enabled, _trace_memory, _started_tracemalloc
+    reset()
+    _enabled = True
+    _trace_memory = trace_memory
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _started_tracemalloc = True
+
+
+def disable():
+    global _enabled, _trace_memory, _started_tracemalloc
+    _enabled = False
+    _trace_memory = False
+    if _started_tracemalloc:
+        tracemalloc.stop()
+        _started_tracemalloc = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    global _start_time, _peak_memory, _worker_peak_memory
+    _start_time = time.perf_counter()
+    _stages.clear()
+    _counters.clear()
+    _sizes.clear()
+    _peak_memory_stack.clear()
+    _peak_memory = 0
+    _worker_peak_memory = 0
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+
+
+class _StageTimer(object):
+    """
+    Times one call of a stage and, when tracing memory, measures the peak memory allocated during the call above what
+    was allocated when it started. tracemalloc only keeps a single peak, so it is reset whenever a stage starts or ends,
+    and the peak of each enclosing stage is carried on _peak_memory_stack.
+    """
+    __slots__ = ('name', 'start_time', 'start_memory')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        if _trace_memory:
+            current_memory, peak_memory = tracemalloc.get_traced_memory()
+            if _peak_memory_stack:
+                _peak_memory_stack[-1] = max(_peak_memory_stack[-1], peak_memory)
+            _update_peak_memory(peak_memory)
+            tracemalloc.reset_peak()
+            _peak_memory_stack.append(current_memory)
+            self.start_memory = current_memory
+
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        wall_time = time.perf_counter() - self.start_time
+
+        if _trace_memory and _peak_memory_stack:
+            peak_memory = max(_peak_memory_stack.pop(), tracemalloc.get_traced_memory()[1])
+            if _peak_memory_stack:
+                _peak_memory_stack[-1] = max(_peak_memory_stack[-1], peak_memory)
+            _update_peak_memory(peak_memory)
+            tracemalloc.reset_peak()
+            _record(self.name, wall_time, peak_memory=peak_memory - self.start_memory)
+        else:
+            _record(self.name, wall_time)
+
+        return False
+
+
+def _update_peak_memory(peak_memory: int):
+    global _peak_memory
+    _peak_memory = max(_peak_memory, peak_memory)
+
+
+def _record(name: str, wall_time: float, number_of_calls=1, max_wall_time=None, peak_memory=None):
+    max_wall_time = wall_time if max_wall_time is None else max_wall_time
+    statistics = _stages.get(name)
+    if statistics is None:
+        _stages[name] = [number_of_calls, wall_time, max_wall_time, peak_memory]
+    else:
+        statistics[0] += number_of_calls
+        statistics[1] += wall_time
+        statistics[2] = max(statistics[2], max_wall_time)
+        if peak_memory is not None:
+            statistics[3] = peak_memory if statistics[3] is None else max(statistics[3], peak_memory)
+
+
+_null_stage = nullcontext()
+
+
+def stage(name: str):
+    """
+    Context manager timing one call of the named stage.
+
+    Example usage:
+        with instrumentation.stage('spectral_split'):
+            v_2, lambda2 = get_second_eigenpair(graph)
+    """
+    return _StageTimer(name) if _enabled else _null_stage
+
+
+def timed(name: str):
+    """
+    Decorator timing every call of the decorated function as one call of the named stage.
+    """
+
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+
+            with _StageTimer(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def count(name: str, value=1):
+    """
+    Adds value to the named counter.
+    """
+    if _enabled:
+        _counters[name] += value
+
+
+def is_tracing_memory():
+    return _enabled and _trace_memory
+
+
+def deep_size(obj):
+    """
+    The size in bytes of an object together with everything it refers to (the items of containers and the attributes
+    of objects), counting each object once.
+    """
+    size = 0
+    seen = set()
+    objects = [obj]
+    while objects:
+        obj = objects.pop()
+        if id(obj) in seen or isinstance(obj, (type, ModuleType, FunctionType)):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+
+        if isinstance(obj, dict):
+            objects.extend(obj.keys())
+            objects.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            objects.extend(obj)
+
+        if hasattr(obj, '__dict__'):
+            objects.append(obj.__dict__)
+        for slot in getattr(type(obj), '__slots__', ()):
+            if hasattr(obj, slot):
+                objects.append(getattr(obj, slot))
+
+    return size
+
+
+def record_size(name: str, obj):
+    """
+    Records the deep size of a data structure, if memory is being traced.
+    """
+    if not (_enabled and _trace_memory):
+        return None
+
+    _record_size(name, deep_size(obj))
+
+
+def record_attribute_sizes(name: str, obj, attribute_names: list[str]):
+    """
+    Records the deep size of each of the named attributes of an object as name.attribute_name, if memory is being
+    traced.
+    """
+    if not (_enabled and _trace_memory):
+        return None
+
+    for attribute_name in attribute_names:
+        _record_size(f'{name}.{attribute_name}', deep_size(getattr(obj, attribute_name)))
+
+
+def _record_size(name: str, size: int, number_of_records=1, max_size=None):
+    max_size = size if max_size is None else max_size
+    sizes = _sizes.get(name)
+    if sizes is None:
+        _sizes[name] = [number_of_records, size, max_size]
+    else:
+        sizes[0] += number_of_records
+        sizes[1] += size
+        sizes[2] = max(sizes[2], max_size)
+
+
+def snapshot():
+    """
+    The stages, counters and sizes recorded so far, in a form that can be sent between processes and merged.
+    """
+    if _trace_memory:
+        _update_peak_memory(tracemalloc.get_traced_memory()[1])
+
+    return {'stages': {name: list(statistics) for name, statistics in _stages.items()},
+            'counters': dict(_counters),
+            'sizes': {name: list(sizes) for name, sizes in _sizes.items()},
+            'peak_memory': _peak_memory if _trace_memory else None}
+
+
+def merge(recorded: dict):
+    """
+    Adds the stages, counters and sizes of a snapshot (e.g. one taken in a worker process) to those recorded so far.
+    """
+    global _worker_peak_memory
+    if not _enabled or recorded is None:
+        return None
+
+    for name, (number_of_calls, wall_time, max_wall_time, peak_memory) in recorded['stages'].items():
+        _record(name, wall_time, number_of_calls=number_of_calls, max_wall_time=max_wall_time,
+                peak_memory=peak_memory)
+    for name, value in recorded['counters'].items():
+        _counters[name] += value
+    for name, (number_of_records, size, max_size) in recorded['sizes'].items():
+        _record_size(name, size, number_of_records=number_of_records, max_size=max_size)
+    if recorded['peak_memory'] is not None:
+        # the peak of a worker process is reported separately from the peak of this process
+        _worker_peak_memory = max(_worker_peak_memory, recorded['peak_memory'])
+
+
+class Collected(object):
+    """
+    Wraps a function that is run in a worker process so that it returns (result, snapshot), where the snapshot holds
+    only what was recorded during that call. Merge the snapshot into the parent process with merge().
+
+    Example usage:
+        with Pool() as pool:
+            for result, recorded in pool.imap(instrumentation.Collected(function), arguments):
+                instrumentation.merge(recorded)
+    """
+
+    def __init__(self, function):
+        self.function = function
+        # worker processes do not share the parent's module state, so the flags are sent along with the function
+        self.enabled = _enabled
+        self.trace_memory = _trace_memory
+
+    def __call__(self, *args, **kwargs):
+        if not self.enabled:
+            disable()
+            return self.function(*args, **kwargs), None
+
+        enable(trace_memory=self.trace_memory)
+        result = self.function(*args, **kwargs)
+
+        return result, snapshot()
+
+
+def report(**metadata):
+    """
+    Summarises the run as a dictionary of per-stage wall times and call counts, and counters.
+    """
+    stages = {}
+    for name, (number_of_calls, wall_time, max_wall_time, peak_memory) in _stages.items():
+        stages[name] = {'calls': number_of_calls,
+                        'wall_time': wall_time,
+                        'mean_wall_time': wall_time / number_of_calls,
+                        'max_wall_time': max_wall_time}
+        if peak_memory is not None:
+            stages[name]['peak_memory'] = peak_memory
+
+    run_report = {'metadata': metadata,
+                  'wall_time': time.perf_counter() - _start_time,
+                  'stages': stages,
+                  'counters': dict(_counters)}
+
+    if _trace_memory:
+        _update_peak_memory(tracemalloc.get_traced_memory()[1])
+        run_report['peak_memory'] = _peak_memory
+        run_report['worker_peak_memory'] = _worker_peak_memory
+        run_report['sizes'] = {name: {'records': number_of_records,
+                                      'mean_size': size / number_of_records,
+                                      'max_size': max_size}
+                               for name, (number_of_records, size, max_size) in _sizes.items()}
+
+    return run_report
+
+
+def write_report(file_name: str, **metadata):
+    """
+    Writes the report of the run to a JSON file. Any keyword arguments are stored under 'metadata'.
+    """
+    with open(file_name, 'w') as file:
+        json.dump(report(**metadata), file, indent=4)
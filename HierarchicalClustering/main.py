@@ -1,3 +1,4 @@
+import instrumentation
 from GraphObjects import Hypergraph
 from HierarchicalClustering import HierarchicalClusterer
 from HierarchicalClustering.diagnostics import hierarchical_clustering_diagnostics, hypergraph_diagnostics, \
@@ -18,9 +19,19 @@ if __name__ == "__main__":
             'max_path_length': 7,
             'theta_p': 0.5,
             'multiprocessing': False
+        },
+        'instrumentation_params': {
+            # record per-stage wall times and call counts, written to report_file at the end of the run
+            'enabled': False,
+            'report_file': 'run_report.json',
+            # also record per-stage memory peaks and the sizes of the main data structures (slow)
+            'trace_memory': False,
         }
     }
 
+    if config['instrumentation_params']['enabled']:
+        instrumentation.enable(trace_memory=config['instrumentation_params']['trace_memory'])
+
     print('Original Hypergraph')
     original_hypergraph = Hypergraph(database_file='./Databases/MovieLensMini.db',
                                      info_file='./Databases/MovieLensMini.info')
@@ -54,4 +65,6 @@ if __name__ == "__main__":
     # print(communities)
     # community_printer.write_files(file_name='imdb')
 
-
+    if config['instrumentation_params']['enabled']:
+        instrumentation.write_report(config['instrumentation_params']['report_file'],
+                                     database='./Databases/MovieLensMini.db', config=config)
@@ -1,8 +1,11 @@
 import numpy as np
-from chi2comb import chi2comb_cdf, ChiSquared
+
+# chi2comb is slow to import and only needed for the hypothesis tests, so it is imported when they first run
 
 
 def gradient_descent(value, step_size, significance_level, chi2s, normal_coefficient):
+    from chi2comb import chi2comb_cdf
+
     prob_less_than_value = chi2comb_cdf(value, chi2s, normal_coefficient)
     significance_of_value = 1 - prob_less_than_value
 
@@ -17,6 +20,8 @@ def compute_generalised_chi_squared_critical_value(weight_vector,
                                                    normal_coefficient,
                                                    significance_level,
                                                    initial_value):
+    from chi2comb import ChiSquared
+
     chi2s = [ChiSquared(weight_vector[i], centrality_vector[i], dof_vector[i])
              for i in range(len(weight_vector))]
 
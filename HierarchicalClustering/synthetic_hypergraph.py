@@ -0,0 +1,168 @@
+import os
+import random
+
+from errors import check_argument
+
+
+def write_synthetic_database(file_name: str,
+                             number_of_nodes: int,
+                             number_of_edges: int,
+                             number_of_predicates: int,
+                             max_arity=2,
+                             number_of_node_types=1,
+                             number_of_unary_predicates=0,
+                             seed=None):
+    """
+    Writes a random, connected relational database (file_name.db) and its info file (file_name.info), for use as a
+    hypergraph of controllable size, arity and number of predicates.
+
+    Each node is given one of number_of_node_types types, in turn. Each of the number_of_predicates predicates has an
+    arity chosen uniformly between 2 and max_arity, and argument types drawn from the node types (every node type is
+    the type of at least one argument). The edges are the ground atoms of randomly chosen predicates on randomly chosen
+    nodes of the right types. If these leave the hypergraph disconnected, atoms joining each component to the largest
+    component are added, so the database may contain more than number_of_edges atoms. Finally, each node is given an
+    atom of each unary predicate of its type with probability 1 / number_of_unary_predicates.
+
+    Example usage:
+        database_file, info_file = write_synthetic_database('synthetic', number_of_nodes=1000, number_of_edges=3000,
+                                                            number_of_predicates=5, max_arity=3, seed=0)
+        hypergraph = Hypergraph(database_file=database_file, info_file=info_file)
+
+    :returns: database_file, info_file - the paths of the files written
+    """
+    check_argument('number_of_nodes', number_of_nodes, int, 2, strict_inequalities=False)
+    check_argument('number_of_edges', number_of_edges, int, 1, strict_inequalities=False)
+    check_argument('number_of_predicates', number_of_predicates, int, 1, strict_inequalities=False)
+    check_argument('max_arity', max_arity, int, 2, strict_inequalities=False)
+    check_argument('number_of_node_types', number_of_node_types, int, 1, number_of_nodes, strict_inequalities=False)
+    check_argument('number_of_unary_predicates', number_of_unary_predicates, int, 0, strict_inequalities=False)
+
+    generator = random.Random(seed)
+
+    node_types = [f'type{type_index}' for type_index in range(number_of_node_types)]
+    nodes_of_type = {node_type: [] for node_type in node_types}
+    node_to_type = {}
+    for node_index in range(number_of_nodes):
+        node_type = node_types[node_index % number_of_node_types]
+        nodes_of_type[node_type].append(f'N{node_index}')
+        node_to_type[f'N{node_index}'] = node_type
+
+    predicate_argument_types = {}
+    for predicate_index in range(number_of_predicates):
+        arity = generator.randint(2, max_arity)
+        predicate_argument_types[f'Pred{predicate_index}'] = [generator.choice(node_types) for _ in range(arity)]
+
+    # make sure that every node type can appear in an edge
+    argument_slots = [(predicate, position) for predicate, argument_types in predicate_argument_types.items()
+                      for position in range(len(argument_types))]
+    if len(argument_slots) < number_of_node_types:
+        raise ValueError(f"Cannot generate database. The predicates have {len(argument_slots)} arguments in total, "
+                         f"fewer than the number of node types ({number_of_node_types}).")
+    for (predicate, position), node_type in zip(generator.sample(argument_slots, number_of_node_types), node_types):
+        predicate_argument_types[predicate][position] = node_type
+
+    unary_predicate_argument_types = {f'Unary{predicate_index}': [generator.choice(node_types)]
+                                      for predicate_index in range(number_of_unary_predicates)}
+
+    atoms = []
+    components = _Components()
+    for _ in range(number_of_edges):
+        atoms.append(_random_atom(generator, predicate_argument_types, nodes_of_type, components))
+
+    components.add(list(node_to_type.keys()))
+    list_of_components = components.components()
+    while len(list_of_components) > 1:
+        largest_component = max(list_of_components, key=len)
+        nodes_of_type_in_largest_component = {}
+        for node in largest_component:
+            nodes_of_type_in_largest_component.setdefault(node_to_type[node], []).append(node)
+
+        for component in list_of_components:
+            if component is not largest_component:
+                atoms.append(_joining_atom(generator, predicate_argument_types, node_to_type,
+                                           nodes_of_type_in_largest_component, nodes_of_type, component, components))
+
+        list_of_components = components.components()
+
+    for predicate, argument_types in unary_predicate_argument_types.items():
+        for node in nodes_of_type[argument_types[0]]:
+            if generator.random() < 1 / len(unary_predicate_argument_types):
+                atoms.append((predicate, [node]))
+
+    database_file = file_name + '.db'
+    info_file = file_name + '.info'
+    with open(database_file, 'w') as file:
+        file.writelines(f"{predicate}({','.join(nodes)})\n" for predicate, nodes in atoms)
+    with open(info_file, 'w') as file:
+        file.writelines(f"{predicate}({','.join(argument_types)})\n" for predicate, argument_types
+                        in {**predicate_argument_types, **unary_predicate_argument_types}.items())
+
+    return os.path.abspath(database_file), os.path.abspath(info_file)
+
+
+def _random_atom(generator: random.Random, predicate_argument_types: dict, nodes_of_type: dict,
+                 components: '_Components'):
+    predicate = generator.choice(list(predicate_argument_types.keys()))
+    nodes = [generator.choice(nodes_of_type[node_type]) for node_type in predicate_argument_types[predicate]]
+    components.union(nodes)
+
+    return predicate, nodes
+
+
+def _joining_atom(generator: random.Random, predicate_argument_types: dict, node_to_type: dict,
+                  nodes_of_type_in_largest_component: dict, nodes_of_type: dict, component: list[str],
+                  components: '_Components'):
+    """
+    Draws an atom with a node of the component in one of its argument slots and, where there are nodes of the right
+    type, nodes of the largest component in the other slots.
+    """
+    node = generator.choice(component)
+    node_type = node_to_type[node]
+
+    predicate = generator.choice([predicate for predicate, argument_types in predicate_argument_types.items()
+                                  if node_type in argument_types])
+    argument_types = predicate_argument_types[predicate]
+    node_position = generator.choice([position for position, argument_type in enumerate(argument_types)
+                                      if argument_type == node_type])
+
+    nodes = [generator.choice(nodes_of_type_in_largest_component.get(argument_type, nodes_of_type[argument_type]))
+             for argument_type in argument_types]
+    nodes[node_position] = node
+    components.union(nodes)
+
+    return predicate, nodes
+
+
+class _Components(object):
+    """
+    Union-find over the nodes of the atoms drawn so far.
+    """
+
+    def __init__(self):
+        self.parents = {}
+
+    def add(self, nodes: list[str]):
+        for node in nodes:
+            self.parents.setdefault(node, node)
+
+    def find(self, node: str):
+        root = node
+        while self.parents[root] != root:
+            root = self.parents[root]
+        while self.parents[node] != root:
+            self.parents[node], node = root, self.parents[node]
+
+        return root
+
+    def union(self, nodes: list[str]):
+        self.add(nodes)
+        root = self.find(nodes[0])
+        for node in nodes[1:]:
+            self.parents[self.find(node)] = root
+
+    def components(self):
+        components = {}
+        for node in self.parents.keys():
+            components.setdefault(self.find(node), []).append(node)
+
+        return list(components.values())
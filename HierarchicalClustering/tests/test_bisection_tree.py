@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+
+from BisectionTree import BisectionTree
+from GraphObjects import Hypergraph
+from HierarchicalClusterer import HierarchicalClusterer
+
+imdb_db = './Databases/imdb1.db'
+imdb_info = './Databases/imdb.info'
+
+H = Hypergraph(database_file=imdb_db, info_file=imdb_info)
+G = H.convert_to_graph()
+bisection_tree = BisectionTree.build(G)
+stopping_criteria = [(3, 0.7), (3, 1.5), (5, 0.7), (10, 0.3), (10, 1.9)]
+
+
+class TestBisectionTree(unittest.TestCase):
+
+    def test_clusters_match_hierarchical_clustering(self):
+        for min_cluster_size, max_lambda2 in stopping_criteria:
+            clusterer = HierarchicalClusterer(H, config={'min_cluster_size': min_cluster_size,
+                                                         'max_lambda2': max_lambda2})
+            clusterer.get_clusters(G)
+            clusters = bisection_tree.get_clusters(min_cluster_size, max_lambda2)
+
+            assert [set(cluster) for cluster in clusters] == \
+                   [set(graph.nodes()) for graph in clusterer.graph_clusters]
+
+    def test_clustering_from_bisection_tree(self):
+        clusterer = HierarchicalClusterer(H, config={'min_cluster_size': 5, 'max_lambda2': 0.7})
+        hypergraph_clusters = clusterer.run_hierarchical_clustering(bisection_tree=bisection_tree)
+
+        assert [set(hypergraph.nodes) for hypergraph in hypergraph_clusters] == \
+               [set(cluster) for cluster in bisection_tree.get_clusters(5, 0.7)]
+
+    def test_saved_tree_is_reloaded(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'bisection_tree.json')
+            bisection_tree.save(file_name)
+            reloaded_bisection_tree = BisectionTree.load(file_name)
+
+        assert reloaded_bisection_tree.tree_nodes == bisection_tree.tree_nodes
+        for min_cluster_size, max_lambda2 in stopping_criteria:
+            assert reloaded_bisection_tree.get_clusters(min_cluster_size, max_lambda2) == \
+                   bisection_tree.get_clusters(min_cluster_size, max_lambda2)
+
+    def test_stricter_tree_cannot_answer_permissive_criteria(self):
+        strict_bisection_tree = BisectionTree.build(G, min_cluster_size=5, max_lambda2=0.7)
+        with self.assertRaises(ValueError):
+            strict_bisection_tree.get_clusters(3, 0.7)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import json
+import os
+import tempfile
+import unittest
+
+from cli import main, get_argument_parser, get_config
+
+imdb_db = './Databases/imdb1.db'
+imdb_info = './Databases/imdb.info'
+
+
+def read_files(file_name):
+    contents = []
+    for extension in ['.ldb', '.uldb', '.srcnclusts']:
+        with open(file_name + extension, 'r') as file:
+            contents.append(file.read())
+
+    return contents
+
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def path(self, file_name):
+        return os.path.join(self.directory.name, file_name)
+
+    def test_flags_take_precedence_over_config_file(self):
+        with open(self.path('cli_config.json'), 'w') as config_file:
+            json.dump({'clustering_params': {'min_cluster_size': 5, 'max_lambda2': 0.6},
+                       'random_walk_params': {'epsilon': 0.05}}, config_file)
+
+        arguments = get_argument_parser().parse_args([imdb_db, imdb_info, '--config', self.path('cli_config.json'),
+                                                      '--min-cluster-size', '8', '--workers', '2', '--seed', '1'])
+        config = get_config(arguments)
+
+        assert config['clustering_params'] == {'min_cluster_size': 8, 'max_lambda2': 0.6}
+        assert config['random_walk_params']['epsilon'] == 0.05
+        assert config['random_walk_params']['max_path_length'] == 5
+        assert config['random_walk_params']['multiprocessing'] is True
+        assert config['random_walk_params']['number_of_processes'] == 2
+        assert config['random_walk_params']['seed'] == 1
+
+    def test_seeded_runs_are_reproducible(self):
+        main([imdb_db, imdb_info, '--output', self.path('cli_serial'), '--seed', '3'])
+        main([imdb_db, imdb_info, '--output', self.path('cli_parallel'), '--seed', '3', '--workers', '2'])
+
+        assert read_files(self.path('cli_serial')) == read_files(self.path('cli_parallel'))
+
+    def test_cached_run_writes_same_files(self):
+        arguments = [imdb_db, imdb_info, '--seed', '3', '--cache-dir', self.path('cli_cache'), '--profile']
+        main(arguments + ['--output', self.path('cli_first')])
+        main(arguments + ['--output', self.path('cli_cached')])
+
+        assert len(os.listdir(self.path('cli_cache'))) == 2
+        assert read_files(self.path('cli_first')) == read_files(self.path('cli_cached'))
+        with open(self.path('cli_cached.profile.json'), 'r') as profile_file:
+            # the second run loads the hypergraph clusters and communities from the cache
+            assert 'random_walks' not in json.load(profile_file)['stages']
@@ -0,0 +1,223 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+from scipy.sparse import csr_matrix, issparse
+
+import clustering_nodes_by_path_similarity
+from clustering_nodes_by_path_similarity import BirchClustering, cluster_nodes_by_truncated_hitting_times, \
+    compute_optimal_birch_clustering, compute_principal_components, \
+    compute_principal_components_of_sparse_path_counts, compute_top_paths, get_node_path_counts_of_clusters, \
+    group_nodes_by_clustering_labels, sweep_js_divergence_thresholds, sweep_truncated_hitting_time_thresholds
+from js_divergence_utils import compute_sk_divergence_of_top_n_paths
+from NodeRandomWalkData import NodeClusterRandomWalkData, NodeRandomWalkData
+
+# three groups of nodes, each with its own block of ten paths, so that a cluster mixes groups exactly when it has
+# more than ten paths with a non-zero count
+number_of_groups = 3
+paths_per_group = 10
+nodes_per_group = 20
+random_state = np.random.RandomState(0)
+groups = np.repeat(np.arange(number_of_groups), nodes_per_group)
+node_path_counts = np.zeros([number_of_groups * paths_per_group, len(groups)])
+for node_index, group in enumerate(groups):
+    path_probabilities = np.arange(1, paths_per_group + 1) ** (group + 1.0)
+    node_path_counts[group * paths_per_group:(group + 1) * paths_per_group, node_index] = \
+        random_state.multinomial(1000, path_probabilities / path_probabilities.sum())
+
+
+def clusters_are_pure(node_path_counts_of_clusters, number_of_walks, significance_level):
+    return all(cluster_path_counts.shape[0] <= paths_per_group for cluster_path_counts in node_path_counts_of_clusters)
+
+
+class TestBirchClustering(unittest.TestCase):
+
+    def test_optimal_clustering_separates_groups(self):
+        with mock.patch.object(clustering_nodes_by_path_similarity, 'test_quality_of_clusters', clusters_are_pure):
+            cluster_labels = compute_optimal_birch_clustering(node_path_counts, pca_target_dimension=2,
+                                                              number_of_walks=1000, significance_level=0.05)
+
+        assert len(set(cluster_labels)) == number_of_groups
+        for group in range(number_of_groups):
+            assert len(set(cluster_labels[groups == group])) == 1
+
+    def test_search_finds_smallest_passing_number_of_clusters(self):
+        # cluster points directly, rather than principal components of path counts
+        points = random_state.normal(size=(200, 2))
+        node_indicators = np.eye(len(points))
+        birch_clustering = BirchClustering(points, threshold=0.05)
+        for max_cluster_size in [5, 20, 60, 150]:
+            def clusters_are_small(node_path_counts_of_clusters, number_of_walks, significance_level):
+                return all(cluster_path_counts.shape[1] <= max_cluster_size
+                           for cluster_path_counts in node_path_counts_of_clusters)
+
+            expected_number_of_clusters = next(
+                number_of_clusters for number_of_clusters in range(2, len(points))
+                if clusters_are_small(get_node_path_counts_of_clusters(node_indicators,
+                                                                       birch_clustering.labels(number_of_clusters)),
+                                      number_of_walks=None, significance_level=None))
+
+            with mock.patch.object(clustering_nodes_by_path_similarity, 'test_quality_of_clusters',
+                                   clusters_are_small), \
+                    mock.patch.object(clustering_nodes_by_path_similarity, 'compute_principal_components',
+                                      lambda feature_vectors, target_dimension: points):
+                cluster_labels = compute_optimal_birch_clustering(node_indicators + 1, pca_target_dimension=2,
+                                                                  number_of_walks=1000, significance_level=0.05)
+
+            assert len(set(cluster_labels)) == expected_number_of_clusters
+
+    def test_search_does_not_assume_passing_is_monotone(self):
+        points = random_state.normal(size=(200, 2))
+        node_indicators = np.eye(len(points))
+
+        # the galloping search fails at 9 and passes at 17, and a bisection would then settle on 16
+        def clusters_pass_at_10_and_from_16(node_path_counts_of_clusters, number_of_walks, significance_level):
+            return len(node_path_counts_of_clusters) == 10 or len(node_path_counts_of_clusters) >= 16
+
+        with mock.patch.object(clustering_nodes_by_path_similarity, 'test_quality_of_clusters',
+                               clusters_pass_at_10_and_from_16), \
+                mock.patch.object(clustering_nodes_by_path_similarity, 'compute_principal_components',
+                                  lambda feature_vectors, target_dimension: points):
+            cluster_labels = compute_optimal_birch_clustering(node_indicators + 1, pca_target_dimension=2,
+                                                              number_of_walks=1000, significance_level=0.05)
+
+        assert len(set(cluster_labels)) == 10
+
+    def test_labels_are_numbered_from_zero(self):
+        birch_clustering = BirchClustering(node_path_counts.T, threshold=0.05)
+        for number_of_clusters in range(1, 6):
+            cluster_labels = birch_clustering.labels(number_of_clusters)
+            assert set(cluster_labels) == set(range(len(set(cluster_labels))))
+            assert cluster_labels[0] == 0
+
+
+class TestSparsePathCountFeatures(unittest.TestCase):
+
+    def test_sparse_top_paths_match_dense_top_paths(self):
+        nodes = []
+        for node_index in range(node_path_counts.shape[1]):
+            node = NodeRandomWalkData(str(node_index), node_type='person')
+            for path_index in np.flatnonzero(node_path_counts[:, node_index]):
+                node.path_counts[f'path{path_index}'] = node_path_counts[path_index, node_index]
+            nodes.append(node)
+
+        for max_number_of_paths in [3, 10]:
+            sparse_path_counts = compute_top_paths(nodes, max_number_of_paths, sparse=True)
+            assert issparse(sparse_path_counts)
+            assert np.array_equal(sparse_path_counts.toarray(), compute_top_paths(nodes, max_number_of_paths))
+
+    def test_sparse_principal_components_match_PCA(self):
+        path_means = np.mean(node_path_counts, axis=1)[:, None]
+        standardized_path_counts = ((node_path_counts - path_means) / path_means).T
+        for target_dimension in [2, 3]:
+            principal_components = compute_principal_components(standardized_path_counts, target_dimension)
+            sparse_principal_components = compute_principal_components_of_sparse_path_counts(
+                csr_matrix(node_path_counts), target_dimension)
+
+            assert sparse_principal_components.shape == (node_path_counts.shape[1], target_dimension)
+            # principal components are only defined up to their sign
+            assert np.allclose(np.abs(sparse_principal_components), np.abs(principal_components), atol=1e-6)
+
+    def test_optimal_clustering_of_sparse_path_counts_separates_groups(self):
+        with mock.patch.object(clustering_nodes_by_path_similarity, 'test_quality_of_clusters', clusters_are_pure):
+            cluster_labels = compute_optimal_birch_clustering(csr_matrix(node_path_counts), pca_target_dimension=2,
+                                                              number_of_walks=1000, significance_level=0.05)
+
+        assert len(set(cluster_labels)) == number_of_groups
+        for group in range(number_of_groups):
+            assert len(set(cluster_labels[groups == group])) == 1
+
+
+class TestGroupingByClusterLabels(unittest.TestCase):
+
+    def test_node_path_counts_of_clusters(self):
+        path_counts = np.array([[1, 0, 2, 0],
+                                [0, 0, 3, 0],
+                                [4, 5, 0, 0]])
+        node_path_counts_of_clusters = get_node_path_counts_of_clusters(path_counts, np.array([1, 0, 1, 0]))
+
+        assert len(node_path_counts_of_clusters) == 2
+        assert np.array_equal(node_path_counts_of_clusters[0], np.array([[5, 0]]))
+        assert np.array_equal(node_path_counts_of_clusters[1], np.array([[1, 2], [0, 3], [4, 0]]))
+
+        sparse_node_path_counts_of_clusters = get_node_path_counts_of_clusters(csr_matrix(path_counts).tocsc(),
+                                                                               np.array([1, 0, 1, 0]))
+        for cluster_path_counts, sparse_cluster_path_counts in zip(node_path_counts_of_clusters,
+                                                                   sparse_node_path_counts_of_clusters):
+            assert np.array_equal(sparse_cluster_path_counts, cluster_path_counts)
+
+    def test_group_nodes_by_clustering_labels(self):
+        nodes = [NodeRandomWalkData(name, node_type='person') for name in ['a', 'b', 'c', 'd', 'e']]
+        single_nodes, clusters = group_nodes_by_clustering_labels(nodes, [0, 1, 0, 2, 1])
+
+        assert single_nodes == {'d'}
+        assert clusters == [['a', 'c'], ['b', 'e']]
+
+
+
+def cluster_nodes_by_js_divergence_threshold(nodes, threshold, number_of_walks, max_number_of_paths):
+    # agglomerative clustering with a fixed divergence threshold, merging the closest clusters one merge at a time
+    js_clusters = [NodeClusterRandomWalkData([node]) for node in nodes]
+    while True:
+        smallest_divergence = threshold
+        clusters_to_merge = None
+        for i in range(len(js_clusters)):
+            for j in range(i + 1, len(js_clusters)):
+                divergence = compute_sk_divergence_of_top_n_paths(js_clusters[i], js_clusters[j], max_number_of_paths,
+                                                                  number_of_walks)
+                if divergence < smallest_divergence:
+                    smallest_divergence = divergence
+                    clusters_to_merge = (i, j)
+        if clusters_to_merge is None:
+            break
+        js_clusters[clusters_to_merge[0]].merge(js_clusters[clusters_to_merge[1]])
+        del js_clusters[clusters_to_merge[1]]
+
+    single_nodes = {name for js_cluster in js_clusters if js_cluster.number_of_nodes() == 1
+                    for name in js_cluster.node_names}
+
+    return single_nodes, [js_cluster.node_names for js_cluster in js_clusters if js_cluster.number_of_nodes() > 1]
+
+
+class TestThresholdSweeps(unittest.TestCase):
+
+    def test_hitting_time_sweep_matches_clustering_for_each_threshold(self):
+        nodes = []
+        for node_index, hitting_time in enumerate(np.round(random_state.uniform(1, 5, size=40), 1)):
+            node = NodeRandomWalkData(f'node{node_index}', 'person')
+            node.average_hitting_time = hitting_time
+            nodes.append(node)
+        thresholds = [0.01, 0.05, 0.1, 0.15, 0.3, 1.0, 10.0]
+
+        clusterings = sweep_truncated_hitting_time_thresholds(nodes, thresholds)
+
+        assert list(clusterings) == thresholds
+        for threshold in thresholds:
+            single_nodes, clusters = cluster_nodes_by_truncated_hitting_times(nodes, threshold)
+            assert clusterings[threshold][0] == single_nodes
+            assert clusterings[threshold][1] == clusters
+
+    def test_js_divergence_sweep_matches_clustering_for_each_threshold(self):
+        nodes = []
+        for node_index in range(12):
+            node = NodeRandomWalkData(f'node{node_index}', 'person')
+            for path_index, path_count in enumerate(node_path_counts[:, 5 * node_index]):
+                if path_count > 0:
+                    node.path_counts[f'Path{path_index},'] = int(path_count)
+            nodes.append(node)
+        thresholds = [0, 0.001, 0.0013, 0.002, 0.01, 1.0, 10.0]
+
+        clusterings = sweep_js_divergence_thresholds(nodes, thresholds, number_of_walks=1000, max_number_of_paths=5)
+
+        assert clusterings[0] == ({node.name for node in nodes}, [])
+        # the nodes of each group are merged before the groups are
+        assert set(map(frozenset, clusterings[1.0][1])) == \
+            {frozenset(node.name for node in nodes[4 * group:4 * group + 4]) for group in range(number_of_groups)}
+        assert len(clusterings[10.0][1]) == 1
+        for threshold in thresholds:
+            assert clusterings[threshold] == cluster_nodes_by_js_divergence_threshold(
+                nodes, threshold, number_of_walks=1000, max_number_of_paths=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
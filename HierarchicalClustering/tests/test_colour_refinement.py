@@ -0,0 +1,86 @@
+import unittest
+
+from clustering_nodes_by_path_similarity import cluster_nodes_by_path_similarity
+from colour_refinement import find_equivalent_source_nodes, find_symmetric_nodes, is_transposition_automorphism, \
+    refine_colours
+from Communities import Communities
+from GraphObjects import Hypergraph
+from NodeRandomWalkData import NodeRandomWalkData
+
+# director D1 directed movies M1, M2 and M3 (which are equivalent), director D2 directed M4, in which A1 acted, and
+# M5, in which A1 and A2 acted (so M4 and M5 are not equivalent, and neither are A1 and A2)
+H = Hypergraph()
+H.predicate_argument_types.update({'Directed': ['person', 'movie'], 'ActedIn': ['person', 'movie']})
+for edge_id, (predicate, nodes) in enumerate([('Directed', ['D1', 'M1']), ('Directed', ['D1', 'M2']),
+                                              ('Directed', ['D1', 'M3']), ('Directed', ['D2', 'M4']),
+                                              ('Directed', ['D2', 'M5']), ('ActedIn', ['A1', 'M4']),
+                                              ('ActedIn', ['A1', 'M5']), ('ActedIn', ['A2', 'M5'])]):
+    H.add_edge(predicate, nodes, edge_id=edge_id)
+for node in H.nodes:
+    H.is_source_node[node] = True
+
+config = {'epsilon': 0.1,
+          'max_num_paths': 3,
+          'alpha_sym': 0.1,
+          'pca_dim': 2,
+          'clustering_method_threshold': 50,
+          'k': 1.25,
+          'max_path_length': 4,
+          'theta_p': 0.5,
+          'multiprocessing': False}
+
+
+class TestColourRefinement(unittest.TestCase):
+
+    def test_colours_separate_structurally_different_nodes(self):
+        colours = refine_colours(H, initial_colours={node: node_type for node, node_type in H.nodes.items()})
+
+        assert colours['M1'] == colours['M2'] == colours['M3']
+        assert len({colours['M1'], colours['M4'], colours['M5']}) == 3
+        assert colours['A1'] != colours['A2']
+        assert colours['D1'] != colours['D2']
+
+    def test_transposition_automorphisms(self):
+        assert is_transposition_automorphism(H, 'M1', 'M3')
+        assert not is_transposition_automorphism(H, 'M1', 'M4')
+        assert not is_transposition_automorphism(H, 'D1', 'D2')
+
+    def test_equivalent_source_nodes(self):
+        assert find_equivalent_source_nodes(H, list(H.nodes)) == {'M2': 'M1', 'M3': 'M1'}
+
+    def test_communities_of_equivalent_source_nodes_are_relabelled_copies(self):
+        communities = Communities(H, {**config, 'collapse_equivalent_sources': True}).communities
+
+        assert list(communities) == list(H.nodes)
+        community_of_M1 = communities['M1']
+        for node in ['M2', 'M3']:
+            community = communities[node]
+            exchange = {'M1': node, node: 'M1'}
+            assert community.source_node == node
+            assert community.single_nodes == {exchange.get(single_node, single_node)
+                                              for single_node in community_of_M1.single_nodes}
+            assert community.clusters == [[exchange.get(cluster_node, cluster_node) for cluster_node in cluster]
+                                          for cluster in community_of_M1.clusters]
+
+    def test_symmetric_nodes_with_respect_to_source(self):
+        assert sorted(map(sorted, find_symmetric_nodes(H, 'D2'))) == [['M1', 'M2', 'M3']]
+        assert sorted(map(sorted, find_symmetric_nodes(H, 'M1'))) == [['M2', 'M3']]
+        assert find_symmetric_nodes(H, 'M1', number_of_iterations=1) == find_symmetric_nodes(H, 'M1')
+
+    def test_symmetric_nodes_are_clustered_together(self):
+        # far apart hitting times, so that no node is clustered statistically
+        nodes = []
+        for hitting_time, node_name in enumerate(['M2', 'M3', 'M4', 'M5']):
+            node = NodeRandomWalkData(node_name, node_type='movie')
+            node.average_hitting_time = 10 * hitting_time
+            nodes.append(node)
+
+        single_nodes, clusters = cluster_nodes_by_path_similarity(nodes, number_of_walks=1000, length_of_walks=4,
+                                                                  theta_sym=1.0, config=config,
+                                                                  symmetric_node_groups=find_symmetric_nodes(H, 'M1'))
+        assert single_nodes == {'M4', 'M5'}
+        assert clusters == [['M2', 'M3']]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from GraphObjects import Hypergraph
+from HierarchicalClusterer import HierarchicalClusterer
+from Communities import Communities
+from CommunityPrinter import CommunityPrinter, BufferedCommunityPrinter, ParallelCommunityPrinter
+from CommunityWriter import CommunityWriter
+from CompactCommunityFile import CompactCommunityFile
+
+H = Hypergraph(database_file='./Databases/imdb1.db', info_file='./Databases/imdb.info')
+config = {
+    'clustering_params': {
+        'min_cluster_size': 10,
+        'max_lambda2': 0.8,
+    },
+    'random_walk_params': {
+        'epsilon': 0.1,
+        'max_num_paths': 3,
+        'alpha_sym': 0.1,
+        'pca_dim': 2,
+        'clustering_method_threshold': 50,
+        'k': 1.25,
+        'max_path_length': 5,
+        'theta_p': 0.5,
+        'multiprocessing': False
+    }
+}
+
+hierarchical_clusterer = HierarchicalClusterer(hypergraph=H, config=config['clustering_params'])
+hypergraph_clusters = hierarchical_clusterer.run_hierarchical_clustering()
+hypergraph_communities = [Communities(hypergraph, config=config['random_walk_params'])
+                          for hypergraph in hypergraph_clusters]
+
+
+def read_records(file_name):
+    """
+    Reads the records of an Alchemy community file as (header, sorted lines) pairs, so that files can be compared
+    independently of the order in which atoms were written.
+    """
+    records = []
+    with open(file_name, 'r') as file:
+        for line in file:
+            if line.startswith('#START_DB'):
+                records.append((line.split(), []))
+            elif line.startswith('#END_DB'):
+                records[-1][1].sort()
+            elif records and line.strip():
+                records[-1][1].append(line)
+
+    return records
+
+
+class TestCommunityWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def path(self, file_name):
+        return os.path.join(self.directory.name, file_name)
+
+    def test_same_records_as_community_printer(self):
+        community_printer = CommunityPrinter(list_of_communities=hypergraph_communities, original_hypergraph=H)
+        community_printer.write_files(self.path('imdb_printer'))
+
+        with CommunityWriter(self.path('imdb_writer'), original_hypergraph=H) as writer:
+            for communities in hypergraph_communities:
+                writer.start_hypergraph()
+                for community in communities.communities.values():
+                    writer.write_community(community, hypergraph_of_community=communities.hypergraph)
+
+        for extension in ['.ldb', '.uldb', '.srcnclusts']:
+            with open(self.path('imdb_printer') + extension, 'r') as printer_file:
+                printer_lines = printer_file.readlines()
+            with open(self.path('imdb_writer') + extension, 'r') as writer_file:
+                writer_lines = writer_file.readlines()
+
+            assert printer_lines[0] == writer_lines[0]
+            assert sorted(printer_lines[1:]) == sorted(writer_lines[1:])
+
+    def test_same_files_as_buffered_printer(self):
+        BufferedCommunityPrinter(list_of_communities=hypergraph_communities, original_hypergraph=H).write_files(
+            self.path('imdb_buffered'))
+
+        with CommunityWriter(self.path('imdb_writer'), original_hypergraph=H) as writer:
+            for communities in hypergraph_communities:
+                writer.start_hypergraph()
+                for community in communities.communities.values():
+                    writer.write_community(community, hypergraph_of_community=communities.hypergraph)
+
+        for extension in ['.ldb', '.uldb', '.srcnclusts']:
+            with open(self.path('imdb_buffered') + extension, 'r') as buffered_file:
+                with open(self.path('imdb_writer') + extension, 'r') as writer_file:
+                    assert buffered_file.read() == writer_file.read()
+
+    def test_header_count_fixed_up_when_streaming(self):
+        with CommunityWriter(self.path('imdb_streamed'), original_hypergraph=H) as writer:
+            for hypergraph in hypergraph_clusters:
+                writer.write_communities(Communities(hypergraph, config=config['random_walk_params'], lazy=True))
+
+        with open(self.path('imdb_streamed.srcnclusts'), 'r') as srcnclusts_file:
+            lines = srcnclusts_file.readlines()
+            number_of_communities = int(lines[0].split()[-1])
+            assert number_of_communities == sum(line.startswith('SRC ') for line in lines)
+            assert number_of_communities == H.number_of_nodes()
+
+    def test_buffered_printer_same_records_as_community_printer(self):
+        CommunityPrinter(list_of_communities=hypergraph_communities, original_hypergraph=H).write_files(
+            self.path('imdb_printer'))
+        BufferedCommunityPrinter(list_of_communities=hypergraph_communities, original_hypergraph=H,
+                                 buffer_size=1000).write_files(self.path('imdb_buffered'))
+
+        for extension in ['.ldb', '.uldb', '.srcnclusts']:
+            assert read_records(self.path('imdb_printer') + extension) == \
+                read_records(self.path('imdb_buffered') + extension)
+
+    def test_parallel_printer_same_files_as_buffered_printer(self):
+        BufferedCommunityPrinter(list_of_communities=hypergraph_communities, original_hypergraph=H).write_files(
+            self.path('imdb_buffered'))
+        ParallelCommunityPrinter(list_of_communities=hypergraph_communities, original_hypergraph=H,
+                                 processes=2).write_files(self.path('imdb_parallel'))
+
+        for extension in ['.ldb', '.uldb', '.srcnclusts']:
+            with open(self.path('imdb_buffered') + extension, 'r') as buffered_file:
+                with open(self.path('imdb_parallel') + extension, 'r') as parallel_file:
+                    assert buffered_file.read() == parallel_file.read()
+
+            # communities are numbered consecutively across all hypergraph clusters
+            community_numbers = [int(header[1]) for header, _ in read_records(self.path('imdb_parallel') + extension)]
+            assert community_numbers == list(range(len(community_numbers)))
+
+    def test_compact_file_converts_to_same_files_as_buffered_printer(self):
+        BufferedCommunityPrinter(list_of_communities=hypergraph_communities, original_hypergraph=H).write_files(
+            self.path('imdb_buffered'))
+        CompactCommunityFile.from_communities(hypergraph_communities, original_hypergraph=H).write(
+            self.path('imdb.coms'))
+        CompactCommunityFile.read(self.path('imdb.coms')).write_alchemy_files(self.path('imdb_compact'))
+
+        for extension in ['.ldb', '.uldb', '.srcnclusts']:
+            with open(self.path('imdb_buffered') + extension, 'r') as buffered_file:
+                with open(self.path('imdb_compact') + extension, 'r') as compact_file:
+                    assert buffered_file.read() == compact_file.read()
+
+    def test_compact_file_records_same_as_community_printer(self):
+        CommunityPrinter(list_of_communities=hypergraph_communities, original_hypergraph=H).write_files(
+            self.path('imdb_printer'))
+        CompactCommunityFile.from_communities(hypergraph_communities, original_hypergraph=H).write(
+            self.path('imdb.coms'))
+        CompactCommunityFile.read(self.path('imdb.coms')).write_alchemy_files(self.path('imdb_compact'))
+
+        for extension in ['.ldb', '.uldb', '.srcnclusts']:
+            assert read_records(self.path('imdb_printer') + extension) == \
+                read_records(self.path('imdb_compact') + extension)
+
+    @unittest.skipUnless(importlib.util.find_spec('zstandard'), 'zstd compression requires the zstandard package')
+    def test_zstd_compact_file_round_trip(self):
+        compact_file = CompactCommunityFile.from_communities(hypergraph_communities, original_hypergraph=H)
+        compact_file.write(self.path('imdb.coms'), compression='zstd')
+        read_compact_file = CompactCommunityFile.read(self.path('imdb.coms'))
+
+        assert read_compact_file.predicates == compact_file.predicates
+        assert read_compact_file.node_names == compact_file.node_names
+        for column_name in CompactCommunityFile.column_names:
+            assert np.array_equal(read_compact_file.columns[column_name], compact_file.columns[column_name])
@@ -0,0 +1,60 @@
+import unittest
+
+import numpy as np
+
+from BisectionTree import BisectionTree
+from cost_model import compute_hypergraph_cost, tune_stopping_criteria
+from GraphObjects import Hypergraph
+from HierarchicalClusterer import HierarchicalClusterer
+
+imdb_db = './Databases/imdb1.db'
+imdb_info = './Databases/imdb.info'
+
+H = Hypergraph(database_file=imdb_db, info_file=imdb_info)
+bisection_tree = BisectionTree.build(H.convert_to_graph())
+
+
+def compute_clustering_cost(config):
+    clusterer = HierarchicalClusterer(H, config=config)
+    hypergraph_clusters = clusterer.run_hierarchical_clustering(bisection_tree=bisection_tree)
+
+    return sum(compute_hypergraph_cost(hypergraph) for hypergraph in hypergraph_clusters), hypergraph_clusters
+
+
+class TestCostModel(unittest.TestCase):
+
+    def test_tuned_criteria_are_no_worse_than_a_grid_search(self):
+        config = tune_stopping_criteria(H, bisection_tree)
+        cost, _ = compute_clustering_cost(config)
+
+        for min_cluster_size in range(3, 10):
+            for max_lambda2 in np.arange(0.1, 2.0, 0.1):
+                grid_cost, _ = compute_clustering_cost({'min_cluster_size': min_cluster_size,
+                                                        'max_lambda2': float(max_lambda2)})
+                assert cost <= grid_cost + 1e-9
+
+    def test_constraints_are_met(self):
+        config = tune_stopping_criteria(H, bisection_tree, min_leaf_size=15)
+        _, hypergraph_clusters = compute_clustering_cost(config)
+        assert all(hypergraph.number_of_nodes() >= 15 for hypergraph in hypergraph_clusters)
+
+        # no cut has a conductance of zero, so the hypergraph is not split
+        config = tune_stopping_criteria(H, bisection_tree, max_conductance=0)
+        _, hypergraph_clusters = compute_clustering_cost(config)
+        assert len(hypergraph_clusters) == 1
+
+        assert tune_stopping_criteria(H, bisection_tree, min_leaf_size=H.number_of_nodes() + 1) is None
+
+    def test_clusterer_picks_its_own_criteria(self):
+        clusterer = HierarchicalClusterer.from_cost_model(H, min_leaf_size=5, bisection_tree=bisection_tree)
+        hypergraph_clusters = clusterer.run_hierarchical_clustering()
+
+        assert {'min_cluster_size': clusterer.min_cluster_size, 'max_lambda2': clusterer.max_lambda2} == \
+               tune_stopping_criteria(H, bisection_tree, min_leaf_size=5)
+        assert [set(hypergraph.nodes) for hypergraph in hypergraph_clusters] == \
+               [set(cluster) for cluster in bisection_tree.get_clusters(clusterer.min_cluster_size,
+                                                                        clusterer.max_lambda2)]
+
+
+if __name__ == '__main__':
+    unittest.main()
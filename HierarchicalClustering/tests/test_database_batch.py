@@ -0,0 +1,100 @@
+import os
+import tempfile
+import unittest
+
+from DatabaseBatch import DatabaseBatch
+from GraphObjects import Hypergraph
+from synthetic_hypergraph import write_synthetic_database
+
+number_of_folds = 3
+
+
+def assert_same_hypergraph(hypergraph, expected_hypergraph):
+    assert hypergraph.edges == expected_hypergraph.edges
+    assert hypergraph.predicates == expected_hypergraph.predicates
+    assert hypergraph.nodes == expected_hypergraph.nodes
+    assert hypergraph.memberships == expected_hypergraph.memberships
+    assert hypergraph.singleton_edges == expected_hypergraph.singleton_edges
+    assert hypergraph.predicate_argument_types == expected_hypergraph.predicate_argument_types
+    assert hypergraph.node_types == expected_hypergraph.node_types
+    assert hypergraph.is_source_node == expected_hypergraph.is_source_node
+
+
+class TestDatabaseBatch(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        database_file, cls.info_file = write_synthetic_database(cls.path('batch'), number_of_nodes=60,
+                                                                number_of_edges=150, number_of_predicates=4,
+                                                                max_arity=3, number_of_node_types=2, seed=0)
+        with open(database_file, 'r') as file:
+            cls.lines = file.readlines()
+
+        cls.fold_files = [cls.path(f'batch_fold{fold}.db') for fold in range(number_of_folds)]
+        for fold, fold_file in enumerate(cls.fold_files):
+            with open(fold_file, 'w') as file:
+                file.writelines(cls.lines[fold::number_of_folds])
+
+        # the training set of fold 0, as it would be given to Hypergraph as a single file
+        with open(cls.path('batch_not_fold0.db'), 'w') as file:
+            for fold_file in cls.fold_files[1:]:
+                with open(fold_file, 'r') as fold:
+                    file.write(fold.read())
+
+        cls.batch = DatabaseBatch(cls.fold_files, cls.info_file, processes=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    @classmethod
+    def path(cls, file_name):
+        return os.path.join(cls.directory.name, file_name)
+
+    def test_fold_hypergraphs_match_hypergraphs_of_database_files(self):
+        for fold, fold_file in enumerate(self.fold_files):
+            assert_same_hypergraph(self.batch.fold_hypergraph(fold),
+                                   Hypergraph(database_file=fold_file, info_file=self.info_file))
+
+    def test_leave_one_out_hypergraph_matches_hypergraph_of_remaining_files(self):
+        assert_same_hypergraph(self.batch.leave_one_out_hypergraph(0),
+                               Hypergraph(database_file=self.path('batch_not_fold0.db'), info_file=self.info_file))
+
+    def test_leave_one_out_hypergraphs_cover_every_fold(self):
+        test_files = []
+        for test_file, hypergraph in self.batch.leave_one_out_hypergraphs():
+            test_files.append(test_file)
+            assert hypergraph.number_of_edges() == \
+                len(self.lines) - len(self.lines[self.fold_files.index(test_file)::number_of_folds])
+
+        assert test_files == self.fold_files
+
+    def test_constants_are_shared_between_folds(self):
+        for fold_atoms in self.batch.fold_atoms:
+            for _, constants in fold_atoms:
+                assert all(constant is self.batch.constants[constant] for constant in constants)
+
+        hypergraphs = [self.batch.fold_hypergraph(fold) for fold in range(number_of_folds)]
+        shared_nodes = set(hypergraphs[0].nodes).intersection(hypergraphs[1].nodes)
+        assert shared_nodes
+        for node in shared_nodes:
+            node_in_fold1 = next(other_node for other_node in hypergraphs[1].nodes if other_node == node)
+            assert node is node_in_fold1
+
+    def test_serial_and_parallel_parsing_agree(self):
+        serial_batch = DatabaseBatch(self.fold_files, self.info_file, processes=1)
+        assert serial_batch.fold_atoms == self.batch.fold_atoms
+
+    def test_unknown_predicate_raises_error(self):
+        with open(self.path('batch_bad.db'), 'w') as file:
+            file.write('Unknown(N1,N2)\n')
+
+        self.assertRaises(ValueError, DatabaseBatch, [self.path('batch_bad.db')], self.info_file)
+
+    def test_fold_out_of_range_raises_error(self):
+        self.assertRaises(IndexError, self.batch.fold_hypergraph, number_of_folds)
+
+
+if __name__ == '__main__':
+    unittest.main()
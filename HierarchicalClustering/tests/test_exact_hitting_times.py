@@ -0,0 +1,124 @@
+import random
+import unittest
+
+import numpy as np
+
+from Communities import Communities
+from ExactHittingTimes import ExactHittingTimes, compute_transition_matrix
+from GraphObjects import Hypergraph
+from RandomWalker import RandomWalker
+
+H = Hypergraph(database_file='./Databases/smoking.db', info_file='./Databases/smoking.info')
+config = {'epsilon': 0.05,
+          'max_num_paths': 3,
+          'max_path_length': 5,
+          'alpha_sym': 0.1,
+          'multiprocessing': False}
+
+
+def estimate_hitting_times(hypergraph, source_node, length_of_walk, number_of_walks):
+    accumulated_hitting_times = dict.fromkeys(hypergraph.nodes, 0)
+    for _ in range(number_of_walks):
+        current_node = source_node
+        hitting_times = dict.fromkeys(hypergraph.nodes, length_of_walk)
+        for step in range(length_of_walk):
+            _, current_node = hypergraph.get_random_edge_and_neighbor_of_node(current_node)
+            hitting_times[current_node] = min(hitting_times[current_node], step + 1)
+        for node, hitting_time in hitting_times.items():
+            accumulated_hitting_times[node] += hitting_time
+
+    return {node: hitting_time / number_of_walks for node, hitting_time in accumulated_hitting_times.items()}
+
+
+class TestExactHittingTimes(unittest.TestCase):
+
+    def test_transition_matrix_is_stochastic(self):
+        transition_matrix = compute_transition_matrix(H, {node: index for index, node in enumerate(H.nodes)})
+        assert np.allclose(transition_matrix.sum(axis=1), 1)
+
+    def test_hitting_times_of_path(self):
+        # a walk on A - B - C always hits B at the first step, and hits C (or returns to A) at the second step with
+        # probability one half, else not within three steps
+        hypergraph = Hypergraph()
+        hypergraph.predicate_argument_types['Friends'] = ['person', 'person']
+        hypergraph.add_edge('Friends', ['A', 'B'], edge_id=0)
+        hypergraph.add_edge('Friends', ['B', 'C'], edge_id=1)
+
+        hitting_times = ExactHittingTimes(hypergraph, length_of_walk=3).average_truncated_hitting_times('A')
+
+        assert np.isclose(hitting_times['B'], 1)
+        assert np.isclose(hitting_times['C'], 2.5)
+        assert np.isclose(hitting_times['A'], 2.5)
+
+    def test_hitting_times_match_random_walk_estimates(self):
+        random.seed(0)
+        exact_hitting_times = ExactHittingTimes(H, length_of_walk=5)
+        for source_node in list(H.nodes)[:3]:
+            hitting_times = exact_hitting_times.average_truncated_hitting_times(source_node)
+            estimated_hitting_times = estimate_hitting_times(H, source_node, length_of_walk=5, number_of_walks=20000)
+            for node in H.nodes:
+                assert abs(hitting_times[node] - estimated_hitting_times[node]) < 0.05
+
+    def test_target_blocks_do_not_change_hitting_times(self):
+        hitting_times = ExactHittingTimes(H, length_of_walk=5).compute_hitting_times()
+        blocked_hitting_times = ExactHittingTimes(H, length_of_walk=5, target_block_size=3).compute_hitting_times()
+
+        assert np.allclose(hitting_times, blocked_hitting_times)
+
+    def test_random_walker_uses_exact_hitting_times(self):
+        random_walker = RandomWalker(H, config={**config, 'exact_hitting_times': True})
+        source_node = next(iter(H.nodes))
+        nodes_random_walk_data = random_walker.generate_node_random_walk_data(source_node)
+        hitting_times = random_walker.exact_hitting_times.average_truncated_hitting_times(source_node)
+
+        assert random_walker.max_number_of_walks == random_walker.number_of_walks_for_path_distribution
+        for node, node_random_walk_data in nodes_random_walk_data.items():
+            assert node_random_walk_data.average_hitting_time == hitting_times[node]
+
+    def test_exact_hitting_times_are_opt_in(self):
+        assert RandomWalker(H, config=config).exact_hitting_times is None
+        assert RandomWalker(H, config={**config, 'exact_hitting_times': False}).exact_hitting_times is None
+
+    def test_cost_model_decides_in_auto_mode(self):
+        random_walker = RandomWalker(H, config={**config, 'exact_hitting_times': 'auto'})
+        if random_walker.number_of_walks_for_truncated_hitting_times <= \
+                random_walker.number_of_walks_for_path_distribution:
+            assert random_walker.exact_hitting_times is None
+        else:
+            # the costs of the two computations are config keys
+            assert RandomWalker(H, config={**config, 'exact_hitting_times': 'auto',
+                                           'seconds_per_exact_operation': 1e-15}).exact_hitting_times is not None
+            assert RandomWalker(H, config={**config, 'exact_hitting_times': 'auto',
+                                           'seconds_per_exact_operation': 1.0}).exact_hitting_times is None
+
+    def test_exact_and_sampled_hitting_times_give_the_same_communities(self):
+        # a hub joined to each node of a ring of leaves, which are symmetric with respect to the hub
+        hypergraph = Hypergraph()
+        hypergraph.predicate_argument_types.update({'R': ['person', 'person'], 'S': ['person', 'person'],
+                                                    'T': ['person', 'person']})
+        leaves = ['L1', 'L2', 'L3', 'L4', 'L5']
+        edges = []
+        for leaf_index, leaf in enumerate(leaves):
+            edges += [('R', ['Hub', leaf]), ('S', [leaf, 'Hub']), ('T', [leaf, leaves[(leaf_index + 1) % len(leaves)]])]
+        for edge_id, (predicate, nodes) in enumerate(edges):
+            hypergraph.add_edge(predicate, nodes, edge_id=edge_id)
+        hypergraph.node_types.add('person')
+        for node in hypergraph.nodes:
+            hypergraph.is_source_node[node] = True
+        communities_config = {'epsilon': 0.4, 'max_num_paths': 3, 'alpha_sym': 0.001, 'pca_dim': 2,
+                              'clustering_method_threshold': 50, 'k': 1.25, 'max_path_length': 3, 'theta_p': 0.5,
+                              'multiprocessing': False, 'seed': 0}
+
+        communities = {}
+        for exact_hitting_times in [False, True]:
+            communities[exact_hitting_times] = {
+                source_node: (community.single_nodes, sorted(map(sorted, community.clusters)))
+                for source_node, community in Communities(hypergraph, {**communities_config,
+                                                                       'exact_hitting_times': exact_hitting_times})
+                .communities.items()}
+
+        assert communities[True] == communities[False]
+        assert communities[True]['Hub'][1] == [['L4', 'L5']]
+
+if __name__ == '__main__':
+    unittest.main()
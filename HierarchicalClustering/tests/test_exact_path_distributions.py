@@ -0,0 +1,85 @@
+import random
+import unittest
+
+import numpy as np
+
+from ExactHittingTimes import ExactHittingTimes
+from ExactPathDistributions import ExactPathDistributions
+from GraphObjects import Hypergraph
+from RandomWalker import RandomWalker
+
+H = Hypergraph(database_file='./Databases/smoking.db', info_file='./Databases/smoking.info')
+config = {'epsilon': 0.05,
+          'max_num_paths': 3,
+          'max_path_length': 5,
+          'alpha_sym': 0.1,
+          'multiprocessing': False}
+
+
+class TestExactPathDistributions(unittest.TestCase):
+
+    def test_path_distributions_of_path(self):
+        # a walk on A - B - C hits B along Friends at the first step, then C along Knows or A along Friends
+        hypergraph = Hypergraph()
+        hypergraph.predicate_argument_types.update({'Friends': ['person', 'person'], 'Knows': ['person', 'person']})
+        hypergraph.add_edge('Friends', ['A', 'B'], edge_id=0)
+        hypergraph.add_edge('Knows', ['B', 'C'], edge_id=1)
+
+        nodes_random_walk_data = ExactPathDistributions(hypergraph, length_of_walk=3).compute_node_random_walk_data(
+            'A', number_of_walks=100)
+
+        assert dict(nodes_random_walk_data['B'].path_counts) == {'Friends,': 100}
+        assert dict(nodes_random_walk_data['A'].path_counts) == {'Friends,Friends,': 50}
+        assert dict(nodes_random_walk_data['C'].path_counts) == {'Friends,Knows,': 50}
+        assert np.isclose(nodes_random_walk_data['C'].average_hitting_time, 2.5)
+
+    def test_path_distributions_match_random_walk_estimates(self):
+        random.seed(0)
+        random_walker = RandomWalker(H, config={**config, 'exact_hitting_times': False})
+        random_walker.length_of_walk = 4
+        random_walker.max_number_of_walks = 20000
+        random_walker.fraction_of_max_walks_to_always_complete = 1
+        source_node = next(iter(H.nodes))
+        estimated_random_walk_data = random_walker.generate_node_random_walk_data(source_node)
+
+        nodes_random_walk_data = ExactPathDistributions(H, length_of_walk=4).compute_node_random_walk_data(
+            source_node, number_of_walks=random_walker.number_of_walks_ran)
+
+        for node, node_random_walk_data in nodes_random_walk_data.items():
+            estimated_path_counts = estimated_random_walk_data[node].path_counts
+            for path in set(node_random_walk_data.path_counts).union(estimated_path_counts):
+                assert abs(node_random_walk_data.path_counts[path] - estimated_path_counts[path]) < \
+                       0.01 * random_walker.number_of_walks_ran
+            assert abs(node_random_walk_data.average_hitting_time -
+                       estimated_random_walk_data[node].average_hitting_time) < 0.05
+
+    def test_hitting_times_match_exact_hitting_times(self):
+        exact_hitting_times = ExactHittingTimes(H, length_of_walk=5)
+        exact_path_distributions = ExactPathDistributions(H, length_of_walk=5)
+        for source_node in list(H.nodes)[:3]:
+            hitting_times = exact_hitting_times.average_truncated_hitting_times(source_node)
+            nodes_random_walk_data = exact_path_distributions.compute_node_random_walk_data(source_node, 1000)
+            for node, node_random_walk_data in nodes_random_walk_data.items():
+                assert np.isclose(node_random_walk_data.average_hitting_time, hitting_times[node])
+                assert np.isclose(sum(node_random_walk_data.path_counts.values()),
+                                  node_random_walk_data.number_of_hits)
+
+    def test_state_budget_is_enforced(self):
+        exact_path_distributions = ExactPathDistributions(H, length_of_walk=5, state_budget=len(H.nodes))
+        assert exact_path_distributions.compute_node_random_walk_data(next(iter(H.nodes)), 1000) is None
+
+    def test_random_walker_falls_back_to_random_walks(self):
+        source_node = next(iter(H.nodes))
+        random_walker = RandomWalker(H, config={**config, 'exact_path_distributions': True})
+        random_walker.generate_node_random_walk_data(source_node)
+        assert random_walker.number_of_walks_ran == random_walker.max_number_of_walks
+
+        random_walker = RandomWalker(H, config={**config, 'exact_path_distributions': True,
+                                                'path_distribution_state_budget': len(H.nodes)})
+        nodes_random_walk_data = random_walker.generate_node_random_walk_data(source_node)
+        assert all(isinstance(count, int) for node_random_walk_data in nodes_random_walk_data.values()
+                   for count in node_random_walk_data.path_counts.values())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,13 @@
+import unittest
+
+from benchmark import get_import_statistics, pipeline_modules
+
+
+class TestImports(unittest.TestCase):
+
+    def test_pipeline_modules_do_not_import_heavy_dependencies(self):
+        # sklearn, matplotlib, chi2comb, scipy.stats, tqdm and pandas should only be imported by the functions that
+        # use them, so that worker processes and short command-line runs start quickly
+        for module in pipeline_modules:
+            _, imported_heavy_modules = get_import_statistics(module)
+            assert imported_heavy_modules == [], f"Importing {module} also imports {imported_heavy_modules}"
@@ -0,0 +1,103 @@
+import json
+import os
+import tempfile
+import unittest
+
+import instrumentation
+from GraphObjects import Hypergraph
+from HierarchicalClusterer import HierarchicalClusterer
+from Communities import Communities
+from CommunityPrinter import BufferedCommunityPrinter
+
+clustering_params = {'min_cluster_size': 10, 'max_lambda2': 0.8}
+random_walk_params = {
+    'epsilon': 0.1,
+    'max_num_paths': 3,
+    'alpha_sym': 0.1,
+    'pca_dim': 2,
+    'clustering_method_threshold': 50,
+    'k': 1.25,
+    'max_path_length': 5,
+    'theta_p': 0.5,
+    'multiprocessing': False
+}
+
+
+def run_pipeline(output_file_name, multiprocessing=False):
+    H = Hypergraph(database_file='./Databases/imdb1.db', info_file='./Databases/imdb.info')
+    hypergraph_clusters = HierarchicalClusterer(hypergraph=H, config=clustering_params).run_hierarchical_clustering()
+    hypergraph_communities = [Communities(hypergraph, config=dict(random_walk_params, multiprocessing=multiprocessing))
+                              for hypergraph in hypergraph_clusters]
+    BufferedCommunityPrinter(hypergraph_communities, original_hypergraph=H).write_files(output_file_name)
+
+    return H, hypergraph_clusters
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def path(self, file_name):
+        return os.path.join(self.directory.name, file_name)
+
+    def tearDown(self):
+        instrumentation.disable()
+        instrumentation.reset()
+
+    def test_nothing_recorded_when_disabled(self):
+        instrumentation.disable()
+        run_pipeline(self.path('imdb_instrumented'))
+        report = instrumentation.report()
+        assert report['stages'] == {} and report['counters'] == {}
+
+    def test_report_of_pipeline(self):
+        instrumentation.enable()
+        H, hypergraph_clusters = run_pipeline(self.path('imdb_instrumented'))
+        instrumentation.write_report(self.path('imdb_report.json'), database='imdb1.db')
+
+        with open(self.path('imdb_report.json'), 'r') as report_file:
+            report = json.load(report_file)
+
+        stages = report['stages']
+        assert stages['hypergraph_load']['calls'] == 1
+        assert stages['clique_expansion']['calls'] == 1
+        # every split of the bisection tree is recorded, including those of the leaves
+        assert stages['spectral_split']['calls'] == 2 * len(hypergraph_clusters) - 1
+        assert stages['random_walks']['calls'] == report['counters']['source_nodes'] == H.number_of_nodes()
+        assert stages['file_output']['calls'] == 1
+        assert report['counters']['walks_run'] > 0
+        assert report['metadata'] == {'database': 'imdb1.db'}
+        assert all(stage['wall_time'] <= report['wall_time'] for stage in stages.values())
+
+    def test_worker_statistics_merged(self):
+        instrumentation.enable()
+        H, _ = run_pipeline(self.path('imdb_instrumented'), multiprocessing=True)
+        report = instrumentation.report()
+
+        assert report['stages']['random_walks']['calls'] == H.number_of_nodes()
+        assert report['counters']['source_nodes'] == H.number_of_nodes()
+
+    def test_memory_accounting(self):
+        instrumentation.enable(trace_memory=True)
+        run_pipeline(self.path('imdb_instrumented'))
+        report = instrumentation.report()
+
+        for name in ['hypergraph.edges', 'hypergraph.memberships', 'clique_graph', 'node_random_walk_data',
+                     'community_printer.node_to_node_id']:
+            assert report['sizes'][name]['max_size'] > 0
+        assert report['sizes']['node_random_walk_data']['records'] == report['counters']['source_nodes']
+        assert all(0 <= stage['peak_memory'] <= report['peak_memory'] for stage in report['stages'].values())
+
+    def test_memory_accounting_of_workers_merged(self):
+        instrumentation.enable(trace_memory=True)
+        H, _ = run_pipeline(self.path('imdb_instrumented'), multiprocessing=True)
+        report = instrumentation.report()
+
+        assert report['sizes']['node_random_walk_data']['records'] == H.number_of_nodes()
+        assert report['worker_peak_memory'] > 0
+
+    def test_deep_size_counts_shared_objects_once(self):
+        shared = list(range(1000))
+        assert instrumentation.deep_size([shared, shared]) < 2 * instrumentation.deep_size(shared)
@@ -0,0 +1,83 @@
+import random
+import unittest
+
+import numpy as np
+
+from errors import InvalidArgumentValue
+from ExactHittingTimes import ExactHittingTimes
+from GraphObjects import Hypergraph
+from RandomWalker import RandomWalker
+
+H = Hypergraph(database_file='./Databases/smoking.db', info_file='./Databases/smoking.info')
+config = {'epsilon': 0.05,
+          'max_num_paths': 3,
+          'max_path_length': 5,
+          'alpha_sym': 0.1,
+          'exact_hitting_times': False,
+          'multiprocessing': False}
+
+
+class TestMultiLengthRandomWalks(unittest.TestCase):
+
+    def test_longest_length_matches_random_walks(self):
+        random_walker = RandomWalker(H, config=config)
+        random_walker.fraction_of_max_walks_to_always_complete = 1
+        source_node = next(iter(H.nodes))
+
+        random.seed(0)
+        nodes_random_walk_data = random_walker.generate_node_random_walk_data(source_node)
+        random.seed(0)
+        multi_length_random_walk_data = random_walker.generate_multi_length_random_walk_data(
+            source_node, number_of_walks=random_walker.number_of_walks_ran)
+
+        truncated_random_walk_data = multi_length_random_walk_data.node_random_walk_data(random_walker.length_of_walk)
+        for node, node_random_walk_data in nodes_random_walk_data.items():
+            assert truncated_random_walk_data[node].path_counts == node_random_walk_data.path_counts
+            assert truncated_random_walk_data[node].number_of_hits == node_random_walk_data.number_of_hits
+            assert np.isclose(truncated_random_walk_data[node].average_hitting_time,
+                              node_random_walk_data.average_hitting_time)
+
+    def test_truncated_walks(self):
+        random.seed(0)
+        random_walker = RandomWalker(H, config=config)
+        source_node = next(iter(H.nodes))
+        multi_length_random_walk_data = random_walker.generate_multi_length_random_walk_data(source_node,
+                                                                                             number_of_walks=20000)
+
+        previous_number_of_hits = dict.fromkeys(H.nodes, 0)
+        for length_of_walk in range(1, random_walker.length_of_walk + 1):
+            nodes_random_walk_data = multi_length_random_walk_data.node_random_walk_data(length_of_walk)
+            average_hitting_times = multi_length_random_walk_data.average_hitting_times(length_of_walk)
+            exact_hitting_times = ExactHittingTimes(H, length_of_walk).average_truncated_hitting_times(source_node)
+            for node, node_random_walk_data in nodes_random_walk_data.items():
+                assert all(path.count(',') <= length_of_walk for path in node_random_walk_data.path_counts)
+                assert sum(node_random_walk_data.path_counts.values()) == node_random_walk_data.number_of_hits
+                assert node_random_walk_data.number_of_hits >= previous_number_of_hits[node]
+                assert np.isclose(average_hitting_times[node], node_random_walk_data.average_hitting_time)
+                assert abs(average_hitting_times[node] - exact_hitting_times[node]) < 0.05
+                previous_number_of_hits[node] = node_random_walk_data.number_of_hits
+
+    def test_lengths_beyond_the_walks_are_rejected(self):
+        random_walker = RandomWalker(H, config=config)
+        multi_length_random_walk_data = random_walker.generate_multi_length_random_walk_data(next(iter(H.nodes)),
+                                                                                             number_of_walks=10)
+        with self.assertRaises(InvalidArgumentValue):
+            multi_length_random_walk_data.node_random_walk_data(random_walker.length_of_walk + 1)
+
+    def test_no_walks(self):
+        random_walker = RandomWalker(H, config=config)
+        source_node = next(iter(H.nodes))
+        multi_length_random_walk_data = random_walker.generate_multi_length_random_walk_data(source_node,
+                                                                                             number_of_walks=0)
+
+        for length_of_walk in range(1, random_walker.length_of_walk + 1):
+            average_hitting_times = multi_length_random_walk_data.average_hitting_times(length_of_walk)
+            nodes_random_walk_data = multi_length_random_walk_data.node_random_walk_data(length_of_walk)
+            for node in H.nodes:
+                assert average_hitting_times[node] == length_of_walk
+                assert nodes_random_walk_data[node].average_hitting_time == length_of_walk
+                assert nodes_random_walk_data[node].number_of_hits == 0
+
+
+if __name__ == '__main__':
+    unittest.main()